@@ -0,0 +1,132 @@
+"""
+Benchmark of the warehouse backends.
+
+Loads the same synthetic tables in SQLite (`bulk_load_data()`) and DuckDB
+(`DuckDBBackend`), then times the summary query over the facts, the summary query
+each backend runs for `main.py` (the materialized aggregates on SQLite) and other
+analyst aggregates on both, over fact tables of increasing size.
+
+Run from the repository root (DuckDB is optional: `pip install duckdb`):
+    PYTHONPATH=app python -m benchmarks.bench_backends --sizes 100000 1000000 5000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_load import make_tables
+from etl.load import BACKENDS, SUMMARY_QUERY
+from etl.transform import MATCH_INTEGER_COLUMNS
+
+AGGREGATE_QUERIES = {
+    "summary": SUMMARY_QUERY,
+    "competitions_per_team": """
+        SELECT competitions, COUNT(*) AS teams
+        FROM (SELECT team_id, COUNT(*) AS competitions FROM fact_competitions GROUP BY team_id) AS t
+        GROUP BY competitions
+        ORDER BY competitions
+    """,
+    "goals_per_competition_season": """
+        SELECT competition_id, season_id, COUNT(*) AS matches, AVG(home_score + away_score) AS goals_per_match
+        FROM fact_matches
+        WHERE status = 'FINISHED'
+        GROUP BY competition_id, season_id
+    """,
+    "home_record_per_team": """
+        SELECT home_team_id,
+               SUM(CASE WHEN winner = 'HOME_TEAM' THEN 1 ELSE 0 END) AS wins,
+               COUNT(*) AS matches
+        FROM fact_matches
+        GROUP BY home_team_id
+        ORDER BY wins DESC, home_team_id
+        LIMIT 20
+    """,
+}
+
+
+def make_matches(rows: int, n_competitions: int, n_teams: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a synthetic fact_matches DataFrame, in the format returned by `transform_matches()`.
+    Args:
+        rows (int): Number of matches.
+        n_competitions (int): Number of competitions the matches are spread over.
+        n_teams (int): Number of teams playing the matches.
+        seed (int): Seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    home_score = rng.integers(0, 5, rows)
+    away_score = rng.integers(0, 4, rows)
+    fact_matches = pd.DataFrame({
+        "id": np.arange(rows),
+        "competition_id": rng.integers(0, n_competitions, rows),
+        "season_id": rng.integers(2015, 2025, rows),
+        "utc_date": pd.Timestamp("2015-08-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D"),
+        "status": np.where(rng.random(rows) < 0.9, "FINISHED", "SCHEDULED"),
+        "matchday": rng.integers(1, 39, rows),
+        "stage": "REGULAR_SEASON",
+        "home_team_id": rng.integers(0, n_teams, rows),
+        "away_team_id": rng.integers(0, n_teams, rows),
+        "home_score": home_score,
+        "away_score": away_score,
+        "winner": np.select([home_score > away_score, home_score < away_score], ["HOME_TEAM", "AWAY_TEAM"], "DRAW"),
+        "last_updated": "2025-01-01T00:00:00Z",
+    })
+    fact_matches["utc_date"] = fact_matches["utc_date"].dt.strftime("%Y-%m-%dT15:00:00Z")
+    return fact_matches.astype({column: "Int64" for column in MATCH_INTEGER_COLUMNS})
+
+
+def time_backend(name: str, tables: tuple, fact_matches: pd.DataFrame, repeats: int) -> dict:
+    """
+    Loads the tables in a backend, in a temporary directory, and times the load and each aggregate.
+    Returns:
+        dict: Seconds of the load and best of `repeats` runs of every query in AGGREGATE_QUERIES
+        and of the backend summary query.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            backend = BACKENDS[name]()
+            backend.create_tables()
+            start = time.perf_counter()
+            backend.load(*tables, bulk=True)
+            backend.load_matches(fact_matches)
+            timings = {"load": time.perf_counter() - start}
+
+            queries = {**AGGREGATE_QUERIES, "backend_summary": backend.summary_query}
+            for query_name, query in queries.items():
+                durations = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    backend.query(query)
+                    durations.append(time.perf_counter() - start)
+                timings[query_name] = min(durations)
+            return timings
+        finally:
+            os.chdir(cwd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the warehouse backends on aggregate queries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Rows of each fact table")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs of each query, the best one is reported")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=["sqlite", "duckdb"])
+    args = parser.parse_args(argv)
+
+    names = ["load"] + list(AGGREGATE_QUERIES) + ["backend_summary"]
+    for size in args.sizes:
+        tables = make_tables(size)
+        fact_matches = make_matches(size, len(tables[0]), len(tables[1]))
+        results = {backend: time_backend(backend, tables, fact_matches, args.repeats) for backend in args.backends}
+
+        print(f"\n{size} fact rows")
+        print(f"{'step':<30}" + "".join(f"{backend + ' (s)':>14}" for backend in args.backends))
+        for name in names:
+            print(f"{name:<30}" + "".join(f"{results[backend][name]:>14.4f}" for backend in args.backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark of the dataframe engines.
+
+Compares the pandas transforms (`transform_data()`, `transform_data_compact()`)
+with `transform_data_polars()` on synthetic extract output, then the summary of
+`export_summary()` computed by the warehouse query (pandas engine) with the one
+aggregated by Polars (`iter_summary_polars()`), on fact tables of increasing size.
+Every Polars result is checked against the pandas one.
+
+Run from the repository root (Polars is optional: `pip install polars`):
+    PYTHONPATH=app python -m benchmarks.bench_engines --rows 1000000 5000000
+"""
+import argparse
+import functools
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_load import make_tables
+from benchmarks.bench_transform import make_extract_output
+from etl.export import iter_summary_polars
+from etl.load import BACKENDS, SUMMARY_QUERY
+from etl.transform import transform_data, transform_data_compact, transform_data_polars
+
+
+def best_of(function, repeats: int) -> tuple:
+    """Runs `function` `repeats` times and returns its last result and its best duration in seconds."""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return result, min(durations)
+
+
+def same_frames(expected, result) -> bool:
+    """Returns True if two tuples of DataFrames hold the same rows, in the same order and with the same dtypes."""
+    try:
+        for expected_df, result_df in zip(expected, result):
+            pd.testing.assert_frame_equal(result_df, expected_df.reset_index(drop=True))
+    except AssertionError:
+        return False
+    return True
+
+
+def bench_transforms(rows: int, repeats: int):
+    """Times each pandas transform and its polars counterpart on `rows` team rows."""
+    competitions, all_teams = make_extract_output(rows)
+    for transform, compact in ((transform_data, False), (transform_data_compact, True)):
+        expected, pandas_seconds = best_of(functools.partial(transform, competitions, all_teams), repeats)
+        result, polars_seconds = best_of(
+            functools.partial(transform_data_polars, competitions, all_teams, compact=compact), repeats
+        )
+        print(
+            f"{rows:>10} {transform.__name__:>24} {pandas_seconds:>11.3f} {polars_seconds:>11.3f} "
+            f"{pandas_seconds / polars_seconds:>8.2f}x {str(same_frames(expected, result)):>6}"
+        )
+
+
+def bench_summary(backend_name: str, rows: int, repeats: int):
+    """Loads `rows` facts in a backend, in a temporary directory, and times each way to compute the summary."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            backend = BACKENDS[backend_name]()
+            backend.create_tables()
+            backend.load(*make_tables(rows), bulk=True)
+
+            expected, query_seconds = best_of(functools.partial(backend.query, backend.summary_query), repeats)
+            _, facts_seconds = best_of(functools.partial(backend.query, SUMMARY_QUERY), repeats)
+            (result,), polars_seconds = best_of(lambda: list(iter_summary_polars(backend)), repeats)
+            same = expected.equals(result)
+            print(
+                f"{rows:>10} {backend_name:>8} {query_seconds:>13.3f} {facts_seconds:>13.3f} "
+                f"{polars_seconds:>11.3f} {str(same):>6}"
+            )
+        finally:
+            os.chdir(cwd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pandas and polars engines")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000], help="Team rows and fact rows")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs of each step, the best one is reported")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=["sqlite"])
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>10} {'transform':>24} {'pandas (s)':>11} {'polars (s)':>11} {'speedup':>9} {'same':>6}")
+    for rows in args.rows:
+        bench_transforms(rows, args.repeats)
+
+    print(f"\n{'rows':>10} {'backend':>8} {'summary (s)':>13} {'facts (s)':>13} {'polars (s)':>11} {'same':>6}")
+    for rows in args.rows:
+        for backend_name in args.backends:
+            bench_summary(backend_name, rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of the landing zone.
+
+Writes the raw files of a synthetic extraction run (as served by `benchmarks.mock_api`),
+lands them as gzip JSON Lines and as Parquet, and compares the storage size and the
+replay time of `replay_data()` with `LandingZone.read()`, for the whole run and for a
+single competition (partition pruning).
+
+Run from the repository root:
+    PYTHONPATH=app python -m benchmarks.bench_landing --competitions 200 --teams 100
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.mock_api import MockFootballData
+from etl.extract import replay_data
+from etl.landing import LANDING_FORMATS, LandingZone, pq
+
+
+def folder_size(folder: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder) for name in names)
+
+
+def write_raw_run(data: MockFootballData, folder: str):
+    """Writes competitions.json and the teams_<code>.json files as the extract step stores them."""
+    os.makedirs(folder)
+    with open(os.path.join(folder, "competitions.json"), "w", encoding="utf-8") as file:
+        json.dump({"count": len(data.competitions), "competitions": data.competitions}, file)
+    for code, teams in data.teams.items():
+        with open(os.path.join(folder, f"teams_{code}.json"), "w", encoding="utf-8") as file:
+            json.dump({"count": len(teams), "teams": teams}, file)
+
+
+def timed(function, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the landing zone formats")
+    parser.add_argument("--competitions", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=100, help="Teams per competition")
+    parser.add_argument("--squad-size", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    data = MockFootballData(args.competitions, args.teams, args.squad_size)
+    with tempfile.TemporaryDirectory() as root:
+        raw_folder = os.path.join(root, "raw")
+        write_raw_run(data, raw_folder)
+        raw_size = folder_size(raw_folder)
+        one_code = data.competitions[0]["code"]
+
+        print(f"{'storage':>10} {'size (MB)':>10} {'ratio':>6} {'land (s)':>9} {'replay all (s)':>15} {'replay 1 (s)':>13}")
+        print(
+            f"{'raw json':>10} {raw_size / 2**20:>10.1f} {1:>6.1f} {'':>9} "
+            f"{timed(replay_data, raw_folder, args.workers):>15.3f} {'':>13}"
+        )
+        for file_format in LANDING_FORMATS:
+            if file_format == "parquet" and pq is None:
+                print(f"{file_format:>10} skipped, pyarrow is not installed")
+                continue
+            landing = LandingZone(os.path.join(root, file_format), file_format)
+            land_seconds = timed(landing.land, raw_folder)
+            size = folder_size(landing.folder)
+            print(
+                f"{file_format:>10} {size / 2**20:>10.1f} {raw_size / size:>6.1f} {land_seconds:>9.3f} "
+                f"{timed(landing.read):>15.3f} {timed(landing.read, competition_codes=[one_code]):>13.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
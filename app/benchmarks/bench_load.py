@@ -0,0 +1,77 @@
+"""
+Benchmark of the SQLite load paths.
+
+Compares `load_data()` (pandas `DataFrame.to_sql`) with `bulk_load_data()`
+(executemany in a single tuned transaction) on synthetic tables.
+
+Run from the repository root:
+    PYTHONPATH=app python -m benchmarks.bench_load --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.load import bulk_load_data, create_tables, load_data
+
+
+def make_tables(fact_rows: int, seed: int = 0) -> tuple:
+    """
+    Builds synthetic dim_competitions, dim_teams and fact_competitions DataFrames.
+    Args:
+        fact_rows (int): Number of rows of the fact table.
+        seed (int): Seed of the random generator.
+    Returns:
+        tuple: The three DataFrames, in the order expected by the loaders.
+    """
+    rng = np.random.default_rng(seed)
+    n_competitions = max(1, fact_rows // 1000)
+    n_teams = max(1, fact_rows // 4)
+
+    dim_competitions = pd.DataFrame({
+        "id": np.arange(n_competitions),
+        "name": [f"Competition {i}" for i in range(n_competitions)],
+    })
+    dim_teams = pd.DataFrame({
+        "id": np.arange(n_teams),
+        "name": [f"Team {i}" for i in range(n_teams)],
+    })
+    fact_competitions = pd.DataFrame({
+        "competition_id": rng.integers(0, n_competitions, fact_rows),
+        "team_id": rng.integers(0, n_teams, fact_rows),
+    })
+    return dim_competitions, dim_teams, fact_competitions
+
+
+def time_loader(loader, tables: tuple) -> float:
+    """Runs a loader on freshly created tables in a temporary directory and returns its duration in seconds."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            create_tables()
+            start = time.perf_counter()
+            loader(*tables)
+            return time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite load paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'fact rows':>10} {'to_sql (s)':>12} {'bulk (s)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        tables = make_tables(size)
+        to_sql_seconds = time_loader(load_data, tables)
+        bulk_seconds = time_loader(bulk_load_data, tables)
+        print(f"{size:>10} {to_sql_seconds:>12.3f} {bulk_seconds:>10.3f} {to_sql_seconds / bulk_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
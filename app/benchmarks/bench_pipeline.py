@@ -0,0 +1,206 @@
+"""
+End-to-end benchmark of the pipeline against the local mock API.
+
+Starts `benchmarks.mock_api` with synthetic data at the requested scale, runs
+`main()` against it in a temporary directory and reports throughput, HTTP
+latency percentiles, and time and memory for each stage, taken from the run
+report written by `etl.metrics`. The results are compared with a stored
+baseline and the script exits with status 1 on a regression.
+
+Run from the repository root:
+    PYTHONPATH=app python -m benchmarks.bench_pipeline --competitions 200 --teams 100 --mode concurrent
+    PYTHONPATH=app python -m benchmarks.bench_pipeline --update-baseline
+
+With `--keys N` the pipeline runs with a pool of N API keys, each held by the mock API
+to `--key-quota` requests per minute, to measure how the throughput scales with keys:
+    PYTHONPATH=app python -m benchmarks.bench_pipeline --keys 4 --quota 60 --key-quota 60
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+from benchmarks.mock_api import MockFootballData, MockServer
+from main import main as run_main, parse_args
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Metrics where a higher value is better; every other metric is better when lower
+HIGHER_IS_BETTER = {"team_rows_per_second", "match_rows_per_second"}
+
+MODES = {
+    "sequential": [],
+    "concurrent": ["--concurrent"],
+    "stream": ["--stream", "--concurrent"],
+    "raw-ingest": ["--concurrent", "--raw-ingest"],
+    "matches": ["--concurrent", "--matches", "--seasons", "2022", "2023", "2024"],
+}
+
+
+def run_pipeline(api_url: str, pipeline_args: list, quota: int, keys: int = 1) -> dict:
+    """
+    Runs `main()` against a mock API in a temporary working directory.
+    Args:
+        api_url (str): The competitions endpoint of the mock API.
+        pipeline_args (list): Command line options passed to `parse_args()`.
+        quota (int): Requests per minute allowed by the client-side rate limiter, per key.
+        keys (int): Number of API keys; several keys are used through a KeyPool.
+    Returns:
+        dict: The JSON run report written by the pipeline.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, patch.multiple(
+        "etl.extract",
+        API_URL=api_url,
+        API_KEY="benchmark",
+        API_KEYS=[f"benchmark-{index}" for index in range(keys)] if keys > 1 else [],
+        HEADERS={"X-Auth-Token": "benchmark"},
+        REQUESTS_PER_MINUTE=quota,
+    ):
+        os.chdir(workdir)
+        try:
+            run_main(parse_args(pipeline_args + ["--metrics-dir", "reports"]))
+            [report_path] = glob.glob(os.path.join("reports", "*.json"))
+            with open(report_path, encoding="utf-8") as file:
+                return json.load(file)
+        finally:
+            os.chdir(cwd)
+
+
+def summarize(report: dict) -> dict:
+    """
+    Extracts the benchmark metrics from a run report.
+    Args:
+        report (dict): The JSON run report of the pipeline.
+    Returns:
+        dict: Flat mapping of metric name to value.
+    """
+    team_rows = report["rows_written"].get("fact_competitions", 0)
+    latency = report["http"]["latency_seconds"]
+    summary = {
+        "duration_seconds": report["duration_seconds"],
+        "team_rows_per_second": team_rows / report["duration_seconds"] if report["duration_seconds"] else 0.0,
+        "http_latency_p50_seconds": latency["p50"],
+        "http_latency_p95_seconds": latency["p95"],
+        "peak_rss_mb": (report["peak_rss_bytes"] or 0) / 2**20,
+    }
+    if "fact_matches" in report["rows_written"]:
+        matches_seconds = report["stages"]["matches"]["wall_seconds"]
+        summary["match_rows_per_second"] = report["rows_written"]["fact_matches"] / matches_seconds if matches_seconds else 0.0
+    for stage, totals in report["stages"].items():
+        summary[f"{stage}_wall_seconds"] = totals["wall_seconds"]
+        summary[f"{stage}_cpu_seconds"] = totals["cpu_seconds"]
+        if totals.get("peak_rss_bytes"):
+            summary[f"{stage}_peak_rss_mb"] = totals["peak_rss_bytes"] / 2**20
+    return summary
+
+
+def find_regressions(summary: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compares a benchmark summary with its baseline.
+    Args:
+        summary (dict): The metrics of the current run.
+        baseline (dict): The stored metrics of the same scenario.
+        tolerance (float): Allowed ratio between the current and baseline values, e.g. 1.5.
+    Returns:
+        list: One message per metric that got worse than the tolerance allows.
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        current = summary.get(name)
+        if current is None or not expected:
+            continue
+        if name in HIGHER_IS_BETTER:
+            regressed = current < expected / tolerance
+        else:
+            regressed = current > expected * tolerance
+        if regressed:
+            regressions.append(f"{name}: {current:.4g} (baseline {expected:.4g}, tolerance {tolerance}x)")
+    return regressions
+
+
+def scenario_key(args) -> str:
+    key = (
+        f"mode={args.mode},competitions={args.competitions},teams={args.teams},squad={args.squad_size},"
+        f"latency={args.latency},error_rate={args.error_rate},workers={args.workers}"
+    )
+    # Single-key scenarios keep the keys of the baselines recorded before key pools
+    if args.keys > 1 or args.key_quota:
+        key += f",keys={args.keys},quota={args.quota},key_quota={args.key_quota}"
+    return key
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against a mock API")
+    parser.add_argument("--competitions", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=100, help="Teams per competition")
+    parser.add_argument("--squad-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of requests answered with a 429")
+    parser.add_argument("--mode", choices=sorted(MODES), default="concurrent")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--quota", type=int, default=1_000_000, help="Client-side requests per minute of each key")
+    parser.add_argument("--keys", type=int, default=1, help="Number of API keys in the pool")
+    parser.add_argument("--key-quota", type=int, default=None, help="Requests per minute the mock API allows each key")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+
+    data = MockFootballData(
+        args.competitions,
+        args.teams,
+        args.squad_size,
+        args.latency,
+        args.error_rate,
+        retry_after=0.01,
+        key_quota=args.key_quota,
+    )
+    with MockServer(data) as server:
+        report = run_pipeline(
+            server.api_url, MODES[args.mode] + ["--workers", str(args.workers)], args.quota, args.keys
+        )
+
+    summary = summarize(report)
+    print(f"Scenario: {scenario_key(args)}")
+    print(f"Mock API: {data.requests} requests, {data.rate_limited} answered with 429")
+    for api_key, counts in sorted(report["http"].get("requests_by_key", {}).items()):
+        print(f"  {api_key:<32} {counts}")
+    for name, value in summary.items():
+        print(f"  {name:<32} {value:>12.4f}" if value is not None else f"  {name:<32} {'n/a':>12}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baselines = json.load(file)
+
+    key = scenario_key(args)
+    if args.update_baseline:
+        baselines[key] = summary
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        print(f"Baseline updated in {args.baseline}")
+        return 0
+
+    if key not in baselines:
+        print("No baseline stored for this scenario, run with --update-baseline to record one")
+        return 0
+
+    regressions = find_regressions(summary, baselines[key], args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print("No regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark of the raw-ingest path of the extract step.
+
+Compares `fetch_data()` (decode the body to text, write it, parse it whole) with
+`download_raw()` + `iter_team_fields()` (stream the bytes to disk, parse only the
+team fields) on one synthetic teams payload, reporting wall time and the peak traced
+memory of the client side. The HTTP session is replaced by an in-memory response, so
+the network and the server are left out of the measurement.
+
+Run from the repository root:
+    PYTHONPATH=app python -m benchmarks.bench_raw_ingest --teams 500 2000 --squad-size 40
+"""
+import argparse
+import gc
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from benchmarks.mock_api import MockFootballData
+from etl import extract
+from etl.extract import build_team_rows, download_raw, fetch_data, iter_team_fields
+
+COMPETITION = {"id": 2000, "name": "Competition 0", "code": "C0"}
+
+
+def make_session(body: bytes) -> MagicMock:
+    """Returns a session whose get() answers every request with `body`, as a real Response."""
+
+    def get(url, headers=None, timeout=None, stream=False):
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response.raw = io.BytesIO(body)
+        if not stream:
+            response.content  # reads the whole body, like requests does without stream=True
+        return response
+
+    session = MagicMock()
+    session.get.side_effect = get
+    return session
+
+
+def default_path() -> int:
+    teams_data = fetch_data("http://mock/teams", "teams_C0.json")
+    return len(build_team_rows(COMPETITION, teams_data.get("teams", [])))
+
+
+def raw_ingest_path() -> int:
+    file_path = download_raw("http://mock/teams", "teams_C0.json")
+    return len(build_team_rows(COMPETITION, iter_team_fields(file_path)))
+
+
+def measure(path) -> dict:
+    """Runs an extract path twice: once timed, once under tracemalloc to get its peak allocation."""
+    gc.collect()
+    start = time.perf_counter()
+    rows = path()
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    path()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rows": rows, "seconds": seconds, "peak_mb": peak / 2**20}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the raw-ingest extract path")
+    parser.add_argument("--teams", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--squad-size", type=int, default=40)
+    args = parser.parse_args(argv)
+
+    parsers = [name for name in ("orjson", "ijson") if getattr(extract, name) is not None] or ["json"]
+    print(f"Parsers available: {', '.join(parsers)}")
+    print(f"{'teams':>7} {'payload (MB)':>13} {'path':>12} {'time (s)':>9} {'peak (MB)':>10}")
+    for teams in args.teams:
+        data = MockFootballData(competitions=1, teams_per_competition=teams, squad_size=args.squad_size)
+        body = json.dumps({"count": teams, "teams": data.teams["C0"]}).encode("utf-8")
+
+        with tempfile.TemporaryDirectory() as folder, patch.multiple(
+            "etl.extract", DATA_FOLDER=folder, API_KEY="benchmark", get_session=lambda: make_session(body)
+        ):
+            for name, path in (("default", default_path), ("raw-ingest", raw_ingest_path)):
+                result = measure(path)
+                print(
+                    f"{teams:>7} {len(body) / 2**20:>13.1f} {name:>12} "
+                    f"{result['seconds']:>9.3f} {result['peak_mb']:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
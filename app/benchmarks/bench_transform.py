@@ -0,0 +1,94 @@
+"""
+Benchmark of the transform paths.
+
+Compares `transform_data()` with `transform_data_compact()` on synthetic extract
+output, reporting wall time, peak traced memory during the transform and the
+deep memory size of the resulting DataFrames. With `--workers`, both transforms
+also run through `transform_data_parallel()` with each number of processes; their
+peak memory only covers the parent process.
+
+Run from the repository root:
+    PYTHONPATH=app python -m benchmarks.bench_transform --rows 1000000 --workers 2 4 8
+"""
+import argparse
+import functools
+import gc
+import time
+import tracemalloc
+
+from etl.transform import transform_data, transform_data_compact, transform_data_parallel
+
+
+def make_extract_output(rows: int, teams: int = None, competitions: int = None) -> tuple:
+    """
+    Builds synthetic (competitions, all_teams) lists shaped like the output of `extract_data()`.
+    Args:
+        rows (int): Number of team rows.
+        teams (int, optional): Number of distinct teams. Defaults to rows / 20.
+        competitions (int, optional): Number of competitions. Defaults to rows / 2000.
+    Returns:
+        tuple: The competitions and all_teams lists.
+    """
+    teams = teams or max(1, rows // 20)
+    competitions = competitions or max(1, rows // 2000)
+
+    competition_list = [{"id": 2000 + i, "name": f"Competition {i}", "code": f"C{i}"} for i in range(competitions)]
+    all_teams = [
+        {
+            "competition_id": 2000 + i % competitions,
+            "competition_name": f"Competition {i % competitions}",
+            "team_id": (i * 7919) % teams,
+            "team_name": f"Team {(i * 7919) % teams}",
+        }
+        for i in range(rows)
+    ]
+    return competition_list, all_teams
+
+
+def frames_size(frames) -> int:
+    """Returns the deep memory size, in bytes, of a tuple of DataFrames."""
+    return sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+
+
+def measure(transform, competitions, all_teams) -> dict:
+    """Runs a transform twice: once timed, once under tracemalloc to get its peak allocation."""
+    gc.collect()
+    start = time.perf_counter()
+    frames = transform(competitions, all_teams)
+    seconds = time.perf_counter() - start
+    size = frames_size(frames)
+    del frames
+
+    gc.collect()
+    tracemalloc.start()
+    transform(competitions, all_teams)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_mb": peak / 2**20, "result_mb": size / 2**20}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the transform paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--workers", type=int, nargs="*", default=[], help="Process counts of the parallel transform")
+    args = parser.parse_args(argv)
+
+    transforms = [(transform.__name__, transform) for transform in (transform_data, transform_data_compact)]
+    for workers in args.workers:
+        for name, transform in transforms[:2]:
+            parallel = functools.partial(transform_data_parallel, transform=transform, max_workers=workers, min_rows=0)
+            transforms.append((f"{name} x{workers}", parallel))
+
+    print(f"{'rows':>10} {'transform':>28} {'time (s)':>9} {'peak (MB)':>10} {'result (MB)':>12}")
+    for rows in args.rows:
+        competitions, all_teams = make_extract_output(rows)
+        for name, transform in transforms:
+            result = measure(transform, competitions, all_teams)
+            print(
+                f"{rows:>10} {name:>28} {result['seconds']:>9.2f} "
+                f"{result['peak_mb']:>10.1f} {result['result_mb']:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Local stand-in for the football-data.org v4 API.
+
+Serves `/v4/competitions`, `/v4/competitions/{code}/teams` and the paginated
+`/v4/competitions/{code}/matches` from synthetic data generated at a configurable scale, with optional injected latency and
+429 responses, a per-key quota and revoked keys, so the pipeline can be benchmarked end to end without a quota.
+
+Run standalone from the repository root:
+    PYTHONPATH=app python -m benchmarks.mock_api --competitions 200 --teams 100 --port 8080
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TEAMS_PATH = re.compile(r"^/v4/competitions/(?P<code>[^/]+)/teams/?$")
+MATCHES_PATH = re.compile(r"^/v4/competitions/(?P<code>[^/]+)/matches/?$")
+CURRENT_SEASON = 2024
+
+
+class MockFootballData:
+    """
+    Synthetic football-data.org dataset and fault-injection settings.
+
+    Args:
+        competitions (int): Number of competitions.
+        teams_per_competition (int): Number of teams of each competition.
+        squad_size (int): Players per team, to make payloads as heavy as the real ones.
+        latency (float): Seconds added before every response.
+        error_rate (float): Probability of answering a request with a 429.
+        retry_after (float): Value of the Retry-After header of injected 429s.
+        seed (int): Seed of the random generator.
+        matches_per_season (int): Matches of each competition and season, served with
+            `limit`/`offset` pagination and `season`/`dateFrom`/`dateTo` filters.
+        key_quota (int, optional): Requests per minute allowed to each X-Auth-Token; the
+            requests above it are answered with a 429 until the minute is over.
+        revoked_keys (iterable, optional): Tokens answered with the 400 of an invalid token.
+    """
+
+    def __init__(
+        self,
+        competitions: int = 13,
+        teams_per_competition: int = 20,
+        squad_size: int = 25,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int = 0,
+        matches_per_season: int = 380,
+        key_quota: int = None,
+        revoked_keys=(),
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.matches_per_season = matches_per_season
+        self.key_quota = key_quota
+        self.revoked_keys = set(revoked_keys)
+        self._key_windows = {}
+        self.requests_by_key = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+
+        # Half of the teams of a competition also play in the next one, like cup competitions
+        self.competitions = [
+            {
+                "id": 2000 + i,
+                "name": f"Competition {i}",
+                "code": f"C{i}",
+                "type": "LEAGUE",
+                "lastUpdated": "2024-09-13T16:51:24Z",
+                "currentSeason": {"id": 5000 + i, "startDate": "2024-08-01", "endDate": "2025-05-31"},
+            }
+            for i in range(competitions)
+        ]
+        self.teams = {}
+        for i, competition in enumerate(self.competitions):
+            first_team = i * (teams_per_competition // 2)
+            self.teams[competition["code"]] = [
+                self._team(first_team + j, squad_size) for j in range(teams_per_competition)
+            ]
+
+    @staticmethod
+    def _team(team_id: int, squad_size: int) -> dict:
+        return {
+            "id": 100000 + team_id,
+            "name": f"Team {team_id} FC",
+            "shortName": f"Team {team_id}",
+            "tla": f"T{team_id % 1000:03d}",
+            "founded": 1900 + team_id % 120,
+            "venue": f"Stadium {team_id}",
+            "squad": [
+                {"id": team_id * 100 + k, "name": f"Player {team_id}-{k}", "position": "Midfield"}
+                for k in range(squad_size)
+            ],
+        }
+
+    def matches(self, code: str, season: int) -> list:
+        """
+        Returns the matches of a competition and season (the year it starts), ordered by date:
+        a few matches every three days from August 1st, between the teams of the competition.
+        """
+        index = int(code[1:])
+        teams = self.teams[code]
+        per_round = max(1, len(teams) // 2)
+        first_day = date(season, 8, 1)
+        matches = []
+        for i in range(self.matches_per_season):
+            home = teams[i % len(teams)]
+            away = teams[(i + 1 + (i // len(teams)) % max(1, len(teams) - 1)) % len(teams)]
+            home_goals, away_goals = i % 4, (i // 4) % 3
+            winner = "HOME_TEAM" if home_goals > away_goals else "AWAY_TEAM" if away_goals > home_goals else "DRAW"
+            matches.append({
+                "id": (index * 100 + season % 100) * 10000 + i,
+                "utcDate": f"{first_day + timedelta(days=3 * (i // per_round))}T15:00:00Z",
+                "status": "FINISHED",
+                "matchday": i // per_round + 1,
+                "stage": "REGULAR_SEASON",
+                "season": {"id": 5000 + index, "startDate": first_day.isoformat()},
+                "homeTeam": {"id": home["id"], "name": home["name"]},
+                "awayTeam": {"id": away["id"], "name": away["name"]},
+                "score": {"winner": winner, "fullTime": {"home": home_goals, "away": away_goals}},
+                "lastUpdated": "2024-09-13T16:51:24Z",
+            })
+        return matches
+
+    def should_rate_limit(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            limited = self._random.random() < self.error_rate
+            self.rate_limited += limited
+            return limited
+
+    def check_key(self, token: str) -> tuple:
+        """
+        Counts a request of an API key against its quota.
+        Returns:
+            tuple: The (status, payload, headers) of the error answered to the key, or None
+            when the request can be served.
+        """
+        with self._lock:
+            self.requests_by_key[token] = self.requests_by_key.get(token, 0) + 1
+            if token in self.revoked_keys:
+                return 400, {"message": "Your API token is invalid.", "errorCode": 400}, {}
+            if not self.key_quota:
+                return None
+            now = time.monotonic()
+            started, count = self._key_windows.get(token, (now, 0))
+            if now - started >= 60:
+                started, count = now, 0
+            self._key_windows[token] = (started, count + 1)
+            if count < self.key_quota:
+                return None
+            reset = max(0.0, 60 - (now - started))
+            self.rate_limited += 1
+            return 429, {"message": "Too many requests", "errorCode": 429}, {
+                "X-RequestsAvailable-Minute": "0",
+                "X-RequestCounter-Reset": f"{reset:.3f}",
+            }
+
+    def response_for(self, path: str) -> tuple:
+        """Returns the (status, payload) of a GET request path, query string included."""
+        url = urlsplit(path)
+        path, query = url.path, {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if path.rstrip("/") == "/v4/competitions":
+            return 200, {"count": len(self.competitions), "filters": {}, "competitions": self.competitions}
+
+        match = TEAMS_PATH.match(path)
+        if match and match.group("code") in self.teams:
+            teams = self.teams[match.group("code")]
+            return 200, {"count": len(teams), "filters": {}, "teams": teams}
+
+        match = MATCHES_PATH.match(path)
+        if match and match.group("code") in self.teams:
+            matches = self.matches(match.group("code"), int(query.get("season", CURRENT_SEASON)))
+            if "dateFrom" in query and "dateTo" in query:
+                matches = [m for m in matches if query["dateFrom"] <= m["utcDate"][:10] <= query["dateTo"]]
+            offset = int(query.get("offset", 0))
+            limit = int(query.get("limit", len(matches) or 1))
+            page = matches[offset:offset + limit]
+            return 200, {
+                "filters": query,
+                "resultSet": {"count": len(matches), "played": len(matches)},
+                "matches": page,
+            }
+
+        return 404, {"message": "Resource not found", "errorCode": 404}
+
+
+def make_handler(data: MockFootballData):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if data.latency:
+                time.sleep(data.latency)
+
+            key_error = data.check_key(self.headers.get("X-Auth-Token", ""))
+            if key_error:
+                status, payload, extra_headers = key_error
+            elif data.should_rate_limit():
+                status, payload = 429, {"message": "Too many requests", "errorCode": 429}
+                extra_headers = {
+                    "Retry-After": str(data.retry_after),
+                    "X-RequestsAvailable-Minute": "0",
+                }
+            else:
+                status, payload = data.response_for(self.path)
+                extra_headers = {}
+
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in extra_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class MockServer:
+    """
+    Runs a MockFootballData dataset on a local HTTP server in a background thread.
+    Use it as a context manager; `api_url` is the competitions endpoint to point the
+    extractor at.
+    """
+
+    def __init__(self, data: MockFootballData, host: str = "127.0.0.1", port: int = 0):
+        self.data = data
+        self.server = ThreadingHTTPServer((host, port), make_handler(data))
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v4/competitions"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local football-data.org v4 stand-in")
+    parser.add_argument("--competitions", type=int, default=13)
+    parser.add_argument("--teams", type=int, default=20, help="Teams per competition")
+    parser.add_argument("--squad-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--matches", type=int, default=380, help="Matches per competition and season")
+    parser.add_argument("--key-quota", type=int, default=None, help="Requests per minute of each API key")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    data = MockFootballData(
+        args.competitions,
+        args.teams,
+        args.squad_size,
+        args.latency,
+        args.error_rate,
+        matches_per_season=args.matches,
+        key_quota=args.key_quota,
+    )
+    with MockServer(data, port=args.port) as server:
+        print(f"Serving mock football-data API at {server.api_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
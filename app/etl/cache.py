@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_FOLDER = "data/cache"
+CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))
+
+
+def _write_atomic(path: str, content: str):
+    """Writes a file through a temporary file and a rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """
+    Persistent cache of API responses used to send conditional requests.
+
+    Every cached URL is stored as two files inside `folder`: the response body and a
+    metadata file holding the URL, its validators (`ETag` / `Last-Modified`) and the
+    time it was last confirmed with the server. The cache lives outside DATA_FOLDER,
+    so it survives `drop_data()`.
+
+    Args:
+        folder (str): Directory where the cache files are stored.
+        ttl (int): Number of seconds a response is served from disk without asking the server.
+    """
+
+    def __init__(self, folder: str = CACHE_FOLDER, ttl: int = CACHE_TTL):
+        self.folder = folder
+        self.ttl = ttl
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        base = os.path.join(self.folder, key)
+        return f"{base}.body", f"{base}.meta.json"
+
+    def get(self, url: str) -> dict:
+        """
+        Returns the metadata stored for a URL.
+        Args:
+            url (str): The requested URL.
+        Returns:
+            dict: The cache metadata, or None if the URL is not cached or its files are unreadable.
+        """
+        body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Tells whether an entry is younger than the TTL and can be served without a request."""
+        return entry is not None and time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def conditional_headers(self, entry: dict) -> dict:
+        """
+        Builds the validator headers of a conditional request for a cached entry.
+        Args:
+            entry (dict): The cache metadata returned by `get()`, or None.
+        Returns:
+            dict: `If-None-Match` and/or `If-Modified-Since` headers, empty when nothing is cached.
+        """
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def body_path(self, url: str) -> str:
+        """Returns the path of the file holding the cached response body of a URL."""
+        return self._paths(url)[0]
+
+    def read(self, url: str) -> str:
+        """Returns the cached response body of a URL."""
+        body_path, _ = self._paths(url)
+        with open(body_path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    def store(self, url: str, body: str, headers) -> None:
+        """
+        Stores a fresh 200 response.
+        Args:
+            url (str): The requested URL.
+            body (str): The response body.
+            headers (Mapping): The response headers, where validators are looked up.
+        """
+        body_path, _ = self._paths(url)
+        _write_atomic(body_path, body)
+        self._write_meta(url, headers.get("ETag"), headers.get("Last-Modified"))
+        logger.debug(f"Cached response for {url}")
+
+    def store_file(self, url: str, path: str, headers) -> None:
+        """
+        Stores a fresh 200 response whose body was already written to `path`, by copying
+        the file instead of holding the body in memory.
+        """
+        body_path, _ = self._paths(url)
+        tmp_path = f"{body_path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, body_path)
+        self._write_meta(url, headers.get("ETag"), headers.get("Last-Modified"))
+        logger.debug(f"Cached response for {url}")
+
+    def touch(self, url: str, headers) -> None:
+        """
+        Marks a cached response as confirmed by the server after a 304 Not Modified.
+        Validators sent with the 304 replace the stored ones.
+        """
+        entry = self.get(url) or {}
+        self._write_meta(
+            url,
+            headers.get("ETag") or entry.get("etag"),
+            headers.get("Last-Modified") or entry.get("last_modified"),
+        )
+
+    def _write_meta(self, url: str, etag: str, last_modified: str) -> None:
+        _, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        _write_atomic(meta_path, json.dumps(meta))
@@ -0,0 +1,189 @@
+import os
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv("DB_PATH", "db/football_data.sqlite")
+SQLITE_FOREIGN_KEYS = os.getenv("SQLITE_FOREIGN_KEYS", "false").lower() in ("1", "true", "yes")
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+# Negative values are a size in KiB, positive values a number of pages
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+SQLITE_READER_POOL_SIZE = int(os.getenv("SQLITE_READER_POOL_SIZE", "4"))
+
+
+def apply_pragmas(
+    conn,
+    journal_mode: str = SQLITE_JOURNAL_MODE,
+    synchronous: str = SQLITE_SYNCHRONOUS,
+    cache_size: int = SQLITE_CACHE_SIZE,
+):
+    """
+    Applies the performance settings of a bulk load to an SQLite connection.
+    Args:
+        conn (sqlite3.Connection): The connection to configure.
+        journal_mode (str): Journal mode, e.g. 'WAL', 'DELETE' or 'MEMORY'. Note that WAL is
+            persisted in the database file.
+        synchronous (str): Synchronous level, e.g. 'OFF', 'NORMAL' or 'FULL'.
+        cache_size (int): Page cache size, in pages or in KiB when negative.
+    """
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute(f"PRAGMA cache_size={int(cache_size)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    logger.debug(
+        f"Applied pragmas journal_mode={journal_mode}, synchronous={synchronous}, cache_size={cache_size}"
+    )
+
+
+def connect_db(foreign_keys: bool = SQLITE_FOREIGN_KEYS):
+    """
+    Opens a connection to the warehouse database.
+    Args:
+        foreign_keys (bool): Enforce the foreign keys declared on fact_competitions.
+            SQLite only enforces them on connections that enable the pragma.
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+class ConnectionManager:
+    """
+    Shares the SQLite connections of a pipeline run between its stages.
+
+    The writer connection is opened on first use, with the foreign-key setting and the
+    performance pragmas of `apply_pragmas()`, and kept open until `close()`, so every
+    stage runs with the same settings without reopening the database. Read-only queries
+    borrow a connection from a pool of at most `pool_size` readers, which may be used
+    from several threads at once; in WAL mode they do not block the writer.
+
+    Use it as a context manager, or call `close()` once the run is over.
+
+    Args:
+        path (str): Path of the database file; its directory is created if needed.
+        foreign_keys (bool): Enforce the declared foreign keys on the writer connection.
+        journal_mode (str): Journal mode, see `apply_pragmas()`.
+        synchronous (str): Synchronous level, see `apply_pragmas()`.
+        cache_size (int): Page cache size of every connection, see `apply_pragmas()`.
+        pool_size (int): Maximum number of reader connections.
+    """
+
+    def __init__(
+        self,
+        path: str = DB_PATH,
+        foreign_keys: bool = SQLITE_FOREIGN_KEYS,
+        journal_mode: str = SQLITE_JOURNAL_MODE,
+        synchronous: str = SQLITE_SYNCHRONOUS,
+        cache_size: int = SQLITE_CACHE_SIZE,
+        pool_size: int = SQLITE_READER_POOL_SIZE,
+    ):
+        self.path = path
+        self.foreign_keys = foreign_keys
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.pool_size = max(1, pool_size)
+        self._writer = None
+        self._readers = queue.LifoQueue()
+        self._opened_readers = 0
+        self._lock = threading.Lock()
+
+    def writer(self) -> sqlite3.Connection:
+        """Returns the writer connection, opening and configuring it on first use."""
+        with self._lock:
+            if self._writer is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._writer = sqlite3.connect(self.path)
+                if self.foreign_keys:
+                    self._writer.execute("PRAGMA foreign_keys = ON")
+                apply_pragmas(self._writer, self.journal_mode, self.synchronous, self.cache_size)
+                logger.info(f"Opened database {self.path}")
+            return self._writer
+
+    def _open_reader(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrows a read-only connection from the pool for the duration of the block.
+        A new reader is opened while the pool holds fewer than `pool_size`; past that,
+        the block waits for another thread to give one back.
+        Yields:
+            sqlite3.Connection: A connection on which writes raise an error.
+        """
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened_readers < self.pool_size
+                if can_open:
+                    self._opened_readers += 1
+            conn = self._open_reader() if can_open else self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def close(self):
+        """Closes the writer and every pooled reader."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._opened_readers = 0
+        logger.debug("Database connections closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@contextmanager
+def session(db: ConnectionManager = None):
+    """
+    Yields the writer connection of `db`, or a new connection closed on exit when `db` is None.
+    If the block fails, its uncommitted changes are rolled back, so a shared connection is
+    left ready for the next stage.
+    """
+    conn = db.writer() if db else connect_db()
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if db is None:
+            conn.close()
+            logger.debug("Database connection closed")
+
+
+@contextmanager
+def reading(db: ConnectionManager = None):
+    """Yields a pooled reader of `db`, or a new connection closed on exit when `db` is None."""
+    if db:
+        with db.reader() as conn:
+            yield conn
+        return
+
+    conn = connect_db()
+    try:
+        yield conn
+    finally:
+        conn.close()
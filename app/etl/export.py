@@ -0,0 +1,266 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - optional dependency
+    pl = None
+
+from .load import QUERY_CHUNK_SIZE, SQLiteBackend
+from .metrics import current_metrics
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FOLDER = "output"
+EXPORT_FORMATS = ("csv", "parquet", "ndjson")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "4"))
+# Queries of the reports; the summary is the summary_query of the warehouse backend
+REPORTS = {
+    "summary": None,
+    "team_competitions": """
+        SELECT t.id AS team_id, t.name AS team, COUNT(*) AS competitions
+        FROM dim_teams t
+        JOIN fact_competitions f ON f.team_id = t.id
+        GROUP BY t.id, t.name
+        ORDER BY t.id
+    """,
+    "competition_teams": """
+        SELECT c.name AS competition, t.id AS team_id, t.name AS team
+        FROM fact_competitions f
+        JOIN dim_competitions c ON c.id = f.competition_id
+        JOIN dim_teams t ON t.id = f.team_id
+        ORDER BY f.competition_id, f.team_id
+    """,
+    "season_matches": """
+        SELECT c.name AS competition, m.season_id AS season, COUNT(*) AS matches,
+               SUM(CASE WHEN m.status = 'FINISHED' THEN 1 ELSE 0 END) AS finished,
+               SUM(m.home_score + m.away_score) AS goals
+        FROM fact_matches m
+        JOIN dim_competitions c ON c.id = m.competition_id
+        GROUP BY c.name, m.season_id
+        ORDER BY c.name, m.season_id
+    """,
+}
+
+
+# Tables the polars engine reads to aggregate the summary itself
+SUMMARY_TABLES = {
+    "dim_competitions": "SELECT id, name FROM dim_competitions",
+    "fact_competitions": "SELECT competition_id, team_id FROM fact_competitions",
+}
+
+
+def report_path(name: str, file_format: str, folder: str = EXPORT_FOLDER) -> str:
+    """Returns the path of a report file, e.g. output/summary.csv."""
+    return os.path.join(folder, f"{name}.{file_format}")
+
+
+def _write_chunks(chunks, path: str, file_format: str) -> int:
+    """Writes DataFrame chunks to a file one at a time, and returns the number of rows."""
+    rows = 0
+    if file_format == "parquet":
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                else:
+                    # A later chunk may infer other types, e.g. floats for an integer column holding NULLs
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        for index, chunk in enumerate(chunks):
+            if file_format == "csv":
+                chunk.to_csv(file, header=index == 0, index=False)
+            elif len(chunk):
+                file.write(chunk.to_json(orient="records", lines=True))
+            rows += len(chunk)
+    return rows
+
+
+def export_query(
+    sql: str,
+    path: str,
+    file_format: str = "csv",
+    backend=None,
+    chunk_size: int = QUERY_CHUNK_SIZE,
+) -> int:
+    """
+    Streams the result of a query to a CSV, Parquet or NDJSON (one JSON object per line) file.
+    The result is fetched `chunk_size` rows at a time and each chunk is written before the
+    next one is read, so memory does not grow with the report. The file is written under a
+    temporary name in the same directory and renamed once complete: readers see either the
+    previous file or the new one, never a partial file, and a failed export leaves the
+    previous file in place.
+    Args:
+        sql (str): Query to export.
+        path (str): Path of the file; its directory is created if needed.
+        file_format (str): 'csv', 'parquet' or 'ndjson'.
+        backend (optional): Warehouse backend returned by `get_backend()`. Defaults to SQLite.
+        chunk_size (int): Rows fetched and written at a time.
+    Returns:
+        int: Number of rows exported.
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format is 'parquet' and pyarrow is not installed.
+    """
+    backend = backend or SQLiteBackend()
+    return _export_chunks(backend.iter_query(sql, chunk_size=chunk_size), path, file_format)
+
+
+def _export_chunks(chunks, path: str, file_format: str) -> int:
+    """
+    Writes DataFrame chunks to `path` through a temporary file renamed once complete, see
+    `export_query()`, and closes the chunk generator when done.
+    """
+    try:
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {file_format!r}, expected one of {EXPORT_FORMATS}")
+        if file_format == "parquet" and pq is None:
+            raise ImportError("The parquet export format requires pyarrow")
+
+        folder = os.path.dirname(path) or "."
+        os.makedirs(folder, exist_ok=True)
+        # Unique per process and thread, so concurrent exports of the same file do not share it
+        tmp_path = os.path.join(folder, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            rows = _write_chunks(chunks, tmp_path, file_format)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    finally:
+        # Gives the connection back as soon as the export stops, even when it failed
+        chunks.close()
+    logger.info(f"Exported {rows} rows to {path}")
+    return rows
+
+
+def iter_summary_polars(backend=None, chunk_size: int = QUERY_CHUNK_SIZE):
+    """
+    Computes the summary report with Polars instead of the summary_query of the warehouse.
+    The SUMMARY_TABLES are read from the warehouse in chunks of `chunk_size` rows, and the
+    join, the count of teams per competition name and the sort run as one lazy,
+    multi-threaded Polars query. The facts are scanned whatever the backend, whereas the
+    SQLite summary_query reads the materialized agg_competition_teams table. Like the
+    summary_query, competitions with as many teams are sorted by name.
+    Args:
+        backend (optional): Warehouse backend returned by `get_backend()`. Defaults to SQLite.
+        chunk_size (int): Rows fetched at a time.
+    Yields:
+        DataFrame: The summary, with the columns and dtypes of the summary_query, as a single chunk.
+    Raises:
+        ImportError: If polars is not installed.
+    """
+    if pl is None:
+        raise ImportError("The polars engine requires polars")
+    backend = backend or SQLiteBackend()
+    schemas = {
+        "dim_competitions": {"id": pl.Int64, "name": pl.String},
+        "fact_competitions": {"competition_id": pl.Int64, "team_id": pl.Int64},
+    }
+    frames = {}
+    for table, sql in SUMMARY_TABLES.items():
+        # The empty last chunk has no inferred dtypes: give every chunk the schema of the table
+        frames[table] = pl.concat([pl.DataFrame(schema=schemas[table])] + [
+            pl.from_pandas(chunk, schema_overrides=schemas[table])
+            for chunk in backend.iter_query(sql, chunk_size=chunk_size)
+            if len(chunk)
+        ])
+    summary = (
+        frames["fact_competitions"].lazy()
+        .join(frames["dim_competitions"].lazy(), left_on="competition_id", right_on="id")
+        .group_by("name")
+        .agg(pl.col("team_id").count().cast(pl.Int64).alias("Number_of_Teams"))
+        .rename({"name": "Competition"})
+        .sort(["Number_of_Teams", "Competition"], descending=[True, False])
+        .collect()
+    )
+    if summary.is_empty():
+        # Like the empty result of a query, which has no inferred dtypes
+        yield pd.DataFrame(columns=summary.columns)
+    else:
+        yield summary.to_pandas()
+
+
+def export_report(
+    name: str,
+    file_format: str = "csv",
+    backend=None,
+    folder: str = EXPORT_FOLDER,
+    chunk_size: int = QUERY_CHUNK_SIZE,
+    engine: str = "pandas",
+) -> int:
+    """
+    Exports one of the REPORTS to `report_path()`, see `export_query()`. With the 'polars'
+    engine, the summary is aggregated by `iter_summary_polars()`.
+    Returns:
+        int: Number of rows exported.
+    Raises:
+        ValueError: If the report or the format is unknown.
+    """
+    if name not in REPORTS:
+        raise ValueError(f"Unknown report {name!r}, expected one of {sorted(REPORTS)}")
+    backend = backend or SQLiteBackend()
+    path = report_path(name, file_format, folder)
+    if name == "summary" and engine == "polars":
+        rows = _export_chunks(iter_summary_polars(backend, chunk_size), path, file_format)
+    else:
+        sql = REPORTS[name] or backend.summary_query
+        rows = export_query(sql, path, file_format, backend, chunk_size)
+    current_metrics().add_rows(f"export_{name}", rows)
+    return rows
+
+
+def export_reports(
+    names: list,
+    formats: list = ("csv",),
+    backend=None,
+    folder: str = EXPORT_FOLDER,
+    max_workers: int = EXPORT_WORKERS,
+    chunk_size: int = QUERY_CHUNK_SIZE,
+    engine: str = "pandas",
+) -> dict:
+    """
+    Exports several reports in several formats, in parallel threads. On SQLite, each
+    export reads from its own pooled reader connection, which does not block the others.
+    Args:
+        names (list): Names of REPORTS.
+        formats (list): Formats each report is written in, see EXPORT_FORMATS.
+        backend (optional): Warehouse backend returned by `get_backend()`. Defaults to SQLite.
+        folder (str): Directory of the report files.
+        max_workers (int): Number of exports running at once.
+        chunk_size (int): Rows fetched and written at a time by each export.
+        engine (str): 'polars' to aggregate the summary with Polars, see `iter_summary_polars()`.
+    Returns:
+        dict: Number of rows exported per file path.
+    """
+    backend = backend or SQLiteBackend()
+    jobs = [(name, file_format) for name in names for file_format in formats]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        counts = list(
+            executor.map(
+                lambda job: export_report(job[0], job[1], backend, folder, chunk_size, engine),
+                jobs,
+            )
+        )
+    return {report_path(name, file_format, folder): count for (name, file_format), count in zip(jobs, counts)}
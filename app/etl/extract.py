@@ -1,64 +1,545 @@
 import requests
+import json
 import time
 import os
+import random
 import shutil
+import socket
+import multiprocessing
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+from requests.adapters import HTTPAdapter
 
 from dotenv import load_dotenv
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from .cache import ResponseCache
+from .manifest import RunManifest
+from .metrics import current_metrics
+from .rate_limit import KeyPool, SlidingWindowLimiter
+from .state import CompetitionState
+from .work_queue import QUEUE_PATH, QUEUE_POLL_SECONDS, WorkQueue
+
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
 API_URL = "https://api.football-data.org/v4/competitions"
-API_KEY = os.getenv("API_KEY")
+# Comma-separated pool of keys, each with its own REQUESTS_PER_MINUTE quota, see KeyPool
+API_KEYS = [key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip()]
+API_KEY = os.getenv("API_KEY") or (API_KEYS[0] if API_KEYS else None)
 HEADERS = {"X-Auth-Token": API_KEY}
 DATA_FOLDER = "data/raw"
+REQUESTS_PER_MINUTE = int(os.getenv("REQUESTS_PER_MINUTE", "10"))
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("BACKOFF_BASE", "1"))
+BACKOFF_MAX = float(os.getenv("BACKOFF_MAX", "60"))
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+# football-data.org answers an invalid or revoked token with a 400 or 403 naming the token
+INVALID_KEY_MESSAGE = "token"
+# football-data.org documents the quota header with and without the inner hyphen
+REQUESTS_AVAILABLE_HEADERS = ("X-RequestsAvailable-Minute", "X-Requests-Available-Minute")
+REQUEST_COUNTER_RESET_HEADER = "X-RequestCounter-Reset"
+RAW_CHUNK_SIZE = 64 * 1024
+# Raw files above this size are parsed incrementally (with ijson) instead of whole
+INCREMENTAL_PARSE_BYTES = int(os.getenv("INCREMENTAL_PARSE_BYTES", str(8 * 1024 * 1024)))
+MATCHES_PAGE_SIZE = int(os.getenv("MATCHES_PAGE_SIZE", "500"))
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+# Monotonic time until which the requests sent with HEADERS wait, after a response reported
+# that the key has no requests left in the current minute
+_quota_reset_at = 0.0
+_quota_lock = threading.Lock()
+
+
+def build_rate_limiter(concurrent: bool = True, requests_per_minute: int = None):
+    """
+    Builds the client-side rate limiter shared by the requests of a run.
+    Args:
+        concurrent (bool): If False, a single key is not rate limited.
+        requests_per_minute (int, optional): Quota of each key. Defaults to REQUESTS_PER_MINUTE.
+    Returns:
+        KeyPool: When API_KEYS holds several keys, in sequential mode as well, so that
+            the requests are spread across the keys.
+        SlidingWindowLimiter: A REQUESTS_PER_MINUTE limiter for the single key in concurrent mode.
+        None: In sequential mode with a single key.
+    """
+    requests_per_minute = requests_per_minute or REQUESTS_PER_MINUTE
+    if len(API_KEYS) > 1:
+        return KeyPool(API_KEYS, requests_per_minute)
+    return SlidingWindowLimiter.per_minute(requests_per_minute) if concurrent else None
+
+
+def _key_rejected(response) -> bool:
+    """Returns True if the API refused the token of the request rather than the request."""
+    if response.status_code == 401:
+        return True
+    return response.status_code in (400, 403) and INVALID_KEY_MESSAGE in response.text.lower()
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the HTTP session shared by every API call of the process.
+    The session is created on first use and keeps a pool of keep-alive connections
+    large enough for the concurrent extraction workers, so consecutive requests reuse
+    the same TCP/TLS connection instead of opening a new one each time. A forked process,
+    e.g. a worker of `run_queue_worker()`, gets its own session rather than the sockets
+    of its parent.
+    Returns:
+        requests.Session: The shared, pooled session.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(MAX_WORKERS, 10))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            _session_pid = os.getpid()
+            logger.debug("Created pooled HTTP session")
+    return _session
+
+
+def _parse_retry_after(value: str) -> float:
+    """Converts a Retry-After header (seconds or HTTP date) into seconds to wait."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 
-def fetch_data(url: str, file_name: str) -> dict:
+def get_retry_delay(response, attempt: int) -> float:
+    """
+    Computes how long to wait before retrying a failed request.
+    The delay is taken, in order of preference, from:
+    1. The `Retry-After` header.
+    2. The `X-RequestCounter-Reset` header, when the response is a 429 or reports
+       no requests left in the current minute.
+    3. A jittered exponential backoff ("full jitter") capped at BACKOFF_MAX.
+    Args:
+        response (requests.Response): The failed response, or None on a connection error.
+        attempt (int): Zero-based number of the attempt that just failed.
+    Returns:
+        float: The number of seconds to wait.
+    """
+    headers = response.headers if response is not None else {}
+
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        delay = _parse_retry_after(retry_after)
+        if delay is not None:
+            return delay
+
+    available = next((headers[name] for name in REQUESTS_AVAILABLE_HEADERS if name in headers), None)
+    reset = headers.get(REQUEST_COUNTER_RESET_HEADER)
+    if reset and (response.status_code == 429 or available == "0"):
+        try:
+            # Small jitter so concurrent workers do not all fire on the same second
+            return float(reset) + random.uniform(0, 1)
+        except ValueError:
+            pass
+
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _quota_reset_delay(response) -> float:
+    """
+    Returns the seconds until the quota resets when a response reports no requests left in
+    the current minute, with `X-RequestsAvailable-Minute: 0` and `X-RequestCounter-Reset`,
+    or None while the key has requests left.
+    """
+    headers = response.headers
+    available = next((headers[name] for name in REQUESTS_AVAILABLE_HEADERS if name in headers), None)
+    if available != "0":
+        return None
+    try:
+        return max(0.0, float(headers.get(REQUEST_COUNTER_RESET_HEADER)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _hold_until_quota_reset(seconds: float):
+    """Makes the next requests sent with HEADERS wait `seconds`, see `_wait_for_quota_reset()`."""
+    global _quota_reset_at
+    with _quota_lock:
+        _quota_reset_at = max(_quota_reset_at, time.monotonic() + seconds)
+    logger.info(f"No request left in the current minute, waiting {seconds:.1f} seconds before the next one")
+
+
+def _wait_for_quota_reset() -> float:
+    """Sleeps until the quota reset announced by `_hold_until_quota_reset()`, and returns the time waited."""
+    with _quota_lock:
+        delay = _quota_reset_at - time.monotonic()
+    if delay <= 0:
+        return 0.0
+    time.sleep(delay)
+    return delay
+
+
+def _write_raw(file_name: str, text: str) -> str:
+    """Writes a response body to DATA_FOLDER and returns the file path."""
+    file_path = os.path.join(DATA_FOLDER, file_name)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    return file_path
+
+
+def _serve_from_cache(url: str, file_name: str, cache: ResponseCache) -> dict:
+    """Copies a cached response body into DATA_FOLDER and returns it parsed."""
+    text = cache.read(url)
+    file_path = _write_raw(file_name, text)
+    logger.info(f"\nData served from cache and saved to {file_path}")
+    return json.loads(text)
+
+
+def _send_with_retries(url: str, headers: dict, rate_limiter=None, stream: bool = False):
+    """
+    Sends a GET request through the shared session, retrying rate limits, gateway errors
+    and connection errors as described in `fetch_data()`.
+    Args:
+        url (str): The URL to request.
+        headers (dict): The request headers.
+        rate_limiter (SlidingWindowLimiter or KeyPool, optional): Client-side limiter acquired before
+            every request. With a KeyPool, each attempt is sent with the X-Auth-Token of the
+            key it hands out: a 429 sets that key aside for the retry delay and a rejected
+            token revokes it, and the request is retried right away on another key.
+            A response reporting no requests left in the current minute sets its key aside,
+            or makes the next request sent with HEADERS wait, until `X-RequestCounter-Reset`.
+        stream (bool): If True, the body is not downloaded with the headers and must be read
+            from the returned response, see `download_raw()`.
+    Returns:
+        requests.Response: The first response that is not retried, or None when the request
+        failed, the retries were exhausted or every key of the pool was revoked.
+    """
+    session = get_session()
+    metrics = current_metrics()
+    request_options = {"stream": True} if stream else {}
+    pool = rate_limiter if isinstance(rate_limiter, KeyPool) else None
+
+    for attempt in range(MAX_RETRIES + 1):
+        key = None
+        request_headers = headers
+        if pool:
+            try:
+                key, waited = pool.acquire()
+            except RuntimeError as e:
+                logger.error(str(e))
+                return None
+            metrics.record_wait(waited)
+            request_headers = {**headers, "X-Auth-Token": key.token}
+        else:
+            if rate_limiter:
+                metrics.record_wait(rate_limiter.acquire())
+            metrics.record_wait(_wait_for_quota_reset())
+        label = key.label if key else None
+
+        try:
+            started = time.perf_counter()
+            response = session.get(url, headers=request_headers, timeout=REQUEST_TIMEOUT, **request_options)
+            # A streamed body is counted by download_raw() while it is written to disk
+            size = 0 if stream else len(response.content)
+            metrics.record_request(time.perf_counter() - started, response.status_code, size, label)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.record_request(time.perf_counter() - started, "error", api_key=label)
+            if attempt == MAX_RETRIES:
+                logger.error(f"Request error: {e}")
+                return None
+            delay = get_retry_delay(None, attempt)
+            logger.warning(f"\nRequest error: {e}. Retrying in {delay:.1f} seconds...")
+            metrics.record_wait(delay, rate_limited=False)
+            time.sleep(delay)
+            continue
+        except requests.RequestException as e:
+            logger.error(f"Request error: {e}")
+            return None
+
+        if key and attempt < MAX_RETRIES and _key_rejected(response):
+            response.close()
+            pool.revoke(key)
+            continue
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+            if stream:
+                response.close()
+            delay = get_retry_delay(response, attempt)
+            if key and response.status_code == 429:
+                # The other keys keep their own quota, so only this one waits
+                pool.throttle(key, delay)
+                continue
+            logger.warning(
+                f"\nReceived status {response.status_code}. Retrying in {delay:.1f} seconds..."
+            )
+            metrics.record_wait(delay, rate_limited=response.status_code == 429)
+            time.sleep(delay)
+            continue
+
+        # A response can use the last request of the minute: the next one waits for the reset
+        reset_delay = _quota_reset_delay(response)
+        if reset_delay:
+            if key:
+                pool.throttle(key, reset_delay)
+            else:
+                _hold_until_quota_reset(reset_delay)
+        return response
+
+    return None
+
+
+def fetch_data(
+    url: str, file_name: str, rate_limiter: SlidingWindowLimiter = None, cache: ResponseCache = None
+) -> dict:
     """
     Fetches data from the specified API URL and saves it to a local file.
     Args:
         url (str): The URL of the API endpoint to fetch data from.
         file_name (str): The name of the file to save the fetched data.
+        rate_limiter (SlidingWindowLimiter, optional): Client-side limiter acquired before every request.
+        cache (ResponseCache, optional): Response cache used to skip or validate the request.
     Returns:
         dict: The JSON response from the API if the request is successful,
               or an empty dictionary if an error occurs.
-    Raises:
-        requests.RequestException: If there is an issue with the HTTP request.
     Notes:
-        - If the API rate limit is reached (status code 429), the function waits for 60 seconds
-          and retries the request.
+        - Requests go through the shared pooled session returned by `get_session()`,
+          with a REQUEST_TIMEOUT seconds timeout.
+        - Rate limits (status code 429), gateway errors and connection errors are retried
+          up to MAX_RETRIES times, waiting the delay returned by `get_retry_delay()`.
+        - With a cache, a response younger than the cache TTL is served without any request.
+          Older responses are revalidated with `If-None-Match` / `If-Modified-Since`, and a
+          304 Not Modified is served from disk.
         - The fetched data is saved to a file in the DATA_FOLDER directory with the specified file_name.
     """
-    if not API_KEY:
+    if not (API_KEY or API_KEYS):
         logger.error("API_KEY not found in environment variables")
-        raise ValueError("API_KEY is required")
+        raise ValueError("API_KEY or API_KEYS is required")
 
     os.makedirs(DATA_FOLDER, exist_ok=True)
 
-    try:
-        response = requests.get(url, headers=HEADERS)
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(cached):
+        return _serve_from_cache(url, file_name, cache)
+    request_headers = {**HEADERS, **cache.conditional_headers(cached)} if cache else HEADERS
+
+    response = _send_with_retries(url, request_headers, rate_limiter)
+    if response is None:
+        return {}
+
+    if response.status_code == 200:
+        file_path = _write_raw(file_name, response.text)
+        if cache:
+            cache.store(url, response.text, response.headers)
+        logger.info(f"\nData saved to {file_path}")
+        return response.json()
+
+    elif response.status_code == 304 and cached:
+        cache.touch(url, response.headers)
+        return _serve_from_cache(url, file_name, cache)
+
+    elif response.status_code in RETRY_STATUS_CODES:
+        logger.error(f"Giving up after {MAX_RETRIES} retries: {response.status_code}")
+        return {}
+
+    else:
+        logger.error(f"Unexpected error: {response.status_code}")
+        return {}
+
+
+def download_raw(
+    url: str, file_name: str, rate_limiter: SlidingWindowLimiter = None, cache: ResponseCache = None
+) -> str:
+    """
+    Raw-ingest version of `fetch_data()`: streams the response bytes straight to a file in
+    DATA_FOLDER, in RAW_CHUNK_SIZE chunks, without decoding or parsing the body. The body
+    is never held in memory as a whole; callers parse the fields they need from the file,
+    see `iter_team_fields()`.
+    The file is written under a temporary name and renamed once complete, so an interrupted
+    download never leaves a truncated raw file behind. Retries and the response cache behave
+    as in `fetch_data()`.
+    Args:
+        url (str): The URL of the API endpoint to fetch data from.
+        file_name (str): The name of the file to save the response body to.
+        rate_limiter (SlidingWindowLimiter, optional): Client-side limiter acquired before every request.
+        cache (ResponseCache, optional): Response cache used to skip or validate the request.
+    Returns:
+        str: The path of the raw file, or None if an error occurs.
+    """
+    if not (API_KEY or API_KEYS):
+        logger.error("API_KEY not found in environment variables")
+        raise ValueError("API_KEY or API_KEYS is required")
+
+    os.makedirs(DATA_FOLDER, exist_ok=True)
+    file_path = os.path.join(DATA_FOLDER, file_name)
+
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(cached):
+        shutil.copyfile(cache.body_path(url), file_path)
+        logger.info(f"\nData served from cache and saved to {file_path}")
+        return file_path
+    request_headers = {**HEADERS, **cache.conditional_headers(cached)} if cache else HEADERS
+
+    response = _send_with_retries(url, request_headers, rate_limiter, stream=True)
+    if response is None:
+        return None
+
+    with response:
         if response.status_code == 200:
-            file_path = os.path.join(DATA_FOLDER, file_name)
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write(response.text)
-            logger.info(f"\nData saved to {file_path}")
-            return response.json()
+            tmp_path = f"{file_path}.part"
+            size = 0
+            with open(tmp_path, "wb") as file:
+                for chunk in response.iter_content(chunk_size=RAW_CHUNK_SIZE):
+                    file.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, file_path)
+            current_metrics().add_bytes(size)
+            if cache:
+                cache.store_file(url, file_path, response.headers)
+            logger.info(f"\nData streamed to {file_path}")
+            return file_path
+
+        elif response.status_code == 304 and cached:
+            cache.touch(url, response.headers)
+            shutil.copyfile(cache.body_path(url), file_path)
+            logger.info(f"\nData served from cache and saved to {file_path}")
+            return file_path
 
-        elif response.status_code == 429:
-            logger.warning("\nRate limit reached. Retrying in 60 seconds...")
-            time.sleep(60)
-            return fetch_data(url, file_name)
+        elif response.status_code in RETRY_STATUS_CODES:
+            logger.error(f"Giving up after {MAX_RETRIES} retries: {response.status_code}")
+            return None
 
         else:
             logger.error(f"Unexpected error: {response.status_code}")
-            return {}
+            return None
 
-    except requests.RequestException as e:
-        logger.error(f"Request error: {e}")
-        return {}
+
+def load_json_file(path: str):
+    """Parses a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, "rb") as file:
+            return orjson.loads(file.read())
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def iter_team_fields(path: str):
+    """
+    Yields the id and name of every team of a teams file, ignoring the rest of the payload
+    (squads, staff, venue, ...).
+    Files larger than INCREMENTAL_PARSE_BYTES are parsed incrementally with ijson, when it is
+    installed, so only one team is in memory at a time. Smaller files, the usual case, are
+    parsed whole, with orjson when available, which is faster.
+    Args:
+        path (str): Path of a raw teams_<code>.json file.
+    Yields:
+        dict: A dictionary with the 'id' and 'name' of a team.
+    """
+    if ijson is not None and (orjson is None or os.path.getsize(path) > INCREMENTAL_PARSE_BYTES):
+        with open(path, "rb") as file:
+            for team in ijson.items(file, "teams.item", use_float=True):
+                yield {"id": team.get("id"), "name": team.get("name")}
+        return
+
+    for team in load_json_file(path).get("teams", []):
+        yield {"id": team.get("id"), "name": team.get("name")}
+
+
+def fetch_checkpointed(
+    url: str,
+    file_name: str,
+    rate_limiter: SlidingWindowLimiter = None,
+    cache: ResponseCache = None,
+    manifest: RunManifest = None,
+) -> dict:
+    """
+    Checkpointed version of `fetch_data()`.
+    When the manifest records `file_name` as complete and the file on disk still matches
+    its checksum, the file is read back instead of calling the API. Otherwise the data is
+    fetched and the outcome is recorded in the manifest.
+    Args:
+        url (str): The URL of the API endpoint to fetch data from.
+        file_name (str): The name of the raw file in DATA_FOLDER.
+        rate_limiter (SlidingWindowLimiter, optional): Client-side limiter passed to `fetch_data()`.
+        cache (ResponseCache, optional): Response cache passed to `fetch_data()`.
+        manifest (RunManifest, optional): Checkpoint of the run; without it this is `fetch_data()`.
+    Returns:
+        dict: The parsed data, or an empty dictionary if the request failed.
+    """
+    if manifest and manifest.is_complete(file_name):
+        logger.info(f"Reusing {file_name} completed by a previous run")
+        with open(os.path.join(manifest.folder, file_name), "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    data = fetch_data(url, file_name, rate_limiter, cache)
+    if manifest:
+        if data:
+            manifest.mark_complete(file_name)
+        else:
+            manifest.mark_failed(file_name)
+    return data
+
+
+def download_checkpointed(
+    url: str,
+    file_name: str,
+    rate_limiter: SlidingWindowLimiter = None,
+    cache: ResponseCache = None,
+    manifest: RunManifest = None,
+) -> str:
+    """
+    Checkpointed version of `download_raw()`, see `fetch_checkpointed()`.
+    Returns:
+        str: The path of the raw file, or None if the request failed.
+    """
+    if manifest and manifest.is_complete(file_name):
+        logger.info(f"Reusing {file_name} completed by a previous run")
+        return os.path.join(manifest.folder, file_name)
+
+    file_path = download_raw(url, file_name, rate_limiter, cache)
+    if manifest:
+        if file_path:
+            manifest.mark_complete(file_name)
+        else:
+            manifest.mark_failed(file_name)
+    return file_path
+
+
+def open_manifest(resume: bool) -> RunManifest:
+    """
+    Returns the manifest of an extraction run: the one left in DATA_FOLDER by a previous
+    run when resuming, a new one otherwise.
+    """
+    if not resume:
+        return RunManifest(DATA_FOLDER)
+
+    manifest = RunManifest.load(DATA_FOLDER)
+    counts = manifest.counts()
+    logger.info(
+        f"Resuming extraction: {counts.get('complete', 0)} files complete, "
+        f"{counts.get('failed', 0)} failed in the previous run"
+    )
+    return manifest
 
 
 def drop_data():
@@ -86,42 +567,751 @@ def drop_data():
     logger.info(f"Recreation of {DATA_FOLDER} completed")
 
 
-def extract_data():
+def build_team_rows(competition: dict, teams: list) -> list:
+    """
+    Flattens the teams of a competition into the rows consumed by `transform_data()`.
+    Args:
+        competition (dict): The competition the teams belong to.
+        teams (iterable): Team objects as returned by the teams endpoint, or the
+            id/name pairs yielded by `iter_team_fields()`.
+    Returns:
+        list: A list of dictionaries with the competition and team ids and names.
+    """
+    competition_id = competition.get("id")
+    competition_name = competition.get("name")
+    return [
+        {
+            "competition_id": competition_id,
+            "competition_name": competition_name,
+            "team_id": team.get("id"),
+            "team_name": team.get("name"),
+        }
+        for team in teams
+    ]
+
+
+def extract_competitions(
+    rate_limiter: SlidingWindowLimiter = None,
+    cache: ResponseCache = None,
+    manifest: RunManifest = None,
+    raw_ingest: bool = False,
+) -> list:
+    """
+    Fetches the list of competitions, see `extract_teams()` for the arguments.
+    Returns:
+        list: The competition objects, or an empty list if the request failed.
+    """
+    if raw_ingest:
+        file_path = download_checkpointed(API_URL, "competitions.json", rate_limiter, cache, manifest)
+        return load_json_file(file_path).get("competitions", []) if file_path else []
+
+    competitions_data = fetch_checkpointed(API_URL, "competitions.json", rate_limiter, cache, manifest)
+    return competitions_data.get("competitions", [])
+
+
+def extract_teams(
+    competition: dict,
+    rate_limiter: SlidingWindowLimiter = None,
+    cache: ResponseCache = None,
+    manifest: RunManifest = None,
+    raw_ingest: bool = False,
+    state: CompetitionState = None,
+) -> list:
+    """
+    Fetches the teams of a single competition.
+    Args:
+        competition (dict): A competition object as returned by the competitions endpoint.
+        rate_limiter (SlidingWindowLimiter, optional): Client-side limiter shared by concurrent workers.
+        cache (ResponseCache, optional): Response cache passed to `fetch_data()`.
+        manifest (RunManifest, optional): Checkpoint of the run, see `fetch_checkpointed()`.
+        raw_ingest (bool): If True, the response is streamed to disk with `download_raw()` and
+            only the team ids and names are parsed from the file, see `iter_team_fields()`.
+        state (CompetitionState, optional): Last seen version of every competition. When the
+            `lastUpdated` and current season of the competition did not change, its stored teams
+            are written to DATA_FOLDER without any request; otherwise the fetched teams are stored.
+    Returns:
+        list: A list of dictionaries, each representing a team and the competition it belongs to.
+              Competitions without a code are skipped and yield an empty list.
+    """
+    competition_code = competition.get("code")
+    if not competition_code:
+        return []
+
+    teams_url = f"{API_URL}/{competition_code}/teams"
+    file_name = f"teams_{competition_code}.json"
+    stored = state.unchanged_teams(competition) if state else None
+    if stored is not None:
+        logger.info(f"Competition {competition_code} unchanged since its last fetch, reusing its teams")
+        os.makedirs(DATA_FOLDER, exist_ok=True)
+        file_path = _write_raw(file_name, stored)
+        if manifest:
+            manifest.mark_complete(file_name)
+        teams = iter_team_fields(file_path) if raw_ingest else json.loads(stored).get("teams", [])
+        return build_team_rows(competition, teams)
+
+    logger.info(f"Fetching teams for competition: {competition.get('name')}")
+    if raw_ingest:
+        file_path = download_checkpointed(teams_url, file_name, rate_limiter, cache, manifest)
+    else:
+        teams_data = fetch_checkpointed(teams_url, file_name, rate_limiter, cache, manifest)
+        file_path = os.path.join(DATA_FOLDER, file_name) if teams_data else None
+    if not file_path:
+        return []
+
+    if state:
+        with open(file_path, "r", encoding="utf-8") as file:
+            state.record(competition, file.read())
+    if raw_ingest:
+        return build_team_rows(competition, iter_team_fields(file_path))
+    return build_team_rows(competition, teams_data.get("teams", []))
+
+
+def extract_data(
+    concurrent: bool = False,
+    max_workers: int = MAX_WORKERS,
+    cache: ResponseCache = None,
+    resume: bool = False,
+    raw_ingest: bool = False,
+    state: CompetitionState = None,
+):
     """
     Extracts data from the API for football competitions and their respective teams.
-    This function fetches data for all competitions and then iterates through each competition
-    to fetch the teams associated with it. The data is then compiled into two lists: one for
-    competitions and one for teams.
+    This function fetches data for all competitions and then fetches the teams associated
+    with each competition. The data is then compiled into two lists: one for competitions
+    and one for teams.
+    Args:
+        concurrent (bool): If True, the team requests run in a thread pool behind a rate
+            limiter sized to REQUESTS_PER_MINUTE, instead of one after the other.
+        max_workers (int): Number of worker threads used in concurrent mode.
+        cache (ResponseCache, optional): Response cache used for every request, see `fetch_data()`.
+        resume (bool): If True, the files recorded as complete in the manifest of a previous
+            run are read from DATA_FOLDER, and only the missing or failed ones are fetched.
+        raw_ingest (bool): If True, responses are streamed to disk as bytes and only the
+            fields of the team rows are parsed from the files, see `download_raw()`.
+        state (CompetitionState, optional): If given, the teams of the competitions whose
+            `lastUpdated` and current season did not change since they were last fetched are
+            not requested again, see `extract_teams()`.
     Returns:
         tuple: A tuple containing two elements:
             - competitions (list): A list of dictionaries, each representing a competition with its details.
             - all_teams (list): A list of dictionaries, each representing a team with its details and the competition it belongs to.
     """
-    competitions_data = fetch_data(API_URL, "competitions.json")
-    competitions = competitions_data.get("competitions", [])
+    rate_limiter = build_rate_limiter(concurrent)
+    manifest = open_manifest(resume)
+
+    competitions = extract_competitions(rate_limiter, cache, manifest, raw_ingest)
+
+    # Extract teams for each competition, keeping the competitions order
+    if concurrent:
+        logger.info(f"Fetching teams concurrently with {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            teams_per_competition = list(
+                executor.map(
+                    lambda competition: extract_teams(
+                        competition, rate_limiter, cache, manifest, raw_ingest, state
+                    ),
+                    competitions,
+                )
+            )
+    else:
+        teams_per_competition = [
+            extract_teams(competition, rate_limiter, cache, manifest, raw_ingest, state)
+            for competition in competitions
+        ]
+
+    all_teams = [team for teams in teams_per_competition for team in teams]
+
+    return competitions, all_teams
+
+
+def iter_extract(
+    concurrent: bool = False,
+    max_workers: int = MAX_WORKERS,
+    cache: ResponseCache = None,
+    resume: bool = False,
+    raw_ingest: bool = False,
+    state: CompetitionState = None,
+):
+    """
+    Streaming version of `extract_data()`.
+    Instead of building the full lists in memory, this generator yields each competition
+    with its team rows as soon as its teams have been fetched. In concurrent mode at most
+    `2 * max_workers` requests are in flight, and competitions are yielded in completion
+    order, so a slow consumer never lets finished payloads pile up.
+    Args:
+        concurrent (bool): If True, the team requests run in a thread pool behind a rate limiter.
+        max_workers (int): Number of worker threads used in concurrent mode.
+        cache (ResponseCache, optional): Response cache used for every request, see `fetch_data()`.
+        resume (bool): If True, reuse the files completed by a previous run, see `extract_data()`.
+        raw_ingest (bool): If True, stream the responses to disk, see `extract_data()`.
+        state (CompetitionState, optional): Skip the unchanged competitions, see `extract_data()`.
+    Yields:
+        tuple: A (competition, team_rows) pair for every competition, including the ones
+               without a code, which come with an empty list of rows.
+    """
+    rate_limiter = build_rate_limiter(concurrent)
+    manifest = open_manifest(resume)
+
+    competitions = extract_competitions(rate_limiter, cache, manifest, raw_ingest)
+
+    if not concurrent:
+        for competition in competitions:
+            yield competition, extract_teams(competition, rate_limiter, cache, manifest, raw_ingest, state)
+        return
+
+    logger.info(f"Streaming teams concurrently with {max_workers} workers")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        remaining = iter(competitions)
+        while True:
+            for competition in remaining:
+                future = executor.submit(
+                    extract_teams, competition, rate_limiter, cache, manifest, raw_ingest, state
+                )
+                pending[future] = competition
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def date_windows(date_from: str, date_to: str, days: int = None) -> list:
+    """
+    Splits an inclusive date range into consecutive windows of at most `days` days.
+    Args:
+        date_from (str): First day of the range, as YYYY-MM-DD.
+        date_to (str): Last day of the range, as YYYY-MM-DD.
+        days (int, optional): Length of a window. Without it the range is a single window.
+    Returns:
+        list: (dateFrom, dateTo) pairs of YYYY-MM-DD strings covering the range in order.
+    Raises:
+        ValueError: If a date is invalid, the range is reversed or `days` is not positive.
+    """
+    start, end = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    if end < start:
+        raise ValueError(f"Date range {date_from} to {date_to} is reversed")
+    if days is None:
+        return [(start.isoformat(), end.isoformat())]
+    if days < 1:
+        raise ValueError(f"Date windows need at least one day, got {days}")
+
+    windows = []
+    while start <= end:
+        stop = min(start + timedelta(days=days - 1), end)
+        windows.append((start.isoformat(), stop.isoformat()))
+        start = stop + timedelta(days=1)
+    return windows
+
+
+def fetch_pages(
+    url: str,
+    params: dict,
+    item_key: str,
+    file_prefix: str,
+    page_size: int = MATCHES_PAGE_SIZE,
+    rate_limiter: SlidingWindowLimiter = None,
+    cache: ResponseCache = None,
+    manifest: RunManifest = None,
+):
+    """
+    Fetches every page of a list endpoint paginated with `limit` and `offset`.
+    Pages are requested in order, each one saved as `<file_prefix>_<offset>.json` through
+    `fetch_checkpointed()`, until a page is empty or shorter than `page_size`, or the
+    total announced in `resultSet.count` is reached. A page longer than `page_size`, or
+    repeating the previous one, means the endpoint ignored the pagination parameters
+    and is the last one.
+    Args:
+        url (str): The URL of the list endpoint, without query string.
+        params (dict): Filters added to the query string of every page.
+        item_key (str): Key of the list of items in the response, e.g. 'matches'.
+        file_prefix (str): Prefix of the raw page files in DATA_FOLDER.
+        page_size (int): Value of the `limit` parameter.
+        rate_limiter (SlidingWindowLimiter, optional): Client-side limiter acquired before every request.
+        cache (ResponseCache, optional): Response cache passed to `fetch_data()`.
+        manifest (RunManifest, optional): Checkpoint of the run, see `fetch_checkpointed()`.
+    Yields:
+        list: The items of each page. A failed request ends the iteration.
+    """
+    offset = 0
+    previous_first = None
+    while True:
+        query = urlencode({**params, "limit": page_size, "offset": offset})
+        data = fetch_checkpointed(
+            f"{url}?{query}", f"{file_prefix}_{offset}.json", rate_limiter, cache, manifest
+        )
+        items = data.get(item_key, [])
+        if not items or (offset and items[0] == previous_first):
+            return
+        yield items
+
+        offset += len(items)
+        total = (data.get("resultSet") or {}).get("count")
+        if len(items) != page_size or (total is not None and offset >= total):
+            return
+        previous_first = items[0]
 
-    # Extract teams for each competition
-    all_teams = []
+
+def build_match_rows(competition: dict, matches: list) -> list:
+    """
+    Flattens the matches of a competition into the rows consumed by `transform_matches()`.
+    Args:
+        competition (dict): The competition the matches belong to.
+        matches (list): Match objects as returned by the matches endpoint.
+    Returns:
+        list: A list of dictionaries with the match ids, date, status, teams and full-time score.
+    """
+    competition_id = competition.get("id")
+    rows = []
+    for match in matches:
+        score = match.get("score") or {}
+        full_time = score.get("fullTime") or {}
+        rows.append({
+            "id": match.get("id"),
+            "competition_id": competition_id,
+            "season_id": (match.get("season") or {}).get("id"),
+            "utc_date": match.get("utcDate"),
+            "status": match.get("status"),
+            "matchday": match.get("matchday"),
+            "stage": match.get("stage"),
+            "home_team_id": (match.get("homeTeam") or {}).get("id"),
+            "away_team_id": (match.get("awayTeam") or {}).get("id"),
+            "home_score": full_time.get("home"),
+            "away_score": full_time.get("away"),
+            "winner": score.get("winner"),
+            "last_updated": match.get("lastUpdated"),
+        })
+    return rows
+
+
+def matches_request(competition_code: str, season: int = None, window: tuple = None) -> tuple:
+    """
+    Returns the URL, query filters and raw file prefix of the matches of one competition,
+    season and date window, see `extract_competition_matches()`.
+    """
+    params = {}
+    file_prefix = f"matches_{competition_code}_{season or 'current'}"
+    if season:
+        params["season"] = season
+    if window:
+        params["dateFrom"], params["dateTo"] = window
+        file_prefix += f"_{window[0]}_{window[1]}"
+    return f"{API_URL}/{competition_code}/matches", params, file_prefix
+
+
+def extract_competition_matches(
+    competition: dict,
+    season: int = None,
+    window: tuple = None,
+    page_size: int = MATCHES_PAGE_SIZE,
+    rate_limiter: SlidingWindowLimiter = None,
+    cache: ResponseCache = None,
+    manifest: RunManifest = None,
+) -> list:
+    """
+    Fetches the matches of one competition, season and date window, see `extract_matches()`.
+    Args:
+        competition (dict): A competition object as returned by the competitions endpoint.
+        season (int, optional): Year the season starts. Defaults to the current season.
+        window (tuple, optional): (dateFrom, dateTo) pair restricting the match dates.
+    Returns:
+        list: The match rows, see `build_match_rows()`. Competitions without a code yield an empty list.
+    """
+    competition_code = competition.get("code")
+    if not competition_code:
+        return []
+
+    url, params, file_prefix = matches_request(competition_code, season, window)
+    rows = []
+    for matches in fetch_pages(
+        url,
+        params,
+        "matches",
+        file_prefix,
+        page_size,
+        rate_limiter,
+        cache,
+        manifest,
+    ):
+        rows.extend(build_match_rows(competition, matches))
+    logger.info(f"Fetched {len(rows)} matches for {competition_code} ({season or 'current season'})")
+    return rows
+
+
+def extract_matches(
+    competitions: list = None,
+    competition_codes: list = None,
+    seasons: list = None,
+    date_from: str = None,
+    date_to: str = None,
+    window_days: int = None,
+    page_size: int = MATCHES_PAGE_SIZE,
+    max_workers: int = MAX_WORKERS,
+    cache: ResponseCache = None,
+) -> list:
+    """
+    Fetches the matches of every competition for the requested seasons and date range.
+    The work is split into one partition per competition, season and date window. The
+    partitions run in a thread pool behind a single rate limiter sized to
+    REQUESTS_PER_MINUTE, and the pages of a partition follow each other, see `fetch_pages()`.
+    Every page is recorded in the run manifest of DATA_FOLDER, so a resumed run only
+    fetches the pages it is missing.
+    Args:
+        competitions (list, optional): Competition objects. Defaults to the ones of the
+            competitions.json file written by the extraction.
+        competition_codes (list, optional): Only fetch the matches of these competitions.
+        seasons (list, optional): Years the seasons start. Defaults to the current season.
+        date_from (str, optional): First match day, as YYYY-MM-DD; requires `date_to`.
+        date_to (str, optional): Last match day, as YYYY-MM-DD; requires `date_from`.
+        window_days (int, optional): Split the date range into windows of this many days,
+            for endpoints that cap the range of a request.
+        page_size (int): Number of matches per page.
+        max_workers (int): Number of worker threads.
+        cache (ResponseCache, optional): Response cache used for every request, see `fetch_data()`.
+    Returns:
+        list: The match rows of every partition, see `build_match_rows()`.
+    Raises:
+        ValueError: If only one bound of the date range is given, or it is invalid.
+    """
+    if (date_from is None) != (date_to is None):
+        raise ValueError("date_from and date_to must be given together")
+    windows = date_windows(date_from, date_to, window_days) if date_from else [None]
+
+    if competitions is None:
+        competitions = load_json_file(os.path.join(DATA_FOLDER, "competitions.json")).get("competitions", [])
+    if competition_codes:
+        competitions = [competition for competition in competitions if competition.get("code") in competition_codes]
+
+    partitions = [
+        (competition, season, window)
+        for competition in competitions
+        for season in seasons or [None]
+        for window in windows
+    ]
+    rate_limiter = build_rate_limiter()
+    manifest = RunManifest.load(DATA_FOLDER)
+
+    logger.info(f"Fetching matches of {len(partitions)} partitions with {max_workers} workers")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rows_per_partition = executor.map(
+            lambda partition: extract_competition_matches(
+                *partition, page_size=page_size, rate_limiter=rate_limiter, cache=cache, manifest=manifest
+            ),
+            partitions,
+        )
+        match_rows = [row for rows in rows_per_partition for row in rows]
+
+    logger.info(f"Fetched {len(match_rows)} matches")
+    return match_rows
+
+
+def enqueue_extraction(
+    queue: WorkQueue,
+    competitions: list,
+    matches: bool = False,
+    seasons: list = None,
+    windows: list = None,
+    page_size: int = MATCHES_PAGE_SIZE,
+    competition_codes: list = None,
+) -> int:
+    """
+    Queues the fetch tasks of a distributed extraction and seals the queue, see `run_queue_worker()`.
+    Every competition with a code gets a 'teams' task writing teams_<code>.json, and with
+    `matches`, every competition, season and date window gets a 'matches' task for its first
+    page; the worker of a full page queues the next one. The tasks carry the full URL of
+    their request, so workers on other hosts only need the API key. Tasks already in the
+    queue, e.g. completed by the run being resumed, are not added again.
+    Args:
+        queue (WorkQueue): The queue of the run.
+        competitions (list): Competition objects of competitions.json.
+        matches (bool): If True, also queue the matches, see `extract_matches()`.
+        seasons (list, optional): Years the seasons start. Defaults to the current season.
+        windows (list, optional): (dateFrom, dateTo) pairs, see `date_windows()`.
+        page_size (int): Number of matches per page.
+        competition_codes (list, optional): Only queue the matches of these competitions.
+    Returns:
+        int: Number of tasks added.
+    """
+    added = 0
     for competition in competitions:
-        competition_id = competition.get("id")
-        competition_name = competition.get("name")
         competition_code = competition.get("code")
         if not competition_code:
             continue
+        file_name = f"teams_{competition_code}.json"
+        added += queue.put(
+            "teams", file_name, {"url": f"{API_URL}/{competition_code}/teams", "competition": competition}
+        )
+        if not matches or (competition_codes and competition_code not in competition_codes):
+            continue
+        for season in seasons or [None]:
+            for window in windows or [None]:
+                url, params, file_prefix = matches_request(competition_code, season, window)
+                added += queue.put(
+                    "matches",
+                    f"{file_prefix}_0.json",
+                    {
+                        "url": url,
+                        "params": params,
+                        "file_prefix": file_prefix,
+                        "offset": 0,
+                        "page_size": page_size,
+                        "competition": competition,
+                    },
+                )
+    queue.seal()
+    logger.info(f"Queued {added} fetch tasks in {queue.path}")
+    return added
 
-        logger.info(f"Fetching teams for competition: {competition_name}")
-        teams_url = f"{API_URL}/{competition_code}/teams"
-        teams_data = fetch_data(teams_url, f"teams_{competition_code}.json")
-        teams = teams_data.get("teams", [])
-
-        for team in teams:
-            all_teams.append(
-                {
-                    "competition_id": competition_id,
-                    "competition_name": competition_name,
-                    "team_id": team.get("id"),
-                    "team_name": team.get("name"),
-                }
-            )
+
+def run_queue_task(queue: WorkQueue, task: dict, rate_limiter=None) -> bool:
+    """
+    Runs one task of `enqueue_extraction()`: fetches its request into DATA_FOLDER and, for a
+    full page of matches, queues the task of the next page.
+    Returns:
+        bool: True if the request succeeded.
+    """
+    payload = task["payload"]
+    if task["kind"] == "teams":
+        return bool(fetch_data(payload["url"], task["key"], rate_limiter))
+
+    offset, page_size = payload["offset"], payload["page_size"]
+    query = urlencode({**payload["params"], "limit": page_size, "offset": offset})
+    data = fetch_data(f"{payload['url']}?{query}", task["key"], rate_limiter)
+    if not data:
+        return False
+
+    # Same stop conditions as fetch_pages(); the next page is queued before this task completes
+    count = len(data.get("matches", []))
+    total = (data.get("resultSet") or {}).get("count")
+    if count == page_size and (total is None or offset + count < total):
+        queue.put(
+            "matches",
+            f"{payload['file_prefix']}_{offset + count}.json",
+            {**payload, "offset": offset + count},
+        )
+    return True
+
+
+def run_queue_worker(
+    queue_path: str = QUEUE_PATH,
+    requests_per_minute: int = None,
+    worker_id: str = None,
+    poll_interval: float = QUEUE_POLL_SECONDS,
+) -> int:
+    """
+    Claims and runs the tasks of a work queue until it is drained.
+    Workers can run in several processes and on several hosts sharing the filesystem of
+    the queue and of DATA_FOLDER. A task that raises or whose request fails is given back
+    to the queue and retried, and a worker that dies leaves its task to be claimed again
+    once its lease expires, see `WorkQueue`.
+    Args:
+        queue_path (str): Path of the queue file.
+        requests_per_minute (int, optional): Quota of the worker, i.e. its share of the
+            quota of the API key when several workers use it. Defaults to REQUESTS_PER_MINUTE.
+        worker_id (str, optional): Name of the worker. Defaults to the host name and process id.
+        poll_interval (float): Seconds between two claims while every open task is leased.
+    Returns:
+        int: Number of tasks completed by the worker.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    rate_limiter = build_rate_limiter(requests_per_minute=requests_per_minute)
+    completed = 0
+    with WorkQueue(queue_path) as queue:
+        logger.info(f"Worker {worker_id} started on {queue_path}")
+        while True:
+            task = queue.claim(worker_id)
+            if task is None:
+                if queue.is_drained():
+                    break
+                time.sleep(poll_interval)
+                continue
+            try:
+                succeeded = run_queue_task(queue, task, rate_limiter)
+            except Exception as e:
+                queue.fail(task, worker_id, str(e))
+                continue
+            if succeeded:
+                completed += queue.complete(task, worker_id)
+            else:
+                queue.fail(task, worker_id, "request failed")
+    logger.info(f"Worker {worker_id} completed {completed} tasks")
+    return completed
+
+
+def start_queue_workers(count: int, queue_path: str = QUEUE_PATH, requests_per_minute: int = None) -> list:
+    """
+    Starts the local worker processes of a work queue run, see `run_queue_worker()`.
+    Args:
+        count (int): Number of processes.
+        queue_path (str): Path of the queue file.
+        requests_per_minute (int, optional): Share of the key quota of this host, split evenly
+            between the processes. Defaults to REQUESTS_PER_MINUTE.
+    Returns:
+        list: The started processes.
+    """
+    requests_per_minute = max(1, (requests_per_minute or REQUESTS_PER_MINUTE) // count) if count else None
+    workers = [
+        multiprocessing.Process(
+            target=run_queue_worker,
+            kwargs={"queue_path": queue_path, "requests_per_minute": requests_per_minute},
+            daemon=True,
+        )
+        for _ in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info(f"Started {count} queue workers with {requests_per_minute} requests per minute each")
+    return workers
+
+
+def report_failed_tasks(queue: WorkQueue) -> list:
+    """
+    Logs an error for every task of the queue given up after QUEUE_MAX_ATTEMPTS attempts, and
+    records it in the run report. The competition of a failed 'teams' task is missing from
+    the loaded tables, and the matches of a failed 'matches' page from fact_matches.
+    Returns:
+        list: The failed tasks, see `WorkQueue.failed_tasks()`.
+    """
+    failed = queue.failed_tasks()
+    for task in failed:
+        logger.error(
+            f"Task {task['key']} failed after {task['attempts']} attempts, its {task['kind']} are missing "
+            f"from this run: {task['error']}"
+        )
+        current_metrics().record_failed_task(task["kind"], task["key"], task["error"])
+    return failed
+
+
+def iter_queue_extract(
+    queue: WorkQueue,
+    competitions: list,
+    poll_interval: float = QUEUE_POLL_SECONDS,
+    alive=None,
+    on_matches=None,
+):
+    """
+    Streaming source of a distributed extraction, for `run_streaming_pipeline()`.
+    Yields the competitions without a code first, then every competition as soon as a
+    worker completed its 'teams' task, with the team rows read from its raw file. The
+    competitions whose task failed are not yielded.
+    Args:
+        queue (WorkQueue): The queue filled by `enqueue_extraction()`.
+        competitions (list): Competition objects of competitions.json.
+        poll_interval (float): Seconds between two reads of the queue.
+        alive (callable, optional): See `WorkQueue.iter_completed()`.
+        on_matches (callable, optional): Called with the match rows of every 'matches' task
+            as soon as it is completed, in the same loop as the teams, so the pages are
+            loaded while the other tasks are still being fetched.
+    Yields:
+        tuple: A (competition, team_rows) pair, like `iter_extract()`.
+    """
+    for competition in competitions:
+        if not competition.get("code"):
+            yield competition, []
+    kinds = ("teams", "matches") if on_matches else "teams"
+    for task in queue.iter_completed(kinds, poll_interval, alive):
+        if task["kind"] == "matches":
+            on_matches(read_match_page(task))
+            continue
+        competition = task["payload"]["competition"]
+        yield competition, read_teams_file(competition, DATA_FOLDER)
+
+
+def iter_queue_matches(queue: WorkQueue, poll_interval: float = QUEUE_POLL_SECONDS, alive=None):
+    """
+    Yields the match rows of every 'matches' task as soon as a worker completed it.
+    Yields:
+        list: The match rows of one page, see `build_match_rows()`.
+    """
+    for task in queue.iter_completed("matches", poll_interval, alive):
+        yield read_match_page(task)
+
+
+def read_match_page(task: dict) -> list:
+    """Reads the raw file of a completed 'matches' task back into match rows, see `build_match_rows()`."""
+    data = load_json_file(os.path.join(DATA_FOLDER, task["key"]))
+    return build_match_rows(task["payload"]["competition"], data.get("matches", []))
+
+
+def iter_replay(folder: str = DATA_FOLDER):
+    """
+    Streaming version of `replay_data()`: yields each competition of competitions.json with
+    the team rows read from its teams_<code>.json file, one file at a time.
+    Args:
+        folder (str): Directory holding competitions.json and the teams_<code>.json files.
+    Yields:
+        tuple: A (competition, team_rows) pair for every competition.
+    """
+    with open(os.path.join(folder, "competitions.json"), "r", encoding="utf-8") as file:
+        competitions = json.load(file).get("competitions", [])
+
+    for competition in competitions:
+        yield competition, read_teams_file(competition, folder)
+
+
+def read_teams_file(competition: dict, folder: str = DATA_FOLDER) -> list:
+    """
+    Reads the persisted teams file of a competition back into team rows.
+    This function runs in the worker processes of `replay_data()`, so only the small
+    list of rows travels back to the parent process, not the full parsed payload.
+    Args:
+        competition (dict): A competition object from competitions.json.
+        folder (str): Directory holding the raw files.
+    Returns:
+        list: The team rows of the competition, or an empty list if it has no code or no file.
+    """
+    competition_code = competition.get("code")
+    if not competition_code:
+        return []
+
+    file_path = os.path.join(folder, f"teams_{competition_code}.json")
+    if not os.path.exists(file_path):
+        logger.warning(f"Raw file {file_path} not found, skipping competition {competition_code}")
+        return []
+
+    return build_team_rows(competition, iter_team_fields(file_path))
+
+
+def fetched_competition_ids(competitions: list, folder: str = DATA_FOLDER) -> list:
+    """
+    Returns the ids of the competitions whose teams file is in `folder`, i.e. whose teams
+    were fetched (or replayed) by this run: a failed request leaves no file behind. Used by
+    `upsert_data()` to keep the facts of the competitions whose fetch failed.
+    """
+    return [
+        competition["id"]
+        for competition in competitions
+        if competition.get("code")
+        and os.path.exists(os.path.join(folder, f"teams_{competition['code']}.json"))
+    ]
+
+
+def replay_data(folder: str = DATA_FOLDER, max_workers: int = MAX_WORKERS):
+    """
+    Rebuilds the extract output from the raw files already stored in `folder`, without
+    calling the API. The competitions.json file is read first, then every
+    teams_<code>.json file is parsed in a process pool.
+    Args:
+        folder (str): Directory holding competitions.json and the teams_<code>.json files.
+        max_workers (int): Number of worker processes used to parse the teams files.
+    Returns:
+        tuple: The same (competitions, all_teams) tuple as `extract_data()`.
+    Raises:
+        FileNotFoundError: If competitions.json does not exist in `folder`.
+    """
+    competitions_path = os.path.join(folder, "competitions.json")
+    logger.info(f"Replaying raw data from {folder}")
+    with open(competitions_path, "r", encoding="utf-8") as file:
+        competitions = json.load(file).get("competitions", [])
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        teams_per_competition = list(
+            executor.map(read_teams_file, competitions, [folder] * len(competitions))
+        )
+
+    all_teams = [team for teams in teams_per_competition for team in teams]
+    logger.info(f"Replayed {len(competitions)} competitions and {len(all_teams)} team rows")
 
     return competitions, all_teams
@@ -0,0 +1,209 @@
+import gzip
+import json
+import os
+import shutil
+import logging
+from datetime import date
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+from .extract import DATA_FOLDER, build_team_rows, load_json_file, orjson
+
+logger = logging.getLogger(__name__)
+
+LANDING_FOLDER = "data/landing"
+LANDING_FORMATS = ("jsonl", "parquet")
+TEAM_COLUMNS = ["competition_id", "competition_name", "team_id", "team_name"]
+COMPETITION_COLUMNS = ["id", "name", "code"]
+FILE_EXTENSIONS = {"jsonl": "jsonl.gz", "parquet": "parquet"}
+GZIP_LEVEL = 6
+
+
+def _dumps(value) -> str:
+    """Serializes a value to compact JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"))
+
+
+class LandingZone:
+    """
+    Compressed history of the raw API data, partitioned by run date and competition code.
+
+    Each run is landed under `run_date=<YYYY-MM-DD>/` (Hive-style partitions) as one
+    competitions file plus one teams file per `competition=<code>/` partition. A file
+    holds one record per competition or team: the columns read back by the pipeline
+    (see COMPETITION_COLUMNS and TEAM_COLUMNS) plus the full API object in a `payload`
+    column (a JSON string), stored as gzip JSON Lines or as Parquet (zstd, needs pyarrow).
+
+    On replay, `read()` prunes partitions by run date and competition code from the
+    directory names alone and, with Parquet, only decodes the requested columns.
+    Landing the same run date again replaces its partitions, so a day keeps its last run.
+
+    Args:
+        folder (str): Root directory of the landing zone.
+        file_format (str): 'jsonl' or 'parquet'.
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format is 'parquet' and pyarrow is not installed.
+    """
+
+    def __init__(self, folder: str = LANDING_FOLDER, file_format: str = "jsonl"):
+        if file_format not in LANDING_FORMATS:
+            raise ValueError(f"Unknown landing format {file_format!r}, expected one of {LANDING_FORMATS}")
+        if file_format == "parquet" and pq is None:
+            raise ImportError("The parquet landing format requires pyarrow")
+        self.folder = folder
+        self.file_format = file_format
+
+    def _run_folder(self, run_date: str) -> str:
+        return os.path.join(self.folder, f"run_date={run_date}")
+
+    def _file_name(self, table: str) -> str:
+        return f"{table}.{FILE_EXTENSIONS[self.file_format]}"
+
+    def run_dates(self) -> list:
+        """Returns the landed run dates, oldest first."""
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(
+            entry.name.split("=", 1)[1]
+            for entry in os.scandir(self.folder)
+            if entry.is_dir() and entry.name.startswith("run_date=")
+        )
+
+    def land(self, raw_folder: str = DATA_FOLDER, run_date: str = None) -> dict:
+        """
+        Lands the raw files of an extraction run: competitions.json and every teams_<code>.json.
+        The partitions are written in a temporary folder that replaces the run date folder once
+        complete, so readers never see a partially landed run.
+        Args:
+            raw_folder (str): Directory holding the raw files.
+            run_date (str, optional): Partition date as YYYY-MM-DD. Defaults to today.
+        Returns:
+            dict: The number of competitions, teams and bytes written.
+        """
+        run_date = run_date or date.today().isoformat()
+        competitions = load_json_file(os.path.join(raw_folder, "competitions.json")).get("competitions", [])
+
+        run_folder = self._run_folder(run_date)
+        tmp_folder = os.path.join(self.folder, f".landing_{run_date}.tmp")
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        os.makedirs(tmp_folder)
+
+        competition_rows = [
+            {**{column: competition.get(column) for column in COMPETITION_COLUMNS}, "payload": competition}
+            for competition in competitions
+        ]
+        self._write(os.path.join(tmp_folder, self._file_name("competitions")), "competitions", competition_rows)
+
+        team_count = 0
+        for competition in competitions:
+            code = competition.get("code")
+            teams_path = os.path.join(raw_folder, f"teams_{code}.json")
+            if not code or not os.path.exists(teams_path):
+                continue
+            teams = load_json_file(teams_path).get("teams", [])
+            rows = [
+                {**row, "payload": team} for row, team in zip(build_team_rows(competition, teams), teams)
+            ]
+            partition = os.path.join(tmp_folder, f"competition={code}")
+            os.makedirs(partition)
+            self._write(os.path.join(partition, self._file_name("teams")), "teams", rows)
+            team_count += len(rows)
+
+        shutil.rmtree(run_folder, ignore_errors=True)
+        os.replace(tmp_folder, run_folder)
+
+        size = sum(
+            os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(run_folder) for name in names
+        )
+        logger.info(
+            f"Landed {len(competitions)} competitions and {team_count} teams in {run_folder} "
+            f"({self.file_format}, {size} bytes)"
+        )
+        return {"competitions": len(competitions), "teams": team_count, "bytes": size}
+
+    def iter_read(self, run_date: str = None, competition_codes: list = None, columns: list = TEAM_COLUMNS):
+        """
+        Streaming version of `read()`: yields each landed competition with its team rows,
+        one partition at a time.
+        Args:
+            run_date (str, optional): Run date to read. Defaults to the latest one.
+            competition_codes (list, optional): Only read these competitions; the other
+                partitions are never opened.
+            columns (list): Columns of the team rows; with Parquet the other columns,
+                including the heavy payload, are not decoded.
+        Yields:
+            tuple: A (competition, team_rows) pair for every competition, with COMPETITION_COLUMNS only.
+        Raises:
+            FileNotFoundError: If nothing was landed for the run date.
+        """
+        run_dates = self.run_dates()
+        run_date = run_date or (run_dates[-1] if run_dates else None)
+        if run_date not in run_dates:
+            raise FileNotFoundError(f"No landed run for {run_date} in {self.folder}")
+
+        run_folder = self._run_folder(run_date)
+        codes = set(competition_codes) if competition_codes else None
+        logger.info(f"Reading the run landed on {run_date} from {run_folder}")
+        for competition in self._read(os.path.join(run_folder, self._file_name("competitions")), COMPETITION_COLUMNS):
+            if codes is not None and competition["code"] not in codes:
+                continue
+            teams_path = os.path.join(run_folder, f"competition={competition['code']}", self._file_name("teams"))
+            yield competition, self._read(teams_path, columns) if os.path.exists(teams_path) else []
+
+    def read(self, run_date: str = None, competition_codes: list = None, columns: list = TEAM_COLUMNS) -> tuple:
+        """
+        Reads a landed run back into the (competitions, all_teams) shape of `extract_data()`,
+        see `iter_read()` for the arguments.
+        Returns:
+            tuple: The competitions (with COMPETITION_COLUMNS only) and the team rows.
+        """
+        competitions, all_teams = [], []
+        for competition, rows in self.iter_read(run_date, competition_codes, columns):
+            competitions.append(competition)
+            all_teams.extend(rows)
+
+        logger.info(f"Read {len(competitions)} competitions and {len(all_teams)} team rows from the landing zone")
+        return competitions, all_teams
+
+    def _write(self, path: str, table: str, rows: list) -> None:
+        # The payload is stored as a JSON string, so readers that do not ask for it skip it as one token
+        records = [{**row, "payload": _dumps(row["payload"])} for row in rows]
+        if self.file_format == "jsonl":
+            with gzip.open(path, "wt", encoding="utf-8", compresslevel=GZIP_LEVEL) as file:
+                for record in records:
+                    file.write(_dumps(record))
+                    file.write("\n")
+            return
+
+        pq.write_table(pa.Table.from_pylist(records, schema=_parquet_schema(table)), path, compression="zstd")
+
+    def _read(self, path: str, columns: list) -> list:
+        if self.file_format == "jsonl":
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                loads = orjson.loads if orjson is not None else json.loads
+                return [{column: record.get(column) for column in columns} for record in map(loads, file)]
+
+        table = pq.read_table(path, columns=columns)
+        return table.to_pylist()
+
+
+def _parquet_schema(table: str):
+    """Returns the Arrow schema of a landed table, with the API object as a JSON string."""
+    if table == "competitions":
+        fields = [("id", pa.int64()), ("name", pa.string()), ("code", pa.string())]
+    else:
+        fields = [
+            ("competition_id", pa.int64()),
+            ("competition_name", pa.string()),
+            ("team_id", pa.int64()),
+            ("team_name", pa.string()),
+        ]
+    return pa.schema(fields + [("payload", pa.string())])
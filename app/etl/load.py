@@ -1,58 +1,305 @@
+import hashlib
 import sqlite3
 import os
 import logging
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+from .database import (
+    DB_PATH,
+    SQLITE_CACHE_SIZE,
+    SQLITE_FOREIGN_KEYS,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    ConnectionManager,
+    apply_pragmas,
+    connect_db,
+    reading,
+    session,
+)
+from .metrics import current_metrics
 
 logger = logging.getLogger(__name__)
 
-def create_tables():
+DUCKDB_PATH = "db/football_data.duckdb"
+# Rows fetched at a time by the query iterators of the backends
+QUERY_CHUNK_SIZE = int(os.getenv("QUERY_CHUNK_SIZE", "50000"))
+WAREHOUSE_BACKEND = os.getenv("WAREHOUSE_BACKEND", "sqlite")
+# Bump when the table definitions change: create_tables() rebuilds older databases
+SCHEMA_VERSION = 3
+# valid_to of the current version of a row in the history tables
+HISTORY_OPEN_END = "9999-12-31T23:59:59"
+# Columns of dim_teams whose changes open a new version in dim_teams_history
+HISTORY_TEAM_ATTRIBUTES = ["name"]
+# No ORDER BY: sorting by the primary key would make SQLite scan the whole history instead
+# of searching the valid_to index, so history_as_of() sorts the (small) result instead
+HISTORY_AS_OF_QUERY = """
+SELECT f.competition_id, f.team_id, t.name AS team_name
+FROM fact_competitions_history f
+JOIN dim_teams_history t
+  ON t.id = f.team_id AND t.valid_from <= :as_of AND t.valid_to > :as_of
+WHERE f.valid_to > :as_of AND f.valid_from <= :as_of
+"""
+# Versions opened and closed by snapshots with the same run_at
+EMPTY_PERIOD_DELETE = "DELETE FROM {table} WHERE valid_to = :run_at AND valid_from = :run_at"
+# Materialized aggregates of the fact tables: columns, and the query that computes them from scratch
+AGGREGATE_TABLES = {
+    "agg_competition_teams": (
+        "competition_id INTEGER PRIMARY KEY, teams INTEGER NOT NULL",
+        "SELECT competition_id, COUNT(*) FROM fact_competitions GROUP BY competition_id",
+    ),
+    "agg_team_competitions": (
+        "team_id INTEGER PRIMARY KEY, competitions INTEGER NOT NULL",
+        "SELECT team_id, COUNT(*) FROM fact_competitions GROUP BY team_id",
+    ),
+    "agg_competition_matches": (
+        "competition_id INTEGER PRIMARY KEY, matches INTEGER NOT NULL, finished INTEGER NOT NULL, goals INTEGER NOT NULL",
+        """
+        SELECT competition_id, COUNT(*), SUM(status IS 'FINISHED'), IFNULL(SUM(home_score + away_score), 0)
+        FROM fact_matches GROUP BY competition_id
+        """,
+    ),
+}
+# Aggregates of fact_matches, which is kept when a run clears the team tables
+MATCH_AGGREGATE_TABLES = ("agg_competition_matches",)
+# Triggers keeping the aggregates up to date, one statement per changed fact row
+AGGREGATE_TRIGGERS = {
+    "trg_fact_competitions_insert": """
+    AFTER INSERT ON fact_competitions BEGIN
+        INSERT INTO agg_competition_teams (competition_id, teams) VALUES (NEW.competition_id, 1)
+        ON CONFLICT(competition_id) DO UPDATE SET teams = teams + 1;
+        INSERT INTO agg_team_competitions (team_id, competitions) VALUES (NEW.team_id, 1)
+        ON CONFLICT(team_id) DO UPDATE SET competitions = competitions + 1;
+    END
+    """,
+    "trg_fact_competitions_delete": """
+    AFTER DELETE ON fact_competitions BEGIN
+        UPDATE agg_competition_teams SET teams = teams - 1 WHERE competition_id = OLD.competition_id;
+        DELETE FROM agg_competition_teams WHERE competition_id = OLD.competition_id AND teams = 0;
+        UPDATE agg_team_competitions SET competitions = competitions - 1 WHERE team_id = OLD.team_id;
+        DELETE FROM agg_team_competitions WHERE team_id = OLD.team_id AND competitions = 0;
+    END
+    """,
+}
+_ADD_MATCH = """
+        INSERT INTO agg_competition_matches (competition_id, matches, finished, goals)
+        VALUES (NEW.competition_id, 1, NEW.status IS 'FINISHED', IFNULL(NEW.home_score + NEW.away_score, 0))
+        ON CONFLICT(competition_id) DO UPDATE SET matches = matches + 1,
+            finished = finished + excluded.finished, goals = goals + excluded.goals;
+"""
+_REMOVE_MATCH = """
+        UPDATE agg_competition_matches SET matches = matches - 1,
+            finished = finished - (OLD.status IS 'FINISHED'), goals = goals - IFNULL(OLD.home_score + OLD.away_score, 0)
+        WHERE competition_id = OLD.competition_id;
+        DELETE FROM agg_competition_matches WHERE competition_id = OLD.competition_id AND matches = 0;
+"""
+AGGREGATE_TRIGGERS.update({
+    "trg_fact_matches_insert": f"AFTER INSERT ON fact_matches BEGIN {_ADD_MATCH} END",
+    # Upserts of fact_matches run this trigger, not the insert one, when the match is already loaded
+    "trg_fact_matches_update": f"AFTER UPDATE ON fact_matches BEGIN {_REMOVE_MATCH} {_ADD_MATCH} END",
+    "trg_fact_matches_delete": f"AFTER DELETE ON fact_matches BEGIN {_REMOVE_MATCH} END",
+})
+# Summary of main.py, from the facts: DuckDB scans them fast enough not to need the aggregates
+SUMMARY_QUERY = """
+SELECT c.name AS Competition, COUNT(f.team_id) AS Number_of_Teams
+FROM dim_competitions c
+JOIN fact_competitions f ON c.id = f.competition_id
+GROUP BY c.name
+ORDER BY COUNT(f.team_id) DESC, Competition;
+"""
+# Same result from agg_competition_teams: reads one row per competition, whatever the number of facts
+AGGREGATE_SUMMARY_QUERY = """
+SELECT c.name AS Competition, SUM(a.teams) AS Number_of_Teams
+FROM dim_competitions c
+JOIN agg_competition_teams a ON c.id = a.competition_id
+GROUP BY c.name
+ORDER BY SUM(a.teams) DESC, Competition;
+"""
+
+
+def _insert_columns(cursor, table: str, df, columns: list) -> int:
+    """Inserts the given DataFrame columns with a single executemany over column arrays."""
+    placeholders = ", ".join("?" for _ in columns)
+    rows = zip(*(df[column].tolist() for column in columns))
+    cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+    return len(df)
+
+
+def _iter_cursor(cursor, chunk_size: int):
+    """
+    Yields the result of an executed DB-API cursor as DataFrames of at most `chunk_size` rows.
+    An empty result still yields one empty DataFrame, which carries the column names.
+    """
+    columns = [column[0] for column in cursor.description]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        yield pd.DataFrame.from_records(rows, columns=columns)
+        if len(rows) < chunk_size:
+            return
+
+
+def create_aggregate_triggers(cursor):
+    """Creates the triggers that maintain the aggregate tables, see AGGREGATE_TRIGGERS."""
+    for trigger, body in AGGREGATE_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger} {body}")
+
+
+def drop_aggregate_triggers(cursor):
+    """Drops the triggers of the aggregate tables, before writes that rebuild them with `refresh_aggregates()`."""
+    for trigger in AGGREGATE_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def refresh_aggregates(cursor):
+    """
+    Recomputes every aggregate table from the fact tables, in the current transaction.
+    A full load writes every fact row, so one GROUP BY per aggregate is cheaper than
+    running the triggers once per row.
+    Parameters:
+    cursor (sqlite3.Cursor): Cursor of the load.
+    """
+    for table, (_, query) in AGGREGATE_TABLES.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"INSERT INTO {table} {query}")
+    logger.debug("Aggregate tables refreshed")
+
+
+def create_tables(clear_existing: bool = True, db: ConnectionManager = None):
     """
     Creates the necessary tables for the football data in an SQLite database.
     This function ensures that the 'db' directory exists, connects to the SQLite database
     'football_data.sqlite', and creates the following tables if they do not already exist:
     - dim_teams: Stores team information with columns 'id' (INTEGER PRIMARY KEY) and 'name' (TEXT).
     - dim_competitions: Stores competition information with columns 'id' (INTEGER PRIMARY KEY) and 'name' (TEXT).
-    - fact_competitions: Stores the relationship between competitions and teams with columns 'competition_id' (INTEGER) and 'team_id' (INTEGER).
-    If the tables already exist, they are dropped and recreated.
+    - fact_competitions: Stores the relationship between competitions and teams with columns 'competition_id' (INTEGER)
+      and 'team_id' (INTEGER), a composite primary key on both columns (WITHOUT ROWID), foreign keys to the
+      dimensions and a secondary index on 'team_id'.
+    - fact_matches: Stores one row per match, keyed by the match 'id', with its competition, season, date,
+      status, home and away teams and full-time score, indexed by competition and date and by each team.
+    - agg_competition_teams, agg_team_competitions and agg_competition_matches: materialized counts of
+      the fact tables (see AGGREGATE_TABLES), updated by triggers whenever fact rows are inserted,
+      updated or deleted, so that summaries read them instead of aggregating the facts.
+    The schema is versioned with `PRAGMA user_version`. Tables are only dropped and recreated when the
+    database holds an older SCHEMA_VERSION; otherwise the tables and their indexes are kept and, if
+    `clear_existing` is True, only the rows of the team tables are deleted. fact_matches and its
+    aggregate are kept, so the matches of the seasons a run does not fetch are not lost.
+    Args:
+        clear_existing (bool): Delete the rows of the previous run, except the matches. Incremental loads pass False to keep
+            the current rows and only apply differences with `upsert_data()`.
+        db (ConnectionManager, optional): Connections shared by the stages of the run. Without it, a
+            connection to DB_PATH is opened and closed by the call; the same goes for the other loaders.
     """
 
     logger.info("Starting database tables creation")
     try:
         # Ensure the db directory exists
-        os.makedirs("db", exist_ok=True)
+        os.makedirs(os.path.dirname(db.path if db else DB_PATH) or ".", exist_ok=True)
         logger.debug("Database directory checked/created")
 
-        conn = sqlite3.connect("db/football_data.sqlite")
-        cursor = conn.cursor()
-        logger.info("Successfully connected to database")
-
-        # Drop tables if they exist
-        logger.debug("Dropping existing tables")
-        cursor.execute("DROP TABLE IF EXISTS dim_teams")
-        cursor.execute("DROP TABLE IF EXISTS dim_competitions")
-        cursor.execute("DROP TABLE IF EXISTS fact_competitions")
-
-        # Create tables
-        logger.debug("Creating new tables")
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dim_teams (
-            id INTEGER PRIMARY KEY,
-            name TEXT
-        )
-        """)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dim_competitions (
-            id INTEGER PRIMARY KEY,
-            name TEXT
-        )
-        """)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS fact_competitions (
-            competition_id INTEGER,
-            team_id INTEGER
-        )
-        """)
-        conn.commit()
-        logger.info("Tables created successfully")
+        with session(db) as conn:
+            cursor = conn.cursor()
+            logger.info("Successfully connected to database")
+
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            foreign_keys = False
+            if version != SCHEMA_VERSION:
+                # Drop tables if they exist
+                logger.info(f"Migrating database schema from version {version} to {SCHEMA_VERSION}")
+                for table in AGGREGATE_TABLES:
+                    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute("DROP TABLE IF EXISTS fact_matches")
+                cursor.execute("DROP TABLE IF EXISTS fact_competitions")
+                cursor.execute("DROP TABLE IF EXISTS dim_teams")
+                cursor.execute("DROP TABLE IF EXISTS dim_competitions")
+            elif clear_existing:
+                logger.debug("Deleting rows of the previous run")
+                # The kept matches may reference the deleted dimension rows until they are loaded again;
+                # the pragma has no effect inside a transaction, so it is switched before the deletes
+                foreign_keys = cursor.execute("PRAGMA foreign_keys").fetchone()[0]
+                if foreign_keys:
+                    cursor.execute("PRAGMA foreign_keys = OFF")
+                # Without the triggers, the deletes below empty the facts at once instead of row by row
+                drop_aggregate_triggers(cursor)
+                for table in AGGREGATE_TABLES:
+                    if table not in MATCH_AGGREGATE_TABLES:
+                        cursor.execute(f"DELETE FROM {table}")
+                cursor.execute("DELETE FROM fact_competitions")
+                cursor.execute("DELETE FROM dim_teams")
+                cursor.execute("DELETE FROM dim_competitions")
+
+            # Create tables
+            logger.debug("Creating missing tables")
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dim_teams (
+                id INTEGER PRIMARY KEY,
+                name TEXT
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dim_competitions (
+                id INTEGER PRIMARY KEY,
+                name TEXT
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fact_competitions (
+                competition_id INTEGER NOT NULL REFERENCES dim_competitions (id),
+                team_id INTEGER NOT NULL REFERENCES dim_teams (id),
+                PRIMARY KEY (competition_id, team_id)
+            ) WITHOUT ROWID
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fact_competitions_team_id
+            ON fact_competitions (team_id)
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fact_matches (
+                id INTEGER PRIMARY KEY,
+                competition_id INTEGER NOT NULL REFERENCES dim_competitions (id),
+                season_id INTEGER,
+                utc_date TEXT,
+                status TEXT,
+                matchday INTEGER,
+                stage TEXT,
+                home_team_id INTEGER REFERENCES dim_teams (id),
+                away_team_id INTEGER REFERENCES dim_teams (id),
+                home_score INTEGER,
+                away_score INTEGER,
+                winner TEXT,
+                last_updated TEXT
+            )
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fact_matches_competition_date
+            ON fact_matches (competition_id, utc_date)
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fact_matches_home_team
+            ON fact_matches (home_team_id, utc_date)
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fact_matches_away_team
+            ON fact_matches (away_team_id, utc_date)
+            """)
+            for table, (columns, _) in AGGREGATE_TABLES.items():
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+            create_aggregate_triggers(cursor)
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            if foreign_keys:
+                cursor.execute("PRAGMA foreign_keys = ON")
+            logger.info("Tables created successfully")
 
     except sqlite3.Error as e:
         logger.error(f"Database error: {str(e)}", exc_info=True)
@@ -60,13 +307,9 @@ def create_tables():
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
         raise
-    finally:
-        if conn:
-            conn.close()
-            logger.debug("Database connection closed")
 
 
-def load_data(dim_competitions, dim_teams, fact_competitions):
+def load_data(dim_competitions, dim_teams, fact_competitions, db: ConnectionManager = None):
     """
     Load data into the SQLite database.
     This function inserts data into three tables: dim_competitions, dim_teams, 
@@ -75,28 +318,34 @@ def load_data(dim_competitions, dim_teams, fact_competitions):
     dim_competitions (DataFrame): DataFrame containing data for the dim_competitions table.
     dim_teams (DataFrame): DataFrame containing data for the dim_teams table.
     fact_competitions (DataFrame): DataFrame containing data for the fact_competitions table.
+    db (ConnectionManager, optional): Connections shared by the stages of the run, see `create_tables()`.
     Returns:
     None
     """
     logger.info("Starting data loading process")
     try:
-        conn = sqlite3.connect("db/football_data.sqlite")
-        logger.debug("Connected to database")
+        with session(db) as conn:
+            logger.debug("Connected to database")
 
-        # Load dim_competitions
-        dim_competitions.to_sql('dim_competitions', conn, if_exists='append', index=False)
-        logger.info(f"Loaded {len(dim_competitions)} rows into dim_competitions")
+            # Load dim_competitions
+            dim_competitions.to_sql('dim_competitions', conn, if_exists='append', index=False)
+            logger.info(f"Loaded {len(dim_competitions)} rows into dim_competitions")
 
-        # Load dim_teams
-        dim_teams.to_sql('dim_teams', conn, if_exists='append', index=False)
-        logger.info(f"Loaded {len(dim_teams)} rows into dim_teams")
+            # Load dim_teams
+            dim_teams.to_sql('dim_teams', conn, if_exists='append', index=False)
+            logger.info(f"Loaded {len(dim_teams)} rows into dim_teams")
 
-        # Load fact_competitions
-        fact_competitions.to_sql('fact_competitions', conn, if_exists='append', index=False)
-        logger.info(f"Loaded {len(fact_competitions)} rows into fact_competitions")
+            # Load fact_competitions, a set of (competition_id, team_id) pairs
+            fact_competitions = fact_competitions.drop_duplicates()
+            fact_competitions.to_sql('fact_competitions', conn, if_exists='append', index=False)
+            logger.info(f"Loaded {len(fact_competitions)} rows into fact_competitions")
 
-        conn.commit()
-        logger.info("Data loading completed successfully")
+            conn.commit()
+            metrics = current_metrics()
+            metrics.add_rows("dim_competitions", len(dim_competitions))
+            metrics.add_rows("dim_teams", len(dim_teams))
+            metrics.add_rows("fact_competitions", len(fact_competitions))
+            logger.info("Data loading completed successfully")
 
     except sqlite3.Error as e:
         logger.error(f"Database error during loading: {str(e)}", exc_info=True)
@@ -104,7 +353,635 @@ def load_data(dim_competitions, dim_teams, fact_competitions):
     except Exception as e:
         logger.error(f"Unexpected error during loading: {str(e)}", exc_info=True)
         raise
-    finally:
-        if conn:
+
+
+def bulk_load_data(
+    dim_competitions,
+    dim_teams,
+    fact_competitions,
+    journal_mode: str = SQLITE_JOURNAL_MODE,
+    synchronous: str = SQLITE_SYNCHRONOUS,
+    cache_size: int = SQLITE_CACHE_SIZE,
+    db: ConnectionManager = None,
+):
+    """
+    Load data into the SQLite database through the fast bulk path.
+    This function writes the same rows as `load_data()`, but skips `DataFrame.to_sql`:
+    each table is inserted from its column arrays with a single `executemany`, all three
+    tables are written in one transaction, and the connection is tuned with `apply_pragmas()`.
+    The aggregate triggers are dropped for the load and the aggregate tables rebuilt at the end
+    with `refresh_aggregates()`, in the same transaction.
+    Parameters:
+    dim_competitions (DataFrame): DataFrame containing data for the dim_competitions table.
+    dim_teams (DataFrame): DataFrame containing data for the dim_teams table.
+    fact_competitions (DataFrame): DataFrame containing data for the fact_competitions table.
+    journal_mode (str): SQLite journal mode used for the load.
+    synchronous (str): SQLite synchronous level used for the load.
+    cache_size (int): SQLite page cache size used for the load.
+    db (ConnectionManager, optional): Connections shared by the stages of the run, see `create_tables()`.
+    Returns:
+    None
+    """
+    logger.info("Starting bulk data loading process")
+    try:
+        with session(db) as conn:
+            apply_pragmas(conn, journal_mode, synchronous, cache_size)
+            cursor = conn.cursor()
+            logger.debug("Connected to database")
+
+            cursor.execute("BEGIN")
+            drop_aggregate_triggers(cursor)
+            counts = {}
+            for table, df, columns in (
+                ("dim_competitions", dim_competitions, ["id", "name"]),
+                ("dim_teams", dim_teams, ["id", "name"]),
+                ("fact_competitions", fact_competitions.drop_duplicates(), ["competition_id", "team_id"]),
+            ):
+                counts[table] = _insert_columns(cursor, table, df, columns)
+                logger.info(f"Loaded {counts[table]} rows into {table}")
+            refresh_aggregates(cursor)
+            create_aggregate_triggers(cursor)
+
+            conn.commit()
+            for table, count in counts.items():
+                current_metrics().add_rows(table, count)
+            logger.info("Bulk data loading completed successfully")
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error during bulk loading: {str(e)}", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error during bulk loading: {str(e)}", exc_info=True)
+        raise
+
+
+def load_batch(conn, dim_competitions, dim_teams, fact_competitions) -> int:
+    """
+    Appends one batch of the streaming pipeline on an open connection and commits it.
+    Batches overlap, since a team plays in several competitions, so dimension rows are
+    upserted and fact rows already loaded by a previous batch are ignored.
+    Parameters:
+    conn (sqlite3.Connection): Connection kept open for the whole stream.
+    dim_competitions (DataFrame): Competitions of the batch.
+    dim_teams (DataFrame): Teams of the batch.
+    fact_competitions (DataFrame): (competition_id, team_id) pairs of the batch.
+    Returns:
+    int: Number of fact rows in the batch.
+    """
+    cursor = conn.cursor()
+    written = {}
+    for table, df in (("dim_competitions", dim_competitions), ("dim_teams", dim_teams)):
+        cursor.executemany(
+            f"""
+            INSERT INTO {table} (id, name) VALUES (?, ?)
+            ON CONFLICT(id) DO UPDATE SET name = excluded.name
+            WHERE {table}.name IS NOT excluded.name
+            """,
+            zip(df["id"].tolist(), df["name"].tolist()),
+        )
+        written[table] = cursor.rowcount
+    cursor.executemany(
+        "INSERT OR IGNORE INTO fact_competitions (competition_id, team_id) VALUES (?, ?)",
+        zip(fact_competitions["competition_id"].tolist(), fact_competitions["team_id"].tolist()),
+    )
+    written["fact_competitions"] = cursor.rowcount
+    conn.commit()
+    for table, count in written.items():
+        current_metrics().add_rows(table, count)
+    logger.debug(f"Loaded batch of {len(fact_competitions)} fact rows")
+    return len(fact_competitions)
+
+
+def upsert_data(
+    dim_competitions,
+    dim_teams,
+    fact_competitions,
+    db: ConnectionManager = None,
+    fetched_competitions=None,
+):
+    """
+    Incrementally load data into the SQLite database.
+    Unlike `load_data()`, this function expects the tables to keep their previous rows
+    (see `create_tables(clear_existing=False)`) and only writes what changed:
+    - dim_competitions and dim_teams rows are upserted with `INSERT ... ON CONFLICT`; a row
+      whose name did not change is left untouched.
+    - fact_competitions is treated as a set of (competition_id, team_id) pairs: pairs missing
+      from the database are inserted, and pairs no longer present in the input are deleted
+      for the competitions whose teams were fetched. The facts of a competition whose fetch
+      failed in this run are kept as they were.
+    Everything runs in a single transaction.
+    Parameters:
+    dim_competitions (DataFrame): DataFrame containing data for the dim_competitions table.
+    dim_teams (DataFrame): DataFrame containing data for the dim_teams table.
+    fact_competitions (DataFrame): DataFrame containing data for the fact_competitions table.
+    db (ConnectionManager, optional): Connections shared by the stages of the run, see `create_tables()`.
+    fetched_competitions (iterable, optional): Ids of the competitions whose teams were fetched
+        in this run, see `fetched_competition_ids()`. Defaults to the competitions of fact_competitions.
+    Returns:
+    dict: Number of rows written per table, plus the number of deleted fact rows under 'fact_competitions_deleted'.
+    """
+    logger.info("Starting incremental data loading process")
+    try:
+        with session(db) as conn:
+            cursor = conn.cursor()
+            logger.debug("Connected to database")
+
+            changes = {}
+            for table, df in (("dim_competitions", dim_competitions), ("dim_teams", dim_teams)):
+                cursor.executemany(
+                    f"""
+                    INSERT INTO {table} (id, name) VALUES (?, ?)
+                    ON CONFLICT(id) DO UPDATE SET name = excluded.name
+                    WHERE {table}.name IS NOT excluded.name
+                    """,
+                    df[["id", "name"]].itertuples(index=False, name=None),
+                )
+                changes[table] = cursor.rowcount
+                logger.info(f"Upserted {changes[table]} changed rows into {table}")
+
+            # Stage the incoming fact rows, then apply only the difference
+            cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staging_fact_competitions (
+                competition_id INTEGER,
+                team_id INTEGER,
+                PRIMARY KEY (competition_id, team_id)
+            ) WITHOUT ROWID
+            """)
+            cursor.execute("DELETE FROM staging_fact_competitions")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO staging_fact_competitions (competition_id, team_id) VALUES (?, ?)",
+                fact_competitions[["competition_id", "team_id"]].itertuples(index=False, name=None),
+            )
+            if fetched_competitions is None:
+                fetched_competitions = fact_competitions["competition_id"].dropna().unique().tolist()
+            cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staging_fetched_competitions (competition_id INTEGER PRIMARY KEY)
+            """)
+            cursor.execute("DELETE FROM staging_fetched_competitions")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO staging_fetched_competitions (competition_id) VALUES (?)",
+                ((int(competition_id),) for competition_id in fetched_competitions),
+            )
+            # Only the competitions fetched in this run can have lost teams
+            cursor.execute("""
+            DELETE FROM fact_competitions
+            WHERE competition_id IN (SELECT competition_id FROM staging_fetched_competitions)
+              AND NOT EXISTS (
+                SELECT 1 FROM staging_fact_competitions s
+                WHERE s.competition_id = fact_competitions.competition_id
+                  AND s.team_id = fact_competitions.team_id
+            )
+            """)
+            changes["fact_competitions_deleted"] = cursor.rowcount
+            cursor.execute("""
+            INSERT INTO fact_competitions (competition_id, team_id)
+            SELECT competition_id, team_id FROM staging_fact_competitions
+            EXCEPT
+            SELECT competition_id, team_id FROM fact_competitions
+            """)
+            changes["fact_competitions"] = cursor.rowcount
+            cursor.execute("DROP TABLE staging_fact_competitions")
+            cursor.execute("DROP TABLE staging_fetched_competitions")
+            logger.info(
+                f"Inserted {changes['fact_competitions']} and deleted "
+                f"{changes['fact_competitions_deleted']} rows in fact_competitions"
+            )
+
+            conn.commit()
+            for table in ("dim_competitions", "dim_teams", "fact_competitions"):
+                current_metrics().add_rows(table, changes[table])
+            current_metrics().add_rows("fact_competitions_deleted", changes["fact_competitions_deleted"])
+            logger.info("Incremental data loading completed successfully")
+            return changes
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error during incremental loading: {str(e)}", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error during incremental loading: {str(e)}", exc_info=True)
+        raise
+
+
+def load_matches(fact_matches, db: ConnectionManager = None) -> int:
+    """
+    Upserts the fact_matches table built by `transform_matches()` in a single transaction.
+    Matches are keyed by their id, so fetching a season again updates the status and score
+    of the matches already loaded, and matches of other seasons are kept.
+    Parameters:
+    fact_matches (DataFrame): DataFrame containing data for the fact_matches table.
+    db (ConnectionManager, optional): Connections shared by the stages of the run, see `create_tables()`.
+    Returns:
+    int: Number of matches written.
+    """
+    logger.info("Starting matches loading process")
+    try:
+        with session(db) as conn:
+            cursor = conn.cursor()
+            logger.debug("Connected to database")
+
+            columns = list(fact_matches.columns)
+            updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "id")
+            # Nullable Int64 columns hold pd.NA, which sqlite3 cannot bind
+            rows = fact_matches.astype(object).where(fact_matches.notna(), None)
+            cursor.executemany(
+                f"""
+                INSERT INTO fact_matches ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+                ON CONFLICT(id) DO UPDATE SET {updates}
+                """,
+                rows.itertuples(index=False, name=None),
+            )
+            conn.commit()
+            current_metrics().add_rows("fact_matches", len(fact_matches))
+            logger.info(f"Loaded {len(fact_matches)} rows into fact_matches")
+            return len(fact_matches)
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error during matches loading: {str(e)}", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error during matches loading: {str(e)}", exc_info=True)
+        raise
+
+
+def _row_hash(*values) -> int:
+    """Deterministic 64-bit hash of the tracked attributes of a row, as a signed SQLite integer."""
+    digest = hashlib.blake2b(repr(values).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def create_history_tables(conn):
+    """
+    Creates the slowly changing dimension (SCD Type 2) tables, if they do not exist yet.
+    - dim_teams_history: one row per version of a team, with the hash of its tracked
+      attributes (HISTORY_TEAM_ATTRIBUTES).
+    - fact_competitions_history: one row per period during which a team belonged to a competition.
+    Every row is valid from `valid_from` (inclusive) to `valid_to` (exclusive); current rows have
+    `valid_to` = HISTORY_OPEN_END. The primary keys start with the business keys, for the history
+    of one team or competition, and the indexes on `valid_to` serve the current rows and
+    "as of" queries (rows with valid_from <= date < valid_to).
+    Unlike the current tables, these tables are never dropped or cleared by `create_tables()`.
+    Parameters:
+    conn (sqlite3.Connection): Open connection to the warehouse.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS dim_teams_history (
+        id INTEGER NOT NULL,
+        name TEXT,
+        row_hash INTEGER NOT NULL,
+        valid_from TEXT NOT NULL,
+        valid_to TEXT NOT NULL,
+        PRIMARY KEY (id, valid_from)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_dim_teams_history_valid_to
+    ON dim_teams_history (valid_to, id)
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS fact_competitions_history (
+        competition_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        valid_from TEXT NOT NULL,
+        valid_to TEXT NOT NULL,
+        PRIMARY KEY (competition_id, team_id, valid_from)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_fact_competitions_history_valid_to
+    ON fact_competitions_history (valid_to, competition_id, team_id)
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_fact_competitions_history_team_id
+    ON fact_competitions_history (team_id, valid_from)
+    """)
+
+
+def history_timestamp(value) -> str:
+    """
+    Normalizes a date or timestamp to the format of the valid_from / valid_to columns:
+    naive UTC ISO 8601 with seconds, e.g. '2024-09-13T00:00:00', so that they compare as strings.
+    Parameters:
+    value (str or datetime): ISO date, ISO timestamp (converted to UTC if it has a time zone) or datetime.
+    Returns:
+    str: The normalized timestamp.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="seconds")
+
+
+def snapshot_history(run_at: str = None, db: ConnectionManager = None) -> dict:
+    """
+    Records the current state of dim_teams and fact_competitions in the SCD Type 2 history tables.
+    Runs after a load, on the current tables, so it works with every load mode. Only the change
+    set is written, in a single transaction:
+    - teams whose attribute hash differs from their current version, or that are no longer in
+      dim_teams, get their current version closed (`valid_to` = run_at);
+    - teams that are new or were just closed get a new version starting at run_at;
+    - fact_competitions is a set of keys, so pairs that left it are closed and new pairs inserted.
+    Unchanged rows are not touched. A version opened and closed by runs with the same run_at is
+    deleted instead of being kept as an empty period.
+    Snapshots must be recorded in order: a run_at earlier than the last snapshot would close
+    versions before they start, so it is rejected and nothing is written.
+    Parameters:
+    run_at (str, optional): ISO date or timestamp of the snapshot. Defaults to the current time.
+    db (ConnectionManager, optional): Connections shared by the stages of the run, see `create_tables()`.
+    Returns:
+    dict: Number of rows inserted and closed per history table.
+    Raises:
+    ValueError: If run_at is earlier than the last snapshot of the history tables.
+    """
+    run_at = history_timestamp(run_at or datetime.now(timezone.utc))
+    logger.info(f"Recording history snapshot at {run_at}")
+    try:
+        with session(db) as conn:
+            conn.create_function("row_hash", -1, _row_hash, deterministic=True)
+            cursor = conn.cursor()
+            create_history_tables(conn)
+            params = {"run_at": run_at, "open_end": HISTORY_OPEN_END}
+            attributes = ", ".join(f"d.{column}" for column in HISTORY_TEAM_ATTRIBUTES)
+
+            changes = {}
+            cursor.execute("BEGIN")
+            last_snapshot = cursor.execute("""
+            SELECT MAX(snapshot) FROM (
+                SELECT MAX(valid_from) AS snapshot FROM dim_teams_history
+                UNION ALL SELECT MAX(valid_to) FROM dim_teams_history WHERE valid_to <> :open_end
+                UNION ALL SELECT MAX(valid_from) FROM fact_competitions_history
+                UNION ALL SELECT MAX(valid_to) FROM fact_competitions_history WHERE valid_to <> :open_end
+            )
+            """, params).fetchone()[0]
+            if last_snapshot and run_at < last_snapshot:
+                raise ValueError(
+                    f"History snapshot at {run_at} is earlier than the last one, at {last_snapshot}: "
+                    "snapshots must be recorded in order"
+                )
+            cursor.execute(f"""
+            UPDATE dim_teams_history SET valid_to = :run_at
+            WHERE valid_to = :open_end
+              AND NOT EXISTS (
+                SELECT 1 FROM dim_teams d
+                WHERE d.id = dim_teams_history.id AND row_hash({attributes}) = dim_teams_history.row_hash
+              )
+            """, params)
+            changes["dim_teams_history_closed"] = cursor.rowcount
+            cursor.execute(EMPTY_PERIOD_DELETE.format(table="dim_teams_history"), params)
+            cursor.execute(f"""
+            INSERT INTO dim_teams_history (id, {', '.join(HISTORY_TEAM_ATTRIBUTES)}, row_hash, valid_from, valid_to)
+            SELECT d.id, {attributes}, row_hash({attributes}), :run_at, :open_end
+            FROM dim_teams d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM dim_teams_history h WHERE h.id = d.id AND h.valid_to = :open_end
+            )
+            """, params)
+            changes["dim_teams_history"] = cursor.rowcount
+
+            cursor.execute("""
+            UPDATE fact_competitions_history SET valid_to = :run_at
+            WHERE valid_to = :open_end
+              AND NOT EXISTS (
+                SELECT 1 FROM fact_competitions f
+                WHERE f.competition_id = fact_competitions_history.competition_id
+                  AND f.team_id = fact_competitions_history.team_id
+              )
+            """, params)
+            changes["fact_competitions_history_closed"] = cursor.rowcount
+            cursor.execute(EMPTY_PERIOD_DELETE.format(table="fact_competitions_history"), params)
+            cursor.execute("""
+            INSERT INTO fact_competitions_history (competition_id, team_id, valid_from, valid_to)
+            SELECT f.competition_id, f.team_id, :run_at, :open_end
+            FROM fact_competitions f
+            WHERE NOT EXISTS (
+                SELECT 1 FROM fact_competitions_history h
+                WHERE h.competition_id = f.competition_id AND h.team_id = f.team_id AND h.valid_to = :open_end
+            )
+            """, params)
+            changes["fact_competitions_history"] = cursor.rowcount
+
+            conn.commit()
+
+            for table, count in changes.items():
+                current_metrics().add_rows(table, count)
+            logger.info(f"History snapshot written: {changes}")
+            return changes
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error during history snapshot: {str(e)}", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error during history snapshot: {str(e)}", exc_info=True)
+        raise
+
+
+def history_as_of(as_of: str, db: ConnectionManager = None):
+    """
+    Returns the teams of every competition as they were at a point in time.
+    Parameters:
+    as_of (str): ISO date or timestamp, see `history_timestamp()`. A date means the start of that day.
+    db (ConnectionManager, optional): Connections of the run; the query runs on a pooled reader.
+    Returns:
+    DataFrame: Columns competition_id, team_id and team_name.
+    """
+    with reading(db) as conn:
+        df = pd.read_sql_query(HISTORY_AS_OF_QUERY, conn, params={"as_of": history_timestamp(as_of)})
+    return df.sort_values(["competition_id", "team_id"], ignore_index=True)
+
+
+class SQLiteBackend:
+    """
+    The SQLite warehouse, through the module functions: `create_tables()`, `load_data()`
+    or `bulk_load_data()`, and `load_matches()`; queries run on a pooled reader. The
+    summary is read from the aggregate tables.
+
+    Args:
+        db (ConnectionManager, optional): Connections shared by the stages of the run.
+            Without it, every call opens and closes its own connection to DB_PATH.
+    """
+
+    name = "sqlite"
+    summary_query = AGGREGATE_SUMMARY_QUERY
+
+    def __init__(self, db: ConnectionManager = None):
+        self.db = db
+        self.path = db.path if db else DB_PATH
+
+    def create_tables(self, clear_existing: bool = True):
+        create_tables(clear_existing, db=self.db)
+
+    def load(self, dim_competitions, dim_teams, fact_competitions, bulk: bool = False):
+        if bulk:
+            bulk_load_data(dim_competitions, dim_teams, fact_competitions, db=self.db)
+        else:
+            load_data(dim_competitions, dim_teams, fact_competitions, db=self.db)
+
+    def load_matches(self, fact_matches) -> int:
+        return load_matches(fact_matches, db=self.db)
+
+    def query(self, sql: str, params=None):
+        """Runs a query and returns its result as a DataFrame."""
+        with reading(self.db) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def iter_query(self, sql: str, params=None, chunk_size: int = QUERY_CHUNK_SIZE):
+        """Runs a query and yields its result as DataFrames of at most `chunk_size` rows, see `_iter_cursor()`."""
+        with reading(self.db) as conn:
+            yield from _iter_cursor(conn.execute(sql, params or ()), chunk_size)
+
+
+class DuckDBBackend:
+    """
+    A DuckDB warehouse in DUCKDB_PATH, an embedded columnar database for the aggregate queries.
+
+    It holds the same tables as the SQLite warehouse, rebuilt by every run except fact_matches: the DataFrames
+    are appended in bulk with `INSERT INTO ... SELECT` over the registered DataFrame, which
+    DuckDB scans column by column instead of binding rows one at a time. With pyarrow, the
+    DataFrame is converted to an Arrow table first, which DuckDB reads without going
+    through Python string objects. The tables declare no keys, since ART indexes would slow down the
+    appends without helping the scans of the aggregates; fact_competitions is made unique
+    by a DISTINCT and fact_matches by replacing the loaded match ids.
+
+    Args:
+        path (str): Path of the database file.
+    Raises:
+        ImportError: If duckdb is not installed.
+    """
+
+    name = "duckdb"
+    summary_query = SUMMARY_QUERY
+    tables = {
+        "dim_competitions": "id INTEGER, name VARCHAR",
+        "dim_teams": "id INTEGER, name VARCHAR",
+        "fact_competitions": "competition_id INTEGER NOT NULL, team_id INTEGER NOT NULL",
+        "fact_matches": """
+            id BIGINT, competition_id INTEGER NOT NULL, season_id INTEGER, utc_date VARCHAR,
+            status VARCHAR, matchday INTEGER, stage VARCHAR, home_team_id INTEGER, away_team_id INTEGER,
+            home_score INTEGER, away_score INTEGER, winner VARCHAR, last_updated VARCHAR
+        """,
+    }
+
+    def __init__(self, path: str = DUCKDB_PATH):
+        if duckdb is None:
+            raise ImportError("The duckdb warehouse backend requires duckdb")
+        self.path = path
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = duckdb.connect(self.path)
+        conn.execute("SET enable_progress_bar = false")
+        return conn
+
+    def create_tables(self, clear_existing: bool = True):
+        """
+        Creates the warehouse tables, replacing the ones of the previous run if `clear_existing`
+        is True, except fact_matches, whose matches are kept like on SQLite.
+        """
+        conn = self.connect()
+        try:
+            for table, columns in self.tables.items():
+                replace = clear_existing and table != "fact_matches"
+                create = "CREATE OR REPLACE TABLE" if replace else "CREATE TABLE IF NOT EXISTS"
+                conn.execute(f"{create} {table} ({columns})")
+            logger.info(f"DuckDB tables created in {self.path}")
+        finally:
+            conn.close()
+
+    def _append(self, conn, table: str, df, distinct: bool = False) -> int:
+        conn.register("batch", pa.Table.from_pandas(df, preserve_index=False) if pa is not None else df)
+        try:
+            columns = ", ".join(df.columns)
+            # DuckDB answers an INSERT with the number of rows it wrote
+            return conn.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {'DISTINCT ' if distinct else ''}{columns} FROM batch"
+            ).fetchone()[0]
+        finally:
+            conn.unregister("batch")
+
+    def load(self, dim_competitions, dim_teams, fact_competitions, bulk: bool = True):
+        """
+        Appends the three tables in one transaction. Every DuckDB load is a bulk load, so
+        `bulk` is only accepted for compatibility with `SQLiteBackend.load()`.
+        """
+        logger.info("Starting DuckDB data loading process")
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            counts = {
+                "dim_competitions": self._append(conn, "dim_competitions", dim_competitions[["id", "name"]]),
+                "dim_teams": self._append(conn, "dim_teams", dim_teams[["id", "name"]]),
+                "fact_competitions": self._append(
+                    conn, "fact_competitions", fact_competitions[["competition_id", "team_id"]], distinct=True
+                ),
+            }
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            logger.error(f"Error during DuckDB loading: {str(e)}", exc_info=True)
+            raise
+        finally:
             conn.close()
-            logger.debug("Database connection closed")
\ No newline at end of file
+
+        for table, count in counts.items():
+            current_metrics().add_rows(table, count)
+            logger.info(f"Loaded {count} rows into {table}")
+        logger.info("DuckDB data loading completed successfully")
+
+    def load_matches(self, fact_matches) -> int:
+        """Replaces the matches already loaded with the same ids and appends the others, see `load_matches()`."""
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            conn.register("matches", fact_matches)
+            conn.execute("DELETE FROM fact_matches WHERE id IN (SELECT id FROM matches)")
+            conn.unregister("matches")
+            self._append(conn, "fact_matches", fact_matches)
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            logger.error(f"Error during DuckDB matches loading: {str(e)}", exc_info=True)
+            raise
+        finally:
+            conn.close()
+
+        current_metrics().add_rows("fact_matches", len(fact_matches))
+        logger.info(f"Loaded {len(fact_matches)} rows into fact_matches")
+        return len(fact_matches)
+
+    def query(self, sql: str, params=None):
+        """Runs a query and returns its result as a DataFrame."""
+        conn = self.connect()
+        try:
+            return conn.execute(sql, params).df()
+        finally:
+            conn.close()
+
+    def iter_query(self, sql: str, params=None, chunk_size: int = QUERY_CHUNK_SIZE):
+        """Runs a query and yields its result as DataFrames of at most `chunk_size` rows, see `_iter_cursor()`."""
+        conn = self.connect()
+        try:
+            yield from _iter_cursor(conn.execute(sql, params), chunk_size)
+        finally:
+            conn.close()
+
+
+BACKENDS = {"sqlite": SQLiteBackend, "duckdb": DuckDBBackend}
+
+
+def get_backend(name: str = WAREHOUSE_BACKEND, db: ConnectionManager = None):
+    """
+    Returns the warehouse backend called `name`, see BACKENDS.
+    Args:
+        name (str): 'sqlite' or 'duckdb'.
+        db (ConnectionManager, optional): Connections of the run, used by the SQLite backend;
+            DuckDB opens its own database file.
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If its database driver is not installed.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown warehouse backend {name!r}, expected one of {sorted(BACKENDS)}")
+    if name == "sqlite":
+        return SQLiteBackend(db)
+    return BACKENDS[name]()
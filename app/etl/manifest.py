@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import logging
+import threading
+from datetime import datetime
+
+from .cache import _write_atomic
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+def file_checksum(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Checkpoint of an extraction run, stored as `manifest.json` next to the raw files.
+
+    Every raw file written by the run (competitions.json and one teams_<code>.json per
+    competition) gets an entry with its status and, once complete, its size and SHA-256
+    checksum. The manifest is rewritten after every entry, so a run that dies halfway
+    leaves a record of what finished, and a resumed run only fetches the rest.
+
+    Args:
+        folder (str): Directory holding the raw files and the manifest.
+        entries (dict, optional): Entries of an existing manifest, keyed by file name.
+    """
+
+    def __init__(self, folder: str, entries: dict = None):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_FILE)
+        self.started_at = datetime.now().isoformat()
+        self.entries = entries or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, folder: str) -> "RunManifest":
+        """
+        Reads the manifest of a previous run from `folder`.
+        A missing or unreadable manifest yields an empty one, so everything is fetched again.
+        """
+        path = os.path.join(folder, MANIFEST_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entries = json.load(file).get("files", {})
+        except FileNotFoundError:
+            logger.info(f"No manifest found in {folder}, nothing to resume")
+            entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            entries = {}
+        return cls(folder, entries)
+
+    def is_complete(self, file_name: str) -> bool:
+        """
+        Tells whether a raw file was completed by a previous run and is still intact
+        on disk, i.e. it exists and matches the recorded size and checksum.
+        """
+        with self._lock:
+            entry = self.entries.get(file_name)
+        if not entry or entry.get("status") != "complete":
+            return False
+
+        file_path = os.path.join(self.folder, file_name)
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != entry.get("bytes"):
+            logger.warning(f"Raw file {file_path} is missing or was modified, fetching it again")
+            return False
+        if file_checksum(file_path) != entry.get("sha256"):
+            logger.warning(f"Checksum mismatch for {file_path}, fetching it again")
+            return False
+        return True
+
+    def mark_complete(self, file_name: str) -> None:
+        """Records a raw file as complete, with its size and checksum, and saves the manifest."""
+        file_path = os.path.join(self.folder, file_name)
+        entry = {
+            "status": "complete",
+            "bytes": os.path.getsize(file_path),
+            "sha256": file_checksum(file_path),
+            "updated_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.entries[file_name] = entry
+            self._save()
+
+    def mark_failed(self, file_name: str) -> None:
+        """Records a raw file whose request failed, so a resumed run fetches it again."""
+        with self._lock:
+            self.entries[file_name] = {"status": "failed", "updated_at": datetime.now().isoformat()}
+            self._save()
+
+    def counts(self) -> dict:
+        """Returns the number of entries of each status."""
+        with self._lock:
+            statuses = [entry.get("status") for entry in self.entries.values()]
+        return {status: statuses.count(status) for status in set(statuses)}
+
+    def _save(self) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        manifest = {"started_at": self.started_at, "files": self.entries}
+        _write_atomic(self.path, json.dumps(manifest, indent=2, sort_keys=True))
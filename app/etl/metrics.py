@@ -0,0 +1,265 @@
+import json
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = "logs"
+METRIC_PREFIX = "football_etl"
+
+
+def peak_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of the current process, in bytes,
+    or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RunMetrics:
+    """
+    Collects the metrics of one pipeline run.
+
+    Stages record wall and CPU time; the extract step records every HTTP request
+    and every wait caused by the rate limit or by retries; the loaders record the
+    rows they write. All methods are thread-safe, so concurrent extraction workers
+    can share one instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.status = "running"
+        self.stages = {}
+        self.request_latencies = []
+        self.requests_by_status = {}
+        self.requests_by_key = {}
+        self.bytes_downloaded = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.retry_wait_seconds = 0.0
+        self.rows_written = {}
+        self.failed_tasks = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times a pipeline stage. Timing the same stage several times, e.g. once per
+        batch of the streaming pipeline, adds up the durations.
+        Args:
+            name (str): Name of the stage, e.g. 'extract', 'transform' or 'load'.
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            with self._lock:
+                totals = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+                totals["wall_seconds"] += wall
+                totals["cpu_seconds"] += cpu
+                totals["calls"] += 1
+                # The peak RSS only grows, so its value at the end of a stage bounds that stage's memory
+                totals["peak_rss_bytes"] = peak_rss_bytes()
+
+    def record_request(self, latency: float, status, size: int = 0, api_key: str = None):
+        """
+        Records one HTTP request.
+        Args:
+            latency (float): Seconds between sending the request and receiving the response.
+            status (int or str): The HTTP status code, or 'error' when no response was received.
+            size (int): Number of bytes of the response body.
+            api_key (str, optional): Label of the API key of the request, when it was sent
+                with a key of a `KeyPool`.
+        """
+        with self._lock:
+            self.request_latencies.append(latency)
+            key = str(status)
+            self.requests_by_status[key] = self.requests_by_status.get(key, 0) + 1
+            if api_key is not None:
+                by_status = self.requests_by_key.setdefault(api_key, {})
+                by_status[key] = by_status.get(key, 0) + 1
+            self.bytes_downloaded += size
+
+    def add_bytes(self, size: int):
+        """Records response bytes read outside `record_request()`, e.g. a streamed body."""
+        with self._lock:
+            self.bytes_downloaded += size
+
+    def record_wait(self, seconds: float, rate_limited: bool = True):
+        """
+        Records time spent sleeping before a request.
+        Args:
+            seconds (float): Duration of the wait.
+            rate_limited (bool): True for waits caused by the API quota (429 responses and the
+                client-side rate limiter), False for backoffs after errors.
+        """
+        with self._lock:
+            if rate_limited:
+                self.rate_limit_wait_seconds += seconds
+            else:
+                self.retry_wait_seconds += seconds
+
+    def add_rows(self, table: str, count: int):
+        """Records rows written to a table."""
+        with self._lock:
+            self.rows_written[table] = self.rows_written.get(table, 0) + int(count)
+
+    def record_failed_task(self, kind: str, key: str, error: str = None):
+        """Records a request given up after every attempt, whose data is missing from the run."""
+        with self._lock:
+            self.failed_tasks.append({"kind": kind, "key": key, "error": error})
+
+    def finish(self, status: str = "success"):
+        """Marks the run as finished with the given status."""
+        self.status = status
+        self.finished_at = datetime.now()
+
+    def to_dict(self) -> dict:
+        """
+        Returns the run report as a JSON-serializable dictionary.
+        """
+        with self._lock:
+            latencies = sorted(self.request_latencies)
+            finished_at = self.finished_at or datetime.now()
+            return {
+                "started_at": self.started_at.isoformat(),
+                "finished_at": finished_at.isoformat(),
+                "duration_seconds": (finished_at - self.started_at).total_seconds(),
+                "status": self.status,
+                "stages": {name: dict(totals) for name, totals in self.stages.items()},
+                "http": {
+                    "requests": len(latencies),
+                    "requests_by_status": dict(self.requests_by_status),
+                    "requests_by_key": {key: dict(counts) for key, counts in self.requests_by_key.items()},
+                    "bytes_downloaded": self.bytes_downloaded,
+                    "latency_seconds": {
+                        "total": sum(latencies),
+                        "mean": sum(latencies) / len(latencies) if latencies else None,
+                        "p50": _percentile(latencies, 0.50),
+                        "p95": _percentile(latencies, 0.95),
+                        "max": latencies[-1] if latencies else None,
+                    },
+                },
+                "rate_limit_wait_seconds": self.rate_limit_wait_seconds,
+                "retry_wait_seconds": self.retry_wait_seconds,
+                "rows_written": dict(self.rows_written),
+                "failed_tasks": [dict(task) for task in self.failed_tasks],
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the run report in the Prometheus text exposition format, e.g. for the
+        node_exporter textfile collector.
+        """
+        report = self.to_dict()
+        lines = []
+
+        def metric(name, help_text, metric_type, samples):
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{full_name}{{{label_text}}} {value}" if label_text else f"{full_name} {value}")
+
+        metric("run_success", "1 if the last run succeeded, 0 otherwise", "gauge",
+               [({}, int(report["status"] == "success"))])
+        metric("run_duration_seconds", "Wall time of the whole run", "gauge",
+               [({}, report["duration_seconds"])])
+        metric("stage_wall_seconds", "Wall time spent in each pipeline stage", "gauge",
+               [({"stage": name}, totals["wall_seconds"]) for name, totals in report["stages"].items()])
+        metric("stage_cpu_seconds", "CPU time spent in each pipeline stage", "gauge",
+               [({"stage": name}, totals["cpu_seconds"]) for name, totals in report["stages"].items()])
+        metric("stage_peak_rss_bytes", "Peak resident set size at the end of each pipeline stage", "gauge",
+               [({"stage": name}, totals.get("peak_rss_bytes")) for name, totals in report["stages"].items()])
+        metric("http_requests_total", "HTTP requests sent, by status code", "counter",
+               [({"status": status}, count) for status, count in report["http"]["requests_by_status"].items()])
+        metric("http_key_requests_total", "HTTP requests sent, by API key and status code", "counter",
+               [({"key": key, "status": status}, count)
+                for key, counts in report["http"]["requests_by_key"].items()
+                for status, count in counts.items()])
+        metric("http_request_duration_seconds_sum", "Total HTTP request latency", "counter",
+               [({}, report["http"]["latency_seconds"]["total"])])
+        metric("http_bytes_downloaded_total", "Bytes of HTTP response bodies", "counter",
+               [({}, report["http"]["bytes_downloaded"])])
+        metric("rate_limit_wait_seconds_total", "Time spent waiting for the API quota", "counter",
+               [({}, report["rate_limit_wait_seconds"])])
+        metric("retry_wait_seconds_total", "Time spent in backoff after errors", "counter",
+               [({}, report["retry_wait_seconds"])])
+        metric("rows_written_total", "Rows written to the warehouse, by table", "counter",
+               [({"table": table}, count) for table, count in report["rows_written"].items()])
+        metric("failed_tasks", "Requests given up after every attempt, by kind", "gauge",
+               [({"kind": kind}, sum(task["kind"] == kind for task in report["failed_tasks"]))
+                for kind in sorted({task["kind"] for task in report["failed_tasks"]})])
+        metric("peak_rss_bytes", "Peak resident set size of the process", "gauge",
+               [({}, report["peak_rss_bytes"])])
+        return "\n".join(lines) + "\n"
+
+
+_current = RunMetrics()
+
+
+def current_metrics() -> RunMetrics:
+    """Returns the metrics of the run in progress."""
+    return _current
+
+
+def start_run_metrics() -> RunMetrics:
+    """Starts collecting the metrics of a new run and returns them."""
+    global _current
+    _current = RunMetrics()
+    return _current
+
+
+def write_report(run_metrics: RunMetrics, folder: str = METRICS_DIR, prometheus: bool = False) -> str:
+    """
+    Writes the run report as JSON, and optionally in Prometheus text format, to `folder`.
+    Args:
+        run_metrics (RunMetrics): The metrics of the run.
+        folder (str): Directory of the reports, next to the log files by default.
+        prometheus (bool): Also write a .prom file with the same metrics.
+    Returns:
+        str: The path of the JSON report.
+    """
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, f"football_etl_{run_metrics.started_at.strftime('%Y%m%d_%H%M%S')}")
+
+    report_path = f"{base}.json"
+    with open(report_path, "w", encoding="utf-8") as file:
+        json.dump(run_metrics.to_dict(), file, indent=2)
+    logger.info(f"Run report written to {report_path}")
+
+    if prometheus:
+        prometheus_path = f"{base}.prom"
+        with open(prometheus_path, "w", encoding="utf-8") as file:
+            file.write(run_metrics.to_prometheus())
+        logger.info(f"Prometheus metrics written to {prometheus_path}")
+
+    return report_path
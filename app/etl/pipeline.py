@@ -0,0 +1,76 @@
+import logging
+
+from .database import ConnectionManager, session
+from .load import create_tables, load_batch
+from .metrics import current_metrics
+from .transform import transform_data
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def iter_batches(source, batch_size: int = BATCH_SIZE):
+    """
+    Groups the (competition, team_rows) pairs of a streaming source into bounded batches.
+    A batch is emitted as soon as it holds at least `batch_size` team rows, so at most one
+    batch, plus the competition that completed it, is held in memory at a time.
+    Args:
+        source (iterable): Pairs yielded by `iter_extract()` or `iter_replay()`.
+        batch_size (int): Number of team rows that triggers a flush.
+    Yields:
+        tuple: A (competitions, all_teams) pair, in the format expected by `transform_data()`.
+    """
+    competitions, all_teams = [], []
+    for competition, team_rows in source:
+        competitions.append(competition)
+        all_teams.extend(team_rows)
+        if len(all_teams) >= batch_size:
+            yield competitions, all_teams
+            competitions, all_teams = [], []
+
+    if competitions:
+        yield competitions, all_teams
+
+
+def run_streaming_pipeline(
+    source, batch_size: int = BATCH_SIZE, transform=transform_data, db: ConnectionManager = None
+) -> dict:
+    """
+    Runs transform and load on each batch of a streaming source as soon as it is complete.
+    The tables are (re)created first, then every batch goes through `transform` and
+    is committed with `load_batch()` on a single connection, so the database fills while
+    later API calls are still running and peak memory does not grow with the number of
+    competitions.
+    Args:
+        source (iterable): Pairs yielded by `iter_extract()` or `iter_replay()`.
+        batch_size (int): Number of team rows per batch.
+        transform (callable): Transform applied to each batch, `transform_data()` or `transform_data_compact()`.
+        db (ConnectionManager, optional): Connections shared by the stages of the run. Without it, the
+            stream opens its own connection and closes it at the end.
+    Returns:
+        dict: Number of batches, competitions and fact rows processed.
+    """
+    logger.info(f"Starting streaming pipeline with batches of {batch_size} team rows")
+    create_tables(db=db)
+
+    stats = {"batches": 0, "competitions": 0, "fact_rows": 0}
+    metrics = current_metrics()
+    with session(db) as conn:
+        for competitions, all_teams in iter_batches(source, batch_size):
+            with metrics.stage("transform"):
+                dim_competitions, dim_teams, fact_competitions = transform(competitions, all_teams)
+            with metrics.stage("load"):
+                stats["fact_rows"] += load_batch(conn, dim_competitions, dim_teams, fact_competitions)
+            stats["competitions"] += len(competitions)
+            stats["batches"] += 1
+            logger.info(
+                f"Loaded batch {stats['batches']}: {len(competitions)} competitions, "
+                f"{len(fact_competitions)} fact rows"
+            )
+
+    logger.info(
+        f"Streaming pipeline completed: {stats['batches']} batches, "
+        f"{stats['competitions']} competitions, {stats['fact_rows']} fact rows"
+    )
+    return stats
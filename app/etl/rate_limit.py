@@ -0,0 +1,170 @@
+import threading
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds added to the quota window, so that the jitter of the network latency cannot move
+# a request sent just after the window into the previous minute of the server
+WINDOW_MARGIN_SECONDS = 1.0
+
+
+class SlidingWindowLimiter:
+    """
+    Thread-safe sliding-window limiter used to keep API calls under the plan's quota.
+
+    The limiter keeps the send time of the last `limit` requests. `acquire()` only lets a
+    request through when fewer than `limit` requests were sent in the last `window` seconds,
+    and blocks until the oldest one leaves the window otherwise. Any `window` seconds
+    therefore hold at most `limit` requests, whichever minute the server counts them in.
+
+    Args:
+        limit (int): Maximum number of requests in a window.
+        window (float): Length of the window in seconds.
+    """
+
+    def __init__(self, limit: int, window: float):
+        if limit <= 0 or window <= 0:
+            raise ValueError("limit and window must be positive")
+        self.limit = limit
+        self.window = window
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: int) -> "SlidingWindowLimiter":
+        """Builds a limiter for a requests-per-minute quota."""
+        return cls(limit=requests_per_minute, window=60.0 + WINDOW_MARGIN_SECONDS)
+
+    def _expire(self, now: float):
+        while self._sent and self._sent[0] <= now - self.window:
+            self._sent.popleft()
+
+    def try_acquire(self) -> bool:
+        """Records one request if the window has room for it, without waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._sent) < self.limit:
+                self._sent.append(now)
+                return True
+            return False
+
+    def wait_time(self) -> float:
+        """Returns the number of seconds until the window has room for a request."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._sent) < self.limit:
+                return 0.0
+            return self._sent[0] + self.window - now
+
+    def acquire(self) -> float:
+        """
+        Records one request, waiting for the oldest request to leave the window if it is full.
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                if len(self._sent) < self.limit:
+                    self._sent.append(now)
+                    return waited
+                delay = self._sent[0] + self.window - now
+
+            logger.debug(f"Rate limiter full, waiting {delay:.2f} seconds")
+            time.sleep(delay)
+            waited += delay
+
+
+class ApiKey:
+    """
+    One credential of a `KeyPool`, with its own rate-limit state.
+
+    Args:
+        token (str): The API key sent in the X-Auth-Token header.
+        label (str): Name of the key in logs and metrics, which never show the full token.
+        limiter (SlidingWindowLimiter): Client-side quota of the key.
+    """
+
+    def __init__(self, token: str, label: str, limiter: SlidingWindowLimiter):
+        self.token = token
+        self.label = label
+        self.limiter = limiter
+        self.blocked_until = 0.0
+        self.revoked = False
+
+
+class KeyPool:
+    """
+    Thread-safe pool of API keys, each with its own quota, used as the rate limiter of
+    the extraction when several keys are configured.
+
+    `acquire()` hands out the keys in turn, skipping the ones that are revoked, throttled
+    by the server or with a full window, and only waits when no key can send a request. With
+    N keys of R requests per minute, the workers can therefore send up to N * R requests
+    per minute. A key answered with a 429 is set aside until its retry delay is over
+    (`throttle()`) and a rejected key is never used again (`revoke()`), so the request is
+    retried on the next key instead of waiting for the same one.
+
+    Args:
+        tokens (list): The API keys.
+        requests_per_minute (int): Quota of each key.
+    Raises:
+        ValueError: If no key is given.
+    """
+
+    def __init__(self, tokens: list, requests_per_minute: int):
+        if not tokens:
+            raise ValueError("At least one API key is required")
+        self.keys = [
+            ApiKey(token, f"key{index + 1}-{token[-4:]}", SlidingWindowLimiter.per_minute(requests_per_minute))
+            for index, token in enumerate(tokens)
+        ]
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> tuple:
+        """
+        Records a request on the next key able to send one, waiting if none is.
+        Returns:
+            tuple: The ApiKey to use and the number of seconds spent waiting for it.
+        Raises:
+            RuntimeError: If every key of the pool was revoked.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                usable = [key for key in self.keys if not key.revoked]
+                if not usable:
+                    raise RuntimeError("Every API key of the pool was revoked")
+                for offset in range(len(self.keys)):
+                    index = (self._next + offset) % len(self.keys)
+                    key = self.keys[index]
+                    if key.revoked or key.blocked_until > now or not key.limiter.try_acquire():
+                        continue
+                    self._next = (index + 1) % len(self.keys)
+                    return key, waited
+                delay = min(max(key.blocked_until - now, key.limiter.wait_time()) for key in usable)
+
+            logger.debug(f"Every API key is busy, waiting {delay:.2f} seconds")
+            time.sleep(delay)
+            waited += delay
+
+    def throttle(self, key: ApiKey, seconds: float):
+        """Sets a key aside for `seconds`, after the server answered it with a 429."""
+        with self._lock:
+            key.blocked_until = max(key.blocked_until, time.monotonic() + seconds)
+        logger.warning(f"API key {key.label} throttled for {seconds:.1f} seconds")
+
+    def revoke(self, key: ApiKey):
+        """Stops using a key the server rejected."""
+        with self._lock:
+            key.revoked = True
+        logger.error(f"API key {key.label} was rejected by the API, it will not be used again")
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+STATE_PATH = os.getenv("STATE_PATH", "data/state.sqlite")
+
+
+def competition_version(competition: dict) -> tuple:
+    """
+    Returns what identifies the version of a competition in competitions.json:
+    its `lastUpdated` timestamp and the id of its current season.
+    """
+    season = competition.get("currentSeason") or {}
+    return competition.get("lastUpdated"), season.get("id")
+
+
+class CompetitionState:
+    """
+    Last seen version of every competition, with its teams, in a local SQLite table.
+
+    The `competition_state` table holds, per competition code, the `lastUpdated` timestamp
+    and current season id read from competitions.json when its teams were last fetched,
+    and the body of that teams response. While both values are unchanged, the extraction
+    reuses the stored teams instead of requesting them again, see `unchanged_teams()`.
+    The file lives outside DATA_FOLDER, so it survives `drop_data()`.
+
+    The connection is shared by the extraction workers, behind a lock.
+
+    Args:
+        path (str): Path of the SQLite file; its directory is created if needed.
+    """
+
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS competition_state (
+            code TEXT PRIMARY KEY,
+            last_updated TEXT NOT NULL,
+            season_id INTEGER,
+            teams TEXT NOT NULL,
+            fetched_at TEXT NOT NULL
+        )
+        """)
+        self._conn.commit()
+
+    def unchanged_teams(self, competition: dict) -> str:
+        """
+        Returns the stored teams of a competition whose version did not change.
+        Args:
+            competition (dict): A competition object of competitions.json.
+        Returns:
+            str: The body of the teams response stored by `record()`, or None when the
+                 competition is new, changed, or has no `lastUpdated` to compare.
+        """
+        last_updated, season_id = competition_version(competition)
+        if last_updated is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT teams FROM competition_state WHERE code = ? AND last_updated = ? AND season_id IS ?",
+                (competition.get("code"), last_updated, season_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, competition: dict, teams: str):
+        """
+        Stores the version of a competition with the body of its freshly fetched teams response.
+        Competitions without a `lastUpdated` are not stored, since they cannot be compared.
+        """
+        last_updated, season_id = competition_version(competition)
+        if last_updated is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO competition_state (code, last_updated, season_id, teams, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(code) DO UPDATE SET last_updated = excluded.last_updated,
+                    season_id = excluded.season_id, teams = excluded.teams, fetched_at = excluded.fetched_at
+                """,
+                (competition.get("code"), last_updated, season_id, teams, datetime.now().isoformat()),
+            )
+            self._conn.commit()
+        logger.debug(f"Recorded competition {competition.get('code')} at {last_updated}, season {season_id}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,8 +1,40 @@
+import os
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context, resource_tracker, shared_memory
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - optional dependency
+    pl = None
 
 logger = logging.getLogger(__name__)
 
+ID_DTYPE = np.int32
+MATCH_COLUMNS = [
+    "id", "competition_id", "season_id", "utc_date", "status", "matchday", "stage",
+    "home_team_id", "away_team_id", "home_score", "away_score", "winner", "last_updated",
+]
+MATCH_INTEGER_COLUMNS = [
+    "id", "competition_id", "season_id", "matchday", "home_team_id", "away_team_id", "home_score", "away_score",
+]
+# Dataframe library of the transform and of the summary export: 'pandas' or 'polars'
+ENGINES = ("pandas", "polars")
+DATAFRAME_ENGINE = os.getenv("DATAFRAME_ENGINE", "pandas")
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", str(os.cpu_count() or 1)))
+# Below this many team rows, starting the worker processes costs more than the transform
+PARALLEL_TRANSFORM_MIN_ROWS = int(os.getenv("PARALLEL_TRANSFORM_MIN_ROWS", "200000"))
+
+# Team rows of the running parallel transform, inherited by the forked worker processes
+_partition_rows = None
+
 def transform_data(competitions, all_teams):
     """
     Transforms the extracted data into DataFrames.
@@ -43,4 +75,370 @@ def transform_data(competitions, all_teams):
 
     except Exception as e:
         logger.error(f"Error during transformation: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+
+def name_dtype():
+    """
+    Returns the compact dtype used for name columns: Arrow-backed strings when pyarrow is
+    installed, pandas categoricals otherwise.
+    """
+    if pa is not None:
+        return pd.ArrowDtype(pa.string())
+    return "category"
+
+
+def _id_array(values: list) -> np.ndarray:
+    """Converts a list of ids, possibly holding None, to a float array where None is NaN."""
+    return np.array(values, dtype=np.float64)
+
+
+def transform_data_compact(competitions, all_teams):
+    """
+    Transforms the extracted data into compact DataFrames.
+    This function returns the same three tables as `transform_data()`, but:
+    - the id columns are built straight from the rows into numpy arrays, without creating
+      intermediate DataFrames of dictionaries, and stored as int32;
+    - dim_teams is deduplicated on the integer team id, and only the names of the first
+      occurrence of each team are ever materialized;
+    - name columns use Arrow-backed strings (or categoricals without pyarrow), see `name_dtype()`;
+    - fact rows without a competition or team id are dropped, since they cannot be loaded.
+    Args:
+        competitions (list): A list of dictionaries containing competition data.
+        all_teams (list): A list of dictionaries containing team data.
+    Returns:
+        tuple: A tuple containing three pandas DataFrames:
+            - dim_competitions: DataFrame for competitions dimension with columns ["id", "name"].
+            - dim_teams: DataFrame for teams dimension with columns ["id", "name"].
+            - fact_competitions: DataFrame for relationships between teams and competitions with columns ["competition_id", "team_id"].
+    """
+    logger.info("Starting compact data transformation process")
+
+    try:
+        # Competitions are a handful of rows: check each column for nulls
+        logger.debug("Creating competitions dimension DataFrame")
+        competition_ids = _id_array([competition.get("id") for competition in competitions])
+        competition_names = [competition.get("name") for competition in competitions]
+        valid = ~np.isnan(competition_ids) & np.array([name is not None for name in competition_names], dtype=bool)
+        if not valid.all():
+            logger.warning(f"Found {int((~valid).sum())} competitions with null values")
+        dim_competitions = pd.DataFrame({
+            "id": competition_ids[valid].astype(ID_DTYPE),
+            "name": pd.Series([name for name, keep in zip(competition_names, valid) if keep], dtype=name_dtype()),
+        })
+        logger.info(f"Created competitions dimension with shape: {dim_competitions.shape}")
+
+        # Fact table straight from the id columns
+        logger.debug("Creating fact competitions DataFrame")
+        fact_competition_ids = _id_array([team["competition_id"] for team in all_teams])
+        fact_team_ids = _id_array([team["team_id"] for team in all_teams])
+        valid = ~(np.isnan(fact_competition_ids) | np.isnan(fact_team_ids))
+        if not valid.all():
+            logger.warning(f"Dropping {int((~valid).sum())} team rows with null ids")
+        fact_competitions = pd.DataFrame({
+            "competition_id": fact_competition_ids[valid].astype(ID_DTYPE),
+            "team_id": fact_team_ids[valid].astype(ID_DTYPE),
+        })
+        logger.info(f"Created fact table with shape: {fact_competitions.shape}")
+
+        # Teams dimension: deduplicate on the integer key, then fetch only the first names
+        logger.debug("Creating teams dimension DataFrame")
+        first = ~fact_competitions["team_id"].duplicated().to_numpy()
+        row_index = np.flatnonzero(valid)[first]
+        dim_teams = pd.DataFrame({
+            "id": fact_competitions["team_id"].to_numpy()[first],
+            "name": pd.Series([all_teams[i]["team_name"] for i in row_index], dtype=name_dtype()),
+        })
+        logger.info(f"Created teams dimension with shape: {dim_teams.shape}")
+
+        logger.info("Compact data transformation completed successfully")
+        return dim_competitions, dim_teams, fact_competitions
+
+    except Exception as e:
+        logger.error(f"Error during compact transformation: {str(e)}", exc_info=True)
+        raise
+
+
+def transform_matches(match_rows):
+    """
+    Transforms the match rows returned by `extract_matches()` into the fact_matches DataFrame.
+    Matches without an id or competition are dropped, and a match fetched more than once
+    keeps its last version. Integer columns use the nullable Int64 dtype, since scheduled
+    matches have no score and some competitions have no matchday.
+    Args:
+        match_rows (list): A list of dictionaries containing match data.
+    Returns:
+        DataFrame: The fact_matches table with columns MATCH_COLUMNS.
+    """
+    logger.info("Starting matches transformation process")
+
+    try:
+        fact_matches = pd.DataFrame(match_rows, columns=MATCH_COLUMNS)
+        invalid = fact_matches["id"].isnull() | fact_matches["competition_id"].isnull()
+        if invalid.any():
+            logger.warning(f"Dropping {int(invalid.sum())} matches without id or competition")
+            fact_matches = fact_matches[~invalid]
+
+        fact_matches = fact_matches.drop_duplicates(subset="id", keep="last").reset_index(drop=True)
+        fact_matches = fact_matches.astype({column: "Int64" for column in MATCH_INTEGER_COLUMNS})
+        logger.info(f"Created matches fact table with shape: {fact_matches.shape}")
+        return fact_matches
+
+    except Exception as e:
+        logger.error(f"Error during matches transformation: {str(e)}", exc_info=True)
+        raise
+
+
+def partition_bounds(all_teams: list, partitions: int) -> list:
+    """
+    Splits the team rows into contiguous ranges of about the same size, cutting only
+    where the competition changes, so that every competition lands in a single range.
+    Args:
+        all_teams (list): A list of dictionaries containing team data, grouped by competition
+            as returned by `extract_data()`.
+        partitions (int): Maximum number of ranges.
+    Returns:
+        list: The (start, end) row ranges, in order.
+    """
+    bounds = []
+    start = 0
+    for index in range(1, max(1, partitions)):
+        cut = max(start + 1, len(all_teams) * index // partitions)
+        # Move the cut forward to the first row of the next competition
+        while 0 < cut < len(all_teams) and all_teams[cut]["competition_id"] == all_teams[cut - 1]["competition_id"]:
+            cut += 1
+        if start < cut < len(all_teams):
+            bounds.append((start, cut))
+            start = cut
+    if start < len(all_teams):
+        bounds.append((start, len(all_teams)))
+    return bounds
+
+
+def _partition_context():
+    """
+    Returns the fork context where the platform has one, so that the team rows given to
+    `_init_partition_worker()` are inherited by the workers instead of pickled, whatever the
+    default start method. Elsewhere (Windows), the default context pickles them once per worker.
+    """
+    return get_context("fork") if "fork" in get_all_start_methods() else None
+
+
+def _init_partition_worker(rows: list):
+    """Keeps the team rows in the worker process, see `_partition_context()`."""
+    global _partition_rows
+    _partition_rows = rows
+
+
+def _write_streams(sink, tables: list):
+    """Writes each table to `sink` as its own Arrow IPC stream."""
+    for table in tables:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _transform_partition(transform, start: int, end: int):
+    """
+    Runs `transform` on one range of team rows in a worker process. With pyarrow, the
+    dim_teams and fact_competitions tables are written as an Arrow IPC stream into a
+    shared memory block and only its name is sent back, so the DataFrames are never
+    pickled; the parent reads and frees the block, see `_read_partition()`.
+    Returns:
+        tuple: ('shm', block name, size, dtypes) or ('frames', dim_teams, fact_competitions).
+    """
+    _, dim_teams, fact_competitions = transform([], _partition_rows[start:end])
+    if pa is None:
+        return "frames", dim_teams, fact_competitions
+
+    tables = [pa.Table.from_pandas(frame, preserve_index=False) for frame in (dim_teams, fact_competitions)]
+    # Measure the streams first, then write them straight into the shared memory block
+    sizer = pa.MockOutputStream()
+    _write_streams(sizer, tables)
+    size = sizer.size()
+    block = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        _write_streams(pa.FixedSizeBufferWriter(pa.py_buffer(block.buf)), tables)
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    # The parent frees the block: stop the resource tracker of this worker from removing it
+    resource_tracker.unregister(block._name, "shared_memory")
+    block.close()
+    dtypes = [frame.dtypes.to_dict() for frame in (dim_teams, fact_competitions)]
+    return "shm", block.name, size, dtypes
+
+
+def _read_partition(result) -> tuple:
+    """Rebuilds the (dim_teams, fact_competitions) of a partition and frees its shared memory block."""
+    if result[0] == "frames":
+        return result[1], result[2]
+
+    _, name, size, dtypes = result
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        data = pa.py_buffer(bytes(block.buf[:size]))
+    finally:
+        block.close()
+        block.unlink()
+
+    reader = pa.BufferReader(data)
+    frames = []
+    for frame_dtypes in dtypes:
+        table = pa.ipc.open_stream(reader).read_all()
+        # Restores the dtypes Arrow does not map back, e.g. Arrow-backed name strings
+        frames.append(table.to_pandas().astype(frame_dtypes))
+    return tuple(frames)
+
+
+def transform_data_parallel(
+    competitions,
+    all_teams,
+    transform=transform_data,
+    max_workers: int = None,
+    min_rows: int = None,
+):
+    """
+    Transforms the extracted data like `transform`, spreading the team rows over a pool of
+    worker processes to use every core.
+    The team rows are split by competition into contiguous ranges (see `partition_bounds()`),
+    each range is transformed in a worker process and the partial tables come back through
+    shared memory as Arrow IPC streams (see `_transform_partition()`). The workers are forked
+    where the platform allows it, so they inherit the team rows instead of receiving a pickled
+    copy each (see `_partition_context()`). The fact tables are
+    concatenated in order, and dim_teams is deduplicated once more over all the partitions,
+    since a team plays in several competitions: on every column for `transform_data()`, on
+    the team id for `transform_data_compact()`. The tables hold the same rows, in the same
+    order and with the same dtypes as those of `transform`, with a fresh RangeIndex.
+    Small inputs, or a single worker, are transformed in the current process.
+    Args:
+        competitions (list): A list of dictionaries containing competition data.
+        all_teams (list): A list of dictionaries containing team data.
+        transform (callable): `transform_data()` or `transform_data_compact()`.
+        max_workers (int, optional): Number of worker processes. Defaults to TRANSFORM_WORKERS.
+        min_rows (int, optional): Number of team rows below which no worker is started.
+            Defaults to PARALLEL_TRANSFORM_MIN_ROWS.
+    Returns:
+        tuple: The dim_competitions, dim_teams and fact_competitions DataFrames.
+    """
+    max_workers = TRANSFORM_WORKERS if max_workers is None else max_workers
+    min_rows = PARALLEL_TRANSFORM_MIN_ROWS if min_rows is None else min_rows
+    bounds = partition_bounds(all_teams, max_workers)
+    if len(all_teams) < min_rows or len(bounds) < 2:
+        return transform(competitions, all_teams)
+
+    logger.info(f"Transforming {len(all_teams)} team rows in {len(bounds)} partitions")
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(bounds),
+            mp_context=_partition_context(),
+            initializer=_init_partition_worker,
+            initargs=(all_teams,),
+        ) as executor:
+            results = [executor.submit(_transform_partition, transform, start, end) for start, end in bounds]
+            # Read every block, even after a failure, so that none is left in shared memory
+            partitions = []
+            for future in results:
+                try:
+                    partitions.append(_read_partition(future.result()))
+                except Exception as e:
+                    partitions.append(e)
+        errors = [partition for partition in partitions if isinstance(partition, Exception)]
+        if errors:
+            raise errors[0]
+
+        dim_competitions = transform(competitions, [])[0]
+        dim_teams = pd.concat([partition[0] for partition in partitions], ignore_index=True)
+        subset = ["id"] if transform is transform_data_compact else None
+        dim_teams = dim_teams.drop_duplicates(subset=subset, ignore_index=True)
+        fact_competitions = pd.concat([partition[1] for partition in partitions], ignore_index=True)
+        logger.info(f"Merged {len(bounds)} partitions into {len(dim_teams)} teams and {len(fact_competitions)} facts")
+        return dim_competitions, dim_teams, fact_competitions
+
+    except Exception as e:
+        logger.error(f"Error during parallel transformation: {str(e)}", exc_info=True)
+        raise
+
+
+def require_polars():
+    """Raises ImportError if the polars engine is selected but polars is not installed."""
+    if pl is None:
+        raise ImportError("The polars engine requires polars")
+
+
+def transform_data_polars(competitions, all_teams, compact: bool = False):
+    """
+    Transforms the extracted data with Polars into the tables of `transform_data()`, or of
+    `transform_data_compact()` if `compact` is True.
+    The rows are read column by column into lazy frames, and the null filtering, the
+    team dedupe and the fact selection run in a single multi-threaded `collect_all()`.
+    The tables are converted to pandas for the loaders and hold the same rows, in the
+    same order and with the same dtypes as those of the pandas transform, with a fresh
+    RangeIndex. Empty inputs go through the pandas transform, whose empty columns have
+    no inferred dtype.
+    Args:
+        competitions (list): A list of dictionaries containing competition data.
+        all_teams (list): A list of dictionaries containing team data.
+        compact (bool): Build the tables of `transform_data_compact()`.
+    Returns:
+        tuple: The dim_competitions, dim_teams and fact_competitions DataFrames.
+    Raises:
+        ImportError: If polars is not installed.
+    """
+    require_polars()
+    if not competitions or not all_teams:
+        return (transform_data_compact if compact else transform_data)(competitions, all_teams)
+
+    logger.info(f"Starting {'compact ' if compact else ''}data transformation process with polars")
+    try:
+        competition_ids = [competition.get("id") for competition in competitions]
+        competition_frame = pl.LazyFrame(
+            {
+                "id": competition_ids,
+                "name": [competition.get("name") for competition in competitions],
+            },
+            schema={"id": pl.Int64, "name": pl.String},
+        )
+        team_frame = pl.LazyFrame(
+            {
+                "competition_id": [team.get("competition_id") for team in all_teams],
+                "team_id": [team.get("team_id") for team in all_teams],
+                "team_name": [team.get("team_name") for team in all_teams],
+            },
+            schema={"competition_id": pl.Int64, "team_id": pl.Int64, "team_name": pl.String},
+        )
+
+        dim_competitions = competition_frame.drop_nulls()
+        if compact:
+            # Rows without ids cannot be loaded; teams are deduplicated on the id alone
+            team_frame = team_frame.drop_nulls(["competition_id", "team_id"])
+            dim_teams = team_frame.unique(subset=["team_id"], keep="first", maintain_order=True)
+        else:
+            dim_teams = team_frame.unique(subset=["team_id", "team_name"], keep="first", maintain_order=True)
+        dim_teams = dim_teams.select(id="team_id", name="team_name")
+        fact_competitions = team_frame.select("competition_id", "team_id")
+        if compact:
+            dim_competitions = dim_competitions.with_columns(pl.col("id").cast(pl.Int32))
+            dim_teams = dim_teams.with_columns(pl.col("id").cast(pl.Int32))
+            fact_competitions = fact_competitions.with_columns(pl.col("competition_id", "team_id").cast(pl.Int32))
+        elif None in competition_ids:
+            # pandas reads the ids as floats when one is null, and keeps them after dropna()
+            dim_competitions = dim_competitions.with_columns(pl.col("id").cast(pl.Float64))
+
+        tables = [frame.to_pandas() for frame in pl.collect_all([dim_competitions, dim_teams, fact_competitions])]
+        if compact:
+            tables = [
+                frame.astype({"name": name_dtype()}) if "name" in frame.columns else frame for frame in tables
+            ]
+        dim_competitions, dim_teams, fact_competitions = tables
+        if len(dim_competitions) < len(competitions):
+            logger.warning(f"Found {len(competitions) - len(dim_competitions)} competitions with null values")
+        logger.info(
+            f"Created {dim_competitions.shape} competitions, {dim_teams.shape} teams and {fact_competitions.shape} facts"
+        )
+        logger.info("Polars data transformation completed successfully")
+        return dim_competitions, dim_teams, fact_competitions
+
+    except Exception as e:
+        logger.error(f"Error during polars transformation: {str(e)}", exc_info=True)
+        raise
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Put the queue on the filesystem shared by the workers to spread them over several hosts
+QUEUE_PATH = os.getenv("QUEUE_PATH", "data/queue.sqlite")
+LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_SECONDS = float(os.getenv("QUEUE_POLL_SECONDS", "0.5"))
+
+
+class WorkQueue:
+    """
+    Durable queue of fetch tasks in a SQLite file, shared by the processes of a run.
+
+    A coordinator adds tasks with `put()` and calls `seal()` once every initial task is
+    queued. Workers, in as many processes or hosts as needed, take tasks with `claim()`,
+    which leases the oldest pending task for `lease_seconds`, and report the outcome with
+    `complete()` or `fail()`. A task whose lease expires, because its worker crashed or
+    hung, is handed to the next worker that claims one, until it was claimed
+    `max_attempts` times; it is then marked as failed. A worker whose lease expired can no
+    longer complete the task. The loader reads the completed tasks as they land with
+    `iter_completed()`.
+
+    Every operation is a short transaction on its own connection: claims use
+    `BEGIN IMMEDIATE`, so two workers never lease the same task. The file keeps the
+    default rollback journal rather than WAL, which needs shared memory and does not work
+    on network filesystems, and the leases use the wall clock, which must be synchronized
+    between hosts.
+
+    Args:
+        path (str): Path of the SQLite file; its directory is created if needed.
+        lease_seconds (float): Time a worker has to complete a task before it is handed out again.
+        max_attempts (int): Number of times a task is claimed before it is marked as failed.
+    """
+
+    def __init__(
+        self,
+        path: str = QUEUE_PATH,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode, every method opens its own transaction
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+        CREATE TABLE IF NOT EXISTS queue_tasks (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL UNIQUE,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            lease_expires REAL,
+            error TEXT,
+            consumed INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_queue_tasks_status ON queue_tasks (status, id);
+        CREATE TABLE IF NOT EXISTS queue_meta (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        """)
+
+    def _transaction(self, statements):
+        """Runs `statements(conn)` in an immediate transaction and returns its result."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reset(self, resume: bool = False):
+        """
+        Prepares the queue for a new run and unseals it.
+        Args:
+            resume (bool): If True, the completed tasks of the previous run are kept and
+                handed to the loader again, and its failed tasks are retried. Otherwise
+                every task is deleted.
+        """
+        def statements(conn):
+            if resume:
+                conn.execute("UPDATE queue_tasks SET consumed = 0")
+                conn.execute(
+                    "UPDATE queue_tasks SET status = 'pending', attempts = 0, worker = NULL, lease_expires = NULL "
+                    "WHERE status != 'done'"
+                )
+            else:
+                conn.execute("DELETE FROM queue_tasks")
+            conn.execute("DELETE FROM queue_meta WHERE name = 'sealed'")
+
+        self._transaction(statements)
+
+    def put(self, kind: str, key: str, payload: dict) -> bool:
+        """
+        Adds a task, unless a task with the same key already exists.
+        Args:
+            kind (str): Type of the task, e.g. 'teams'.
+            key (str): Unique name of the task, e.g. the raw file it writes.
+            payload (dict): JSON-serializable arguments of the task.
+        Returns:
+            bool: True if the task was added.
+        """
+        def statements(conn):
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO queue_tasks (kind, key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(payload), time.time()),
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(statements)
+
+    def seal(self):
+        """Marks that every initial task was queued; workers stop once the queue is drained."""
+        self._transaction(
+            lambda conn: conn.execute("INSERT OR REPLACE INTO queue_meta (name, value) VALUES ('sealed', '1')")
+        )
+
+    def is_drained(self) -> bool:
+        """Returns True when the queue is sealed and no task is pending or leased."""
+        with self._lock:
+            sealed = self._conn.execute("SELECT 1 FROM queue_meta WHERE name = 'sealed'").fetchone()
+            open_task = self._conn.execute(
+                "SELECT 1 FROM queue_tasks WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+        return bool(sealed) and not open_task
+
+    def claim(self, worker: str) -> dict:
+        """
+        Leases the oldest task that is pending or whose lease expired.
+        Args:
+            worker (str): Name of the worker, e.g. host and process id.
+        Returns:
+            dict: The task, with its id, kind, key, decoded payload and attempts, or None
+            when no task can be claimed right now.
+        """
+        def statements(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE queue_tasks SET status = 'failed', error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, kind, key, payload, attempts FROM queue_tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE queue_tasks SET status = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]),
+            )
+            return {
+                "id": row["id"],
+                "kind": row["kind"],
+                "key": row["key"],
+                "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"] + 1,
+            }
+
+        return self._transaction(statements)
+
+    def complete(self, task: dict, worker: str) -> bool:
+        """
+        Marks a leased task as done.
+        Returns:
+            bool: False if the lease of the worker expired and the task was claimed again.
+        """
+        def statements(conn):
+            cursor = conn.execute(
+                "UPDATE queue_tasks SET status = 'done', lease_expires = NULL, error = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), task["id"], worker),
+            )
+            return cursor.rowcount == 1
+
+        done = self._transaction(statements)
+        if not done:
+            logger.warning(f"Lease of task {task['key']} was lost by {worker}, another worker completes it")
+        return done
+
+    def fail(self, task: dict, worker: str, error: str = None):
+        """
+        Gives a leased task back after an error: it is pending again until it was claimed
+        `max_attempts` times, and failed afterwards.
+        """
+        def statements(conn):
+            conn.execute(
+                "UPDATE queue_tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, error, time.time(), task["id"], worker),
+            )
+
+        self._transaction(statements)
+        logger.warning(f"Task {task['key']} failed on attempt {task['attempts']}: {error}")
+
+    def take_completed(self, kind) -> list:
+        """
+        Returns the completed tasks of a kind, or of a tuple of kinds, that were not returned
+        yet, and marks them as consumed.
+        """
+        kinds = (kind,) if isinstance(kind, str) else tuple(kind)
+
+        def statements(conn):
+            rows = conn.execute(
+                "SELECT id, kind, key, payload FROM queue_tasks "
+                f"WHERE kind IN ({', '.join('?' for _ in kinds)}) AND status = 'done' AND consumed = 0 ORDER BY id",
+                kinds,
+            ).fetchall()
+            conn.executemany("UPDATE queue_tasks SET consumed = 1 WHERE id = ?", [(row["id"],) for row in rows])
+            return [
+                {"id": row["id"], "kind": row["kind"], "key": row["key"], "payload": json.loads(row["payload"])}
+                for row in rows
+            ]
+
+        return self._transaction(statements)
+
+    def iter_completed(self, kind, poll_interval: float = QUEUE_POLL_SECONDS, alive=None):
+        """
+        Yields the tasks of a kind as they are completed, until the queue is drained.
+        Args:
+            kind (str or tuple): Type of the tasks, or a tuple of types consumed together.
+            poll_interval (float): Seconds between two reads of the queue while nothing new completed.
+            alive (callable, optional): Returns False when no worker can run the open tasks
+                anymore, e.g. every local worker process exited; the iteration then stops
+                instead of waiting for them.
+        Yields:
+            dict: A completed task, see `take_completed()`.
+        """
+        while True:
+            drained = self.is_drained()
+            tasks = self.take_completed(kind)
+            yield from tasks
+            if drained:
+                return
+            if not tasks:
+                if alive is not None and not alive():
+                    logger.error(f"No worker left to run the open tasks of {self.path}: {self.counts()}")
+                    return
+                time.sleep(poll_interval)
+
+    def failed_tasks(self) -> list:
+        """Returns the kind, key, attempts and last error of every task marked as failed, in queue order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, key, attempts, error FROM queue_tasks WHERE status = 'failed' ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> dict:
+        """Returns the number of tasks of each status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM queue_tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
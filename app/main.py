@@ -1,12 +1,59 @@
-import pandas as pd
 import sqlite3
 import os
 import logging
+import argparse
+import functools
 from datetime import datetime
 
-from etl.extract import drop_data, extract_data
-from etl.transform import transform_data
-from etl.load import create_tables, load_data
+from etl.cache import CACHE_TTL, ResponseCache
+from etl.extract import (
+    MATCHES_PAGE_SIZE,
+    MAX_WORKERS,
+    date_windows,
+    drop_data,
+    enqueue_extraction,
+    extract_competitions,
+    extract_data,
+    extract_matches,
+    fetched_competition_ids,
+    iter_extract,
+    iter_queue_extract,
+    iter_replay,
+    open_manifest,
+    replay_data,
+    report_failed_tasks,
+    run_queue_worker,
+    start_queue_workers,
+)
+from etl.transform import (
+    DATAFRAME_ENGINE,
+    ENGINES,
+    TRANSFORM_WORKERS,
+    require_polars,
+    transform_data,
+    transform_data_compact,
+    transform_data_parallel,
+    transform_data_polars,
+    transform_matches,
+)
+from etl.load import (
+    BACKENDS,
+    WAREHOUSE_BACKEND,
+    SQLiteBackend,
+    bulk_load_data,
+    create_tables,
+    get_backend,
+    load_data,
+    snapshot_history,
+    upsert_data,
+)
+from etl.database import ConnectionManager
+from etl.pipeline import BATCH_SIZE, run_streaming_pipeline
+from etl.metrics import METRICS_DIR, start_run_metrics, write_report
+from etl.landing import LANDING_FORMATS, LandingZone
+from etl.export import EXPORT_FORMATS, REPORTS, export_reports
+from etl.state import CompetitionState
+from etl.work_queue import WorkQueue
 
 logger = logging.getLogger(__name__)
 
@@ -29,52 +76,312 @@ def setup_logging():
         ]
     )
 
-def export_summary():
+def parse_args(argv=None):
+    """
+    Parses the command line options of the ETL pipeline.
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv when None.
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Football data ETL pipeline")
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="Fetch competition teams in parallel behind a client-side rate limiter",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="Number of worker threads used with --concurrent",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Rebuild the warehouse from the files already in data/raw without calling the API",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep data/raw and only fetch the files the manifest of the previous run does not record as complete",
+    )
+    parser.add_argument(
+        "--land",
+        action="store_true",
+        help="After extraction, archive the raw data in data/landing, partitioned by run date and competition",
+    )
+    parser.add_argument(
+        "--landing-format",
+        choices=LANDING_FORMATS,
+        default="jsonl",
+        help="File format of the landing zone: gzip JSON Lines, or Parquet (needs pyarrow)",
+    )
+    parser.add_argument(
+        "--from-landing",
+        nargs="?",
+        const="latest",
+        metavar="RUN_DATE",
+        help="Rebuild the warehouse from a run of the landing zone (YYYY-MM-DD, the latest by default)",
+    )
+    parser.add_argument(
+        "--competitions",
+        nargs="+",
+        metavar="CODE",
+        help="With --from-landing, only read the partitions of these competition codes; with --matches, "
+        "only fetch the matches of these competitions",
+    )
+    parser.add_argument(
+        "--matches",
+        action="store_true",
+        help="After the load, fetch the matches of every competition page by page in parallel into fact_matches",
+    )
+    parser.add_argument(
+        "--seasons",
+        nargs="+",
+        type=int,
+        metavar="YEAR",
+        help="With --matches, fetch these seasons (the year they start) instead of the current one",
+    )
+    parser.add_argument("--date-from", metavar="YYYY-MM-DD", help="With --matches, first day of the matches")
+    parser.add_argument("--date-to", metavar="YYYY-MM-DD", help="With --matches, last day of the matches")
+    parser.add_argument(
+        "--window-days",
+        type=int,
+        help="With --matches, split the --date-from/--date-to range into requests of this many days",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=MATCHES_PAGE_SIZE,
+        help="Number of matches requested per page with --matches",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Only request the teams of the competitions whose lastUpdated or current season changed since "
+        "they were last fetched, and reuse the stored teams of the others (data/state.sqlite)",
+    )
+    parser.add_argument(
+        "--work-queue",
+        action="store_true",
+        help="Queue the requests in data/queue.sqlite (QUEUE_PATH), fetch them with --queue-workers worker "
+        "processes and load every competition as soon as its teams land",
+    )
+    parser.add_argument(
+        "--queue-workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="Number of local worker processes used with --work-queue; 0 to rely on --queue-worker processes only",
+    )
+    parser.add_argument(
+        "--queue-worker",
+        action="store_true",
+        help="Only run a worker of the --work-queue run sharing QUEUE_PATH and data/raw, e.g. on another host, "
+        "until its queue is drained",
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        default=None,
+        help="Share of the API key quota used by this host with --work-queue or --queue-worker, split between "
+        "its worker processes; the shares of every host must add up to the key quota. Defaults to "
+        "REQUESTS_PER_MINUTE",
+    )
+    parser.add_argument(
+        "--raw-ingest",
+        action="store_true",
+        help="Stream response bytes straight to data/raw and parse only the team fields (faster with orjson or ijson)",
+    )
+    load_mode = parser.add_mutually_exclusive_group()
+    load_mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep the existing tables and only write the rows that changed",
+    )
+    load_mode.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Load with executemany in a single tuned transaction instead of DataFrame.to_sql",
+    )
+    load_mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="Transform and load each competition in bounded batches as soon as its teams arrive",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=WAREHOUSE_BACKEND,
+        help="Warehouse database: SQLite (db/football_data.sqlite) or DuckDB (db/football_data.duckdb, needs duckdb)",
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="After the load, record the changes of dim_teams and fact_competitions in the SCD Type 2 history tables",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="Number of team rows per batch used with --stream",
+    )
+    parser.add_argument(
+        "--compact-transform",
+        action="store_true",
+        help="Build the tables with int32 ids and Arrow/categorical names, deduplicating teams by id",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DATAFRAME_ENGINE,
+        help="Dataframe library of the transform and of the summary export: pandas, or polars (needs polars)",
+    )
+    parser.add_argument(
+        "--parallel-transform",
+        action="store_true",
+        help="Transform the team rows split by competition in a pool of processes, one per core by default",
+    )
+    parser.add_argument(
+        "--transform-workers",
+        type=int,
+        default=TRANSFORM_WORKERS,
+        help="Number of processes used with --parallel-transform",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Serve unchanged API responses from the local response cache (data/cache)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=CACHE_TTL,
+        help="Seconds a cached response is reused without revalidating it with the API",
+    )
+    parser.add_argument(
+        "--reports",
+        nargs="+",
+        choices=list(REPORTS),
+        default=["summary"],
+        metavar="REPORT",
+        help=f"Reports exported to the output folder at the end of the run, among: {', '.join(REPORTS)}",
+    )
+    parser.add_argument(
+        "--export-formats",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        default=["csv"],
+        metavar="FORMAT",
+        help="File formats of the reports: csv, parquet (needs pyarrow) or ndjson",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=METRICS_DIR,
+        help="Directory of the JSON run report (stage timings, HTTP, rate limit, rows, peak RSS); empty to disable",
+    )
+    parser.add_argument(
+        "--prometheus",
+        action="store_true",
+        help="Also write the run metrics in Prometheus text format next to the JSON report",
+    )
+    args = parser.parse_args(argv)
+    if args.offline and args.resume:
+        parser.error("--resume cannot be combined with --offline")
+    if args.from_landing and (args.offline or args.resume or args.land):
+        parser.error("--from-landing cannot be combined with --offline, --resume or --land")
+    if args.competitions and not (args.from_landing or args.matches):
+        parser.error("--competitions requires --from-landing or --matches")
+    if args.backend != "sqlite" and (args.incremental or args.stream or args.history):
+        parser.error(f"--backend {args.backend} cannot be combined with --incremental, --stream or --history")
+    if args.skip_unchanged and (args.offline or args.from_landing):
+        parser.error("--skip-unchanged cannot be combined with --offline or --from-landing")
+    if args.work_queue and (
+        args.offline or args.from_landing or args.stream or args.incremental or args.bulk_load
+        or args.skip_unchanged or args.raw_ingest or args.cache or args.queue_worker
+    ):
+        parser.error(
+            "--work-queue cannot be combined with --offline, --from-landing, --stream, --incremental, --bulk-load, "
+            "--skip-unchanged, --raw-ingest, --cache or --queue-worker"
+        )
+    if args.work_queue and args.backend != "sqlite":
+        parser.error(f"--backend {args.backend} cannot be combined with --work-queue")
+    if args.parallel_transform and (args.stream or args.work_queue):
+        parser.error("--parallel-transform cannot be combined with --stream or --work-queue")
+    if args.engine == "polars":
+        if args.parallel_transform:
+            parser.error("--engine polars cannot be combined with --parallel-transform, polars uses every core itself")
+        try:
+            require_polars()
+        except ImportError as e:
+            parser.error(str(e))
+    if args.transform_workers < 1:
+        parser.error("--transform-workers must be at least 1")
+    if args.queue_workers < 0:
+        parser.error("--queue-workers cannot be negative")
+    if args.requests_per_minute is not None:
+        if not (args.work_queue or args.queue_worker):
+            parser.error("--requests-per-minute requires --work-queue or --queue-worker")
+        if args.requests_per_minute < 1:
+            parser.error("--requests-per-minute must be at least 1")
+    if args.matches and (args.offline or args.from_landing):
+        parser.error("--matches cannot be combined with --offline or --from-landing")
+    if (args.seasons or args.date_from or args.date_to or args.window_days) and not args.matches:
+        parser.error("--seasons, --date-from, --date-to and --window-days require --matches")
+    if (args.date_from is None) != (args.date_to is None):
+        parser.error("--date-from and --date-to must be given together")
+    if args.date_from:
+        try:
+            date_windows(args.date_from, args.date_to, args.window_days)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+def export_summary(backend=None, reports=("summary",), formats=("csv",), engine="pandas"):
     """
     Exports a summary of the number of teams in each competition to a CSV file.
 
-    This function connects to a SQLite database, executes a SQL query to retrieve
-    the number of teams in each competition, and writes the results to a CSV file
-    located at 'output/summary.csv'. The CSV file will contain two columns:
+    This function runs a SQL query on the warehouse to retrieve the number of teams
+    in each competition, and writes the results to a CSV file located at
+    'output/summary.csv'. The CSV file will contain two columns:
     'Competition' and 'Number_of_Teams'.
 
     The function performs the following steps:
-    1. Connects to the SQLite database located at 'db/football_data.sqlite'.
-    2. Executes a SQL query to retrieve the number of teams in each competition.
-    3. Writes the query results to 'output/summary.csv'.
-    4. Closes the database connection.
+    1. Runs the summary query of the warehouse backend, which connects to the
+       database ('db/football_data.sqlite' by default) and closes the connection.
+       On SQLite, the query reads the materialized agg_competition_teams table that
+       the loaders keep up to date, so its cost does not grow with fact_competitions.
+    2. Streams the query results to 'output/summary.csv' in chunks, through a temporary
+       file renamed once complete, see `etl.export.export_query()`.
+
+    Other reports and formats (see `etl.export.REPORTS` and EXPORT_FORMATS) are written
+    the same way to 'output/<report>.<format>', in parallel.
+
+    With the 'polars' engine, the summary is aggregated by Polars from dim_competitions
+    and fact_competitions, see `etl.export.iter_summary_polars()`.
+
+    Args:
+        backend (optional): Warehouse backend returned by `get_backend()`. Defaults to SQLite.
+        reports (list): Names of the reports to export.
+        formats (list): File formats of every report: 'csv', 'parquet' or 'ndjson'.
+        engine (str): Dataframe library of the summary: 'pandas' (the warehouse query) or 'polars'.
 
     Raises:
         sqlite3.DatabaseError: If there is an error connecting to the database or executing the query.
-        pandas.errors.EmptyDataError: If the query returns no data.
-        IOError: If there is an error writing the CSV file.
+        IOError: If there is an error writing the files.
     """
     logger.info("Starting summary export process")
     
     try:
-        os.makedirs("output", exist_ok=True)
-        logger.debug("Output directory checked/created")
-
-        conn = sqlite3.connect("db/football_data.sqlite")
-        logger.debug("Connected to database")
-
-        query = """
-        SELECT c.name AS Competition, COUNT(f.team_id) AS Number_of_Teams
-        FROM dim_competitions c
-        JOIN fact_competitions f ON c.id = f.competition_id
-        GROUP BY c.name
-        ORDER BY COUNT(f.team_id) DESC;
-        """
-        logger.debug("Executing summary query")
-        df = pd.read_sql_query(query, conn)
-        
-        if df.empty:
-            logger.warning("Query returned no data")
-        else:
-            logger.info(f"Query returned {len(df)} rows")
+        backend = backend or SQLiteBackend()
+        logger.debug(f"Exporting {', '.join(reports)} from {backend.name}")
+        counts = export_reports(reports, formats, backend, engine=engine)
 
-        df.to_csv("output/summary.csv", index=False)
-        logger.info("Summary exported to output/summary.csv")
+        for path, count in counts.items():
+            if count == 0:
+                logger.warning(f"Query returned no data for {path}")
+        logger.info(f"Exported {', '.join(counts)}")
 
     except sqlite3.Error as e:
         logger.error(f"Database error: {str(e)}", exc_info=True)
@@ -82,52 +389,235 @@ def export_summary():
     except Exception as e:
         logger.error(f"Error during summary export: {str(e)}", exc_info=True)
         raise
-    finally:
-        if conn:
-            conn.close()
-            logger.debug("Database connection closed")
 
 
-def main():
+def main(args=None):
     """
     Main function to execute the ETL process for football data.
     This function performs the following steps:
     1. Cleans the data folder by calling `drop_data()`.
     2. Extracts data by calling `extract_data()` and stores the results in `competitions` and `all_teams`.
+       With `--offline`, steps 1 and 2 are replaced by `replay_data()`, which reads the existing raw files.
+       With `--resume`, step 1 is skipped and `extract_data()` only fetches the files the run manifest
+       in data/raw does not record as complete.
+       With `--raw-ingest`, responses are streamed to disk as bytes and only the team fields are parsed.
+       With `--skip-unchanged`, the teams of the competitions whose `lastUpdated` and current season did not
+       change since the previous run are read from the `CompetitionState` instead of the API.
+       With `--from-landing`, steps 1 and 2 read a run archived in the landing zone instead.
     3. Transforms the extracted data by calling `transform_data()` and stores the results in `dim_competitions`, `dim_teams`, and `fact_competitions`.
+       With `--compact-transform`, `transform_data_compact()` is used instead.
+       With `--engine polars`, `transform_data_polars()` builds the same tables with Polars.
+       With `--parallel-transform`, the transform runs in a pool of processes, see `transform_data_parallel()`.
     4. Creates tables in the database by calling `create_tables()`.
     5. Loads the transformed data into the database by calling `load_data()` with `dim_competitions`, `dim_teams`, and `fact_competitions` as arguments.
+       With `--incremental`, the tables are kept and `upsert_data()` only writes the differences.
+       With `--bulk-load`, `bulk_load_data()` is used instead of `load_data()`.
+       With `--backend duckdb`, the tables are created and appended in bulk in DuckDB instead, see `get_backend()`.
+       With `--stream`, steps 2 to 5 are replaced by `run_streaming_pipeline()`, which transforms and
+       loads each batch of competitions as soon as it has been extracted.
+       With `--work-queue`, the requests are queued in a `WorkQueue` by `enqueue_extraction()` and
+       fetched by `--queue-workers` processes (and any `--queue-worker` started on other hosts), while
+       `run_streaming_pipeline()` loads the competitions whose teams landed; the matches of `--matches`
+       are fetched by the same workers and upserted page by page.
+       With `--queue-worker`, the run only works on the queue of another run, see `run_queue_worker()`.
+       `--requests-per-minute` sets the share of the key quota used by the workers of the host.
+       With `--matches`, the matches of the extracted competitions are then fetched by `extract_matches()`
+       and upserted into fact_matches by the warehouse backend.
+       With `--history`, the changes of the loaded tables are then recorded by `snapshot_history()`.
+       With `--land`, the raw files are then archived in the landing zone by `LandingZone.land()`.
     6. Prints the first few rows of the transformed data for verification.
-    7. Exports a summary by calling `export_summary()`.
+    7. Exports a summary by calling `export_summary()` on the warehouse backend.
+       With `--reports` and `--export-formats`, other reports and file formats are exported as well.
+    Every stage is timed, and a JSON run report is written to `--metrics-dir`, even when the run fails.
+    The SQLite stages share the connections of one `ConnectionManager`, opened once with the same pragmas
+    and closed at the end of the run.
+    Args:
+        args (argparse.Namespace, optional): Options returned by `parse_args()`. Defaults are used when None.
     Returns:
         None
     """
+    if args is None:
+        args = parse_args([])
+
     logger.info("Starting ETL process")
-    
+    metrics = start_run_metrics()
+    db = ConnectionManager()
+    state = None
+    queue = None
+    workers = []
+
     try:
-        logger.info("Cleaning data folder")
-        drop_data()
-        
-        logger.info("Extracting data")
-        competitions, all_teams = extract_data()
-        
-        logger.info("Transforming data")
-        dim_competitions, dim_teams, fact_competitions = transform_data(competitions, all_teams)
-        
-        logger.info("Loading data to database")
-        create_tables()
-        load_data(dim_competitions, dim_teams, fact_competitions)
+        if args.queue_worker:
+            logger.info("Running as a work queue worker")
+            with metrics.stage("worker"):
+                run_queue_worker(requests_per_minute=args.requests_per_minute)
+            metrics.finish("success")
+            return
+
+        backend = get_backend(args.backend, db=db)
+        cache = ResponseCache(ttl=args.cache_ttl) if args.cache else None
+        if args.engine == "polars":
+            transform = functools.partial(transform_data_polars, compact=args.compact_transform)
+        else:
+            transform = transform_data_compact if args.compact_transform else transform_data
+        landing = LandingZone(file_format=args.landing_format) if args.land or args.from_landing else None
+        landing_date = args.from_landing
+        if landing_date == "latest":
+            # Resolved here, so that the history snapshot is dated by the partition that was read
+            run_dates = landing.run_dates()
+            landing_date = run_dates[-1] if run_dates else None
+        state = CompetitionState() if args.skip_unchanged else None
+
+        def load_match_page(match_rows):
+            # With a work queue, each matches page is loaded as soon as its task completes
+            if match_rows:
+                backend.load_matches(transform_matches(match_rows))
+
+        if args.stream or args.work_queue:
+            if args.offline:
+                source = iter_replay()
+            elif args.from_landing:
+                source = landing.iter_read(landing_date, args.competitions)
+            elif args.work_queue:
+                if not args.resume:
+                    logger.info("Cleaning data folder")
+                    drop_data()
+                queue = WorkQueue()
+                queue.reset(resume=args.resume)
+                competitions = extract_competitions(manifest=open_manifest(args.resume))
+                windows = date_windows(args.date_from, args.date_to, args.window_days) if args.date_from else None
+                enqueue_extraction(
+                    queue, competitions, args.matches, args.seasons, windows, args.page_size, args.competitions
+                )
+                workers = start_queue_workers(args.queue_workers, requests_per_minute=args.requests_per_minute)
+                # Without local workers, wait for the workers of other hosts
+                alive = (lambda: any(worker.is_alive() for worker in workers)) if workers else None
+                source = iter_queue_extract(
+                    queue, competitions, alive=alive, on_matches=load_match_page if args.matches else None
+                )
+            else:
+                if not args.resume:
+                    logger.info("Cleaning data folder")
+                    drop_data()
+                source = iter_extract(
+                    concurrent=args.concurrent,
+                    max_workers=args.workers,
+                    cache=cache,
+                    resume=args.resume,
+                    raw_ingest=args.raw_ingest,
+                    state=state,
+                )
+
+            logger.info("Streaming data to database")
+            with metrics.stage("stream"):
+                run_streaming_pipeline(source, batch_size=args.batch_size, transform=transform, db=db)
+            if queue:
+                report_failed_tasks(queue)
+                logger.info(f"Work queue finished: {queue.counts()}")
+
+        else:
+            with metrics.stage("extract"):
+                if args.offline:
+                    logger.info("Replaying raw data")
+                    competitions, all_teams = replay_data(max_workers=args.workers)
+                elif args.from_landing:
+                    logger.info("Reading data from the landing zone")
+                    competitions, all_teams = landing.read(landing_date, args.competitions)
+                else:
+                    if not args.resume:
+                        logger.info("Cleaning data folder")
+                        drop_data()
+
+                    logger.info("Extracting data")
+                    competitions, all_teams = extract_data(
+                        concurrent=args.concurrent,
+                        max_workers=args.workers,
+                        cache=cache,
+                        resume=args.resume,
+                        raw_ingest=args.raw_ingest,
+                        state=state,
+                    )
+
+            logger.info("Transforming data")
+            with metrics.stage("transform"):
+                if args.parallel_transform:
+                    dim_competitions, dim_teams, fact_competitions = transform_data_parallel(
+                        competitions, all_teams, transform=transform, max_workers=args.transform_workers
+                    )
+                else:
+                    dim_competitions, dim_teams, fact_competitions = transform(competitions, all_teams)
+
+            logger.info("Loading data to database")
+            with metrics.stage("load"):
+                if args.incremental:
+                    create_tables(clear_existing=False, db=db)
+                    # The landing zone has no teams file for the failed fetches, only their missing rows
+                    fetched = None if args.from_landing else fetched_competition_ids(competitions)
+                    upsert_data(dim_competitions, dim_teams, fact_competitions, db=db, fetched_competitions=fetched)
+                elif args.backend != "sqlite":
+                    backend.create_tables()
+                    backend.load(dim_competitions, dim_teams, fact_competitions)
+                elif args.bulk_load:
+                    create_tables(db=db)
+                    bulk_load_data(dim_competitions, dim_teams, fact_competitions, db=db)
+                else:
+                    create_tables(db=db)
+                    load_data(dim_competitions, dim_teams, fact_competitions, db=db)
+
+        # With a work queue, the matches pages were loaded by the stream stage
+        if args.matches and not queue:
+            logger.info("Extracting matches")
+            with metrics.stage("matches"):
+                match_rows = extract_matches(
+                    competition_codes=args.competitions,
+                    seasons=args.seasons,
+                    date_from=args.date_from,
+                    date_to=args.date_to,
+                    window_days=args.window_days,
+                    page_size=args.page_size,
+                    max_workers=args.workers,
+                    cache=cache,
+                )
+                backend.load_matches(transform_matches(match_rows))
+
+        if args.history:
+            logger.info("Recording history snapshot")
+            with metrics.stage("history"):
+                # A run rebuilt from the landing zone is dated by its landing partition
+                snapshot_history(landing_date, db=db)
+
+        if args.land:
+            logger.info("Landing raw data")
+            with metrics.stage("land"):
+                landing.land()
         
         logger.info("Exporting summary")
-        export_summary()
+        with metrics.stage("export"):
+            export_summary(backend, args.reports, args.export_formats, args.engine)
         
+        metrics.finish("success")
         logger.info("ETL process completed successfully")
 
     except Exception as e:
+        metrics.finish("failed")
         logger.error(f"ETL process failed: {str(e)}", exc_info=True)
         raise
 
+    finally:
+        for worker in workers:
+            # The workers exit once the queue is drained, or are stopped when the run failed
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        if queue:
+            queue.close()
+        db.close()
+        if state:
+            state.close()
+        if args.metrics_dir:
+            write_report(metrics, args.metrics_dir, prometheus=args.prometheus)
+
 
 if __name__ == "__main__":
     setup_logging() 
-    main()
\ No newline at end of file
+    main(parse_args())
\ No newline at end of file
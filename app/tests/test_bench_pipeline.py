@@ -0,0 +1,66 @@
+import pytest
+
+from benchmarks.bench_pipeline import find_regressions, run_pipeline, summarize
+from benchmarks.mock_api import MockFootballData, MockServer
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def mock_server():
+    data = MockFootballData(competitions=3, teams_per_competition=4, squad_size=2, error_rate=0.2, seed=1)
+    with MockServer(data) as server:
+        yield server
+
+
+@pytest.mark.parametrize("pipeline_args", [["--concurrent"], ["--stream"]])
+def test_run_pipeline_against_mock_api(mock_server, pipeline_args):
+    """
+    Test the whole pipeline against the local mock API.
+
+    Args:
+        mock_server: Mock API with 3 competitions of 4 teams, answering 20% of requests with a 429.
+        pipeline_args: Options of the batch and the streaming pipeline.
+
+    Test Steps:
+        1. Run main() against the mock API through run_pipeline().
+        2. Summarize the run report.
+
+    Assertions:
+        - The run succeeds despite the injected 429 responses, which are retried.
+        - Every team membership is written: teams overlap between competitions, so 3 * 4 rows.
+        - The summary reports a positive throughput and the time of the load stage.
+    """
+    report = run_pipeline(mock_server.api_url, pipeline_args, quota=100000)
+
+    assert report["status"] == "success"
+    assert report["rows_written"]["fact_competitions"] == 12
+    assert mock_server.data.requests == report["http"]["requests"]
+
+    summary = summarize(report)
+    assert summary["team_rows_per_second"] > 0
+    assert summary["load_wall_seconds"] >= 0
+
+
+def test_find_regressions():
+    """
+    Test the comparison of a benchmark run with its baseline.
+
+    Assertions:
+        - Slower durations beyond the tolerance are reported, those within it are not.
+        - A lower throughput is reported, as higher is better for it.
+        - Metrics missing from the run or zero in the baseline are skipped.
+    """
+    baseline = {"duration_seconds": 2.0, "load_wall_seconds": 1.0, "team_rows_per_second": 1000.0, "extract_wall_seconds": 0.0}
+    summary = {"duration_seconds": 2.5, "load_wall_seconds": 1.6, "team_rows_per_second": 500.0, "extract_wall_seconds": 3.0}
+
+    regressions = find_regressions(summary, baseline, tolerance=1.5)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("load_wall_seconds")
+    assert regressions[1].startswith("team_rows_per_second")
+    assert find_regressions({}, baseline, tolerance=1.5) == []
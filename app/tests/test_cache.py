@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+
+from app.etl.cache import ResponseCache
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(folder=str(tmp_path / "cache"), ttl=60)
+
+
+def test_store_and_read(cache):
+    """
+    Test that a stored response can be read back with its validators.
+    Assertions:
+        - The body read from the cache matches the stored body.
+        - The metadata keeps the ETag and Last-Modified headers.
+    """
+    url = "http://fakeurl.com/competitions"
+    cache.store(url, '{"count": 1}', {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    entry = cache.get(url)
+
+    assert cache.read(url) == '{"count": 1}'
+    assert entry["etag"] == '"abc"'
+    assert entry["last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert cache.conditional_headers(entry) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+
+def test_get_missing_entry(cache):
+    """
+    Test that an uncached URL has no entry, is never fresh and yields no validators.
+    """
+    entry = cache.get("http://fakeurl.com/unknown")
+
+    assert entry is None
+    assert not cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {}
+
+
+def test_is_fresh_honors_ttl(cache):
+    """
+    Test that an entry is fresh within the TTL and stale after it, and that
+    touch() renews it after a 304 Not Modified.
+    Assertions:
+        - The entry is fresh right after being stored.
+        - The entry is stale once the TTL has elapsed.
+        - The entry is fresh again after touch().
+    """
+    url = "http://fakeurl.com/competitions"
+    with patch("app.etl.cache.time.time", return_value=1000.0):
+        cache.store(url, "{}", {})
+
+    with patch("app.etl.cache.time.time", return_value=1030.0):
+        assert cache.is_fresh(cache.get(url))
+
+    with patch("app.etl.cache.time.time", return_value=1061.0):
+        assert not cache.is_fresh(cache.get(url))
+        cache.touch(url, {})
+        assert cache.is_fresh(cache.get(url))
@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from app.etl.database import ConnectionManager, session
+from app.etl.load import bulk_load_data, create_tables, load_data
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute.
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment.
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def db(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "db" / "warehouse.sqlite"), pool_size=2)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def tables():
+    return (
+        pd.DataFrame({"id": [1, 2], "name": ["Competition 1", "Competition 2"]}),
+        pd.DataFrame({"id": [1, 2], "name": ["Team 1", "Team 2"]}),
+        pd.DataFrame({"competition_id": [1, 2], "team_id": [1, 2]}),
+    )
+
+
+def test_writer_is_shared_and_configured(db):
+    """
+    Test that the writer connection is opened once, in its own directory, with the configured pragmas.
+    Assertions:
+        - Every call returns the same connection.
+        - The journal mode is WAL and the cache size is the configured one.
+        - After close(), a new connection is opened on demand.
+    """
+    conn = db.writer()
+
+    assert db.writer() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("PRAGMA cache_size").fetchone() == (db.cache_size,)
+
+    db.close()
+    assert db.writer() is not conn
+
+
+def test_stages_share_one_connection(db, tables):
+    """
+    Test that the loaders run on the writer of the manager instead of opening their own connection.
+    Assertions:
+        - create_tables and load_data write to the manager's database file.
+        - The writer is still open after the stages, and reads see the loaded rows.
+    """
+    create_tables(db=db)
+    load_data(*tables, db=db)
+
+    assert db.writer().execute("SELECT COUNT(*) FROM fact_competitions").fetchone() == (2,)
+    with db.reader() as conn:
+        assert conn.execute("SELECT name FROM dim_teams ORDER BY id").fetchall() == [("Team 1",), ("Team 2",)]
+
+
+def test_failed_stage_is_rolled_back(db, tables):
+    """
+    Test that a stage failing on the shared connection leaves it clean for the next stage.
+    Test Steps:
+        1. Bulk load a dim_teams table with a duplicated id, which violates its primary key.
+        2. Load valid tables on the same connection.
+    Assertions:
+        - The failed load raises the IntegrityError and writes no rows.
+        - The next load succeeds.
+    """
+    create_tables(db=db)
+    duplicated_teams = pd.DataFrame({"id": [1, 1], "name": ["Team 1", "Team 1 again"]})
+
+    with pytest.raises(sqlite3.IntegrityError):
+        bulk_load_data(tables[0], duplicated_teams, tables[2], db=db)
+    assert db.writer().execute("SELECT COUNT(*) FROM dim_competitions").fetchone() == (0,)
+
+    bulk_load_data(*tables, db=db)
+    assert db.writer().execute("SELECT COUNT(*) FROM dim_teams").fetchone() == (2,)
+
+
+def test_reader_pool_is_bounded_and_read_only(db, tables):
+    """
+    Test the pool of reader connections.
+    Test Steps:
+        1. Run queries from 6 threads at once on a pool of 2 readers.
+        2. Try to write through a reader.
+    Assertions:
+        - Every thread gets its result, and at most 2 reader connections are ever opened.
+        - Readers reject writes.
+    """
+    create_tables(db=db)
+    load_data(*tables, db=db)
+    results, seen = [], set()
+    lock = threading.Lock()
+
+    def query():
+        with db.reader() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM dim_teams").fetchone()[0]
+            with lock:
+                results.append(count)
+                seen.add(id(conn))
+
+    threads = [threading.Thread(target=query) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [2] * 6
+    assert len(seen) <= 2
+    with db.reader() as conn, pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM dim_teams")
+
+
+def test_session_without_manager_reports_connect_errors(monkeypatch):
+    """
+    Test that a connection failure surfaces as the sqlite3 error, not as a NameError
+    from the cleanup of a connection that was never opened.
+    """
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(sqlite3, "connect", fail)
+
+    with pytest.raises(sqlite3.OperationalError):
+        with session():
+            pass
+    with pytest.raises(sqlite3.OperationalError):
+        load_data(pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
@@ -0,0 +1,210 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.etl.database import ConnectionManager
+from app.etl.export import (
+    EXPORT_FORMATS,
+    REPORTS,
+    export_query,
+    export_report,
+    export_reports,
+    iter_summary_polars,
+    report_path,
+)
+from app.etl.load import DuckDBBackend, SQLiteBackend
+from app.etl.transform import transform_matches
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute.
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment.
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+TABLES = (
+    pd.DataFrame({"id": [1, 2], "name": ["Competition 1", "Competition 2"]}),
+    pd.DataFrame({"id": [1, 2, 3], "name": ["Team 1", "Team 2", "Team 3"]}),
+    pd.DataFrame({"competition_id": [1, 1, 1, 2, 2], "team_id": [1, 2, 3, 1, 2]}),
+)
+# The 2024 season has no score yet, so the goals of its chunk are NULL
+MATCHES = [
+    {"id": 10, "competition_id": 1, "season_id": 2023, "status": "FINISHED", "home_score": 2, "away_score": 1},
+    {"id": 11, "competition_id": 1, "season_id": 2024, "status": "SCHEDULED"},
+    {"id": 12, "competition_id": 2, "season_id": 2024, "status": "FINISHED", "home_score": 0, "away_score": 3},
+]
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """SQLite warehouse holding the TABLES and MATCHES, in a temporary directory."""
+    manager = ConnectionManager(str(tmp_path / "db" / "warehouse.sqlite"), pool_size=2)
+    warehouse = SQLiteBackend(manager)
+    warehouse.create_tables()
+    warehouse.load(*TABLES)
+    warehouse.load_matches(transform_matches(MATCHES))
+    yield warehouse
+    manager.close()
+
+
+def read_export(path, file_format):
+    """Reads an exported file back into a DataFrame."""
+    if file_format == "csv":
+        return pd.read_csv(path)
+    if file_format == "parquet":
+        return pd.read_parquet(path)
+    with open(path) as file:
+        return pd.DataFrame([json.loads(line) for line in file])
+
+
+@pytest.mark.parametrize("file_format", EXPORT_FORMATS)
+@pytest.mark.parametrize("report", ["competition_teams", "season_matches"])
+def test_export_report_streams_chunks(backend, tmp_path, file_format, report):
+    """
+    Test that a report written in chunks of one row holds the same rows as the query.
+    Args:
+        file_format (str): Format of the export.
+        report (str): Report to export; season_matches has a chunk whose goals are NULL.
+    Assertions:
+        - The returned count is the number of rows of the query.
+        - The file holds the same values as the query result.
+        - No temporary file is left next to it.
+    """
+    if file_format == "parquet":
+        pytest.importorskip("pyarrow")
+    folder = tmp_path / "output"
+    expected = backend.query(REPORTS[report])
+
+    rows = export_report(report, file_format, backend, folder=str(folder), chunk_size=1)
+
+    exported = read_export(report_path(report, file_format, str(folder)), file_format)
+    assert rows == len(expected)
+    assert list(exported.columns) == list(expected.columns)
+    assert exported.astype(object).where(exported.notna(), None).values.tolist() == (
+        expected.astype(object).where(expected.notna(), None).values.tolist()
+    )
+    assert os.listdir(folder) == [os.path.basename(report_path(report, file_format))]
+
+
+def test_export_empty_result_writes_header(backend, tmp_path):
+    """
+    Test that an empty result still produces a file, with the CSV header.
+    """
+    path = str(tmp_path / "empty.csv")
+
+    assert export_query("SELECT id, name FROM dim_teams WHERE id < 0", path, "csv", backend) == 0
+    with open(path) as file:
+        assert file.read() == "id,name\n"
+
+
+def test_failed_export_keeps_previous_file(backend, tmp_path, monkeypatch):
+    """
+    Test the atomic write of an export.
+    Test Steps:
+        1. Write a previous version of the file.
+        2. Export a query whose second chunk fails.
+    Assertions:
+        - The error is raised and the previous file is left untouched.
+        - The temporary file of the failed export is removed.
+    """
+    (tmp_path / "output").mkdir()
+    path = tmp_path / "output" / "report.csv"
+    path.write_text("previous\n")
+
+    def failing_chunks(sql, params=None, chunk_size=None):
+        yield pd.DataFrame({"id": [1]})
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(backend, "iter_query", failing_chunks)
+
+    with pytest.raises(RuntimeError):
+        export_query("SELECT id FROM dim_teams", str(path), "csv", backend)
+    assert path.read_text() == "previous\n"
+    assert os.listdir(tmp_path / "output") == ["report.csv"]
+
+
+def test_export_reports_in_parallel(backend, tmp_path):
+    """
+    Test that several reports in several formats are exported at once.
+    Assertions:
+        - Every report is written in every format, with the row count of its query.
+        - The summary holds the teams per competition.
+    """
+    pytest.importorskip("pyarrow")
+    folder = str(tmp_path / "output")
+
+    counts = export_reports(list(REPORTS), EXPORT_FORMATS, backend, folder=folder, max_workers=4)
+
+    assert len(counts) == len(REPORTS) * len(EXPORT_FORMATS)
+    for name in REPORTS:
+        expected = len(backend.query(REPORTS[name] or backend.summary_query))
+        for file_format in EXPORT_FORMATS:
+            assert counts[report_path(name, file_format, folder)] == expected
+    summary = read_export(report_path("summary", "csv", folder), "csv")
+    assert summary.values.tolist() == [["Competition 1", 3], ["Competition 2", 2]]
+
+
+def test_export_from_duckdb(tmp_path, monkeypatch):
+    """
+    Test that the reports are streamed from the DuckDB backend as well.
+    """
+    pytest.importorskip("duckdb")
+    monkeypatch.chdir(tmp_path)
+    duck = DuckDBBackend()
+    duck.create_tables()
+    duck.load(*TABLES)
+
+    assert export_report("competition_teams", "ndjson", duck, chunk_size=2) == 5
+    assert read_export("output/competition_teams.ndjson", "ndjson")["team_id"].tolist() == [1, 2, 3, 1, 2]
+
+
+@pytest.mark.parametrize("file_format", EXPORT_FORMATS)
+def test_polars_summary_matches_summary_query(backend, tmp_path, file_format):
+    """
+    Test that the summary aggregated by the polars engine is the one of the warehouse query.
+    Test Steps:
+        1. Compare the polars summary of an empty warehouse, of the loaded one and of one with tied
+           team counts, with the summary_query.
+        2. Export the summary with both engines.
+    Assertions:
+        - The summaries hold the same rows, in the same order and with the same dtypes.
+        - Competitions with as many teams are sorted by name by both engines.
+        - Both engines write the same file.
+    """
+    pytest.importorskip("polars")
+    if file_format == "parquet":
+        pytest.importorskip("pyarrow")
+    empty = SQLiteBackend(ConnectionManager(str(tmp_path / "db" / "empty.sqlite"), pool_size=1))
+    empty.create_tables()
+    # Competitions with as many teams, whose ids and names are in opposite orders
+    tied = SQLiteBackend(ConnectionManager(str(tmp_path / "db" / "tied.sqlite"), pool_size=1))
+    tied.create_tables()
+    tied.load(
+        pd.DataFrame({"id": [1, 2, 3, 4], "name": ["Competition D", "Competition C", "Competition B", "Competition A"]}),
+        pd.DataFrame({"id": [1, 2, 3], "name": ["Team 1", "Team 2", "Team 3"]}),
+        pd.DataFrame({"competition_id": [1, 1, 2, 2, 3, 3, 3, 4, 4], "team_id": [1, 2, 1, 2, 1, 2, 3, 1, 2]}),
+    )
+    for warehouse in (empty, backend, tied):
+        (summary,) = iter_summary_polars(warehouse, chunk_size=2)
+        pd.testing.assert_frame_equal(summary, warehouse.query(warehouse.summary_query))
+    assert summary["Competition"].tolist() == ["Competition B", "Competition A", "Competition C", "Competition D"]
+
+    folders = [str(tmp_path / engine) for engine in ("pandas", "polars")]
+    for folder, engine in zip(folders, ("pandas", "polars")):
+        assert export_report("summary", file_format, backend, folder=folder, engine=engine) == 2
+    exported = [read_export(report_path("summary", file_format, folder), file_format) for folder in folders]
+    pd.testing.assert_frame_equal(exported[1], exported[0])
+
+
+def test_export_rejects_unknown_report_and_format(backend, tmp_path):
+    """
+    Test that unknown reports and formats are rejected before anything is written.
+    """
+    folder = str(tmp_path / "output")
+    with pytest.raises(ValueError):
+        export_report("unknown", "csv", backend, folder=folder)
+    with pytest.raises(ValueError):
+        export_report("summary", "xlsx", backend, folder=folder)
+    assert not os.path.exists(folder)
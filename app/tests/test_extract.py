@@ -1,10 +1,44 @@
 import json
 import os
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
 
-from app.etl.extract import DATA_FOLDER, drop_data, extract_data, fetch_data
+from app.etl.extract import (
+    DATA_FOLDER,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+    RAW_CHUNK_SIZE,
+    build_rate_limiter,
+    date_windows,
+    download_raw,
+    drop_data,
+    enqueue_extraction,
+    extract_data,
+    extract_matches,
+    fetch_data,
+    fetch_pages,
+    fetched_competition_ids,
+    get_retry_delay,
+    get_session,
+    iter_extract,
+    iter_queue_extract,
+    iter_queue_matches,
+    iter_team_fields,
+    replay_data,
+    report_failed_tasks,
+    run_queue_task,
+    run_queue_worker,
+    start_queue_workers,
+)
+from app.etl.cache import ResponseCache
+from app.etl.metrics import start_run_metrics
+from app.etl.rate_limit import KeyPool, SlidingWindowLimiter
+from app.etl.state import CompetitionState
+from app.etl.work_queue import WorkQueue
+from benchmarks.mock_api import MockFootballData, MockServer
 
 """
 Explanation of @pytest.fixture:
@@ -15,8 +49,8 @@ Fixtures are defined using functions, and they can return values that are then i
 """
 @pytest.fixture
 def mock_get():
-    with patch("app.etl.extract.requests.get") as mock:
-        yield mock
+    with patch("app.etl.extract.get_session") as mock:
+        yield mock.return_value.get
 
 
 @pytest.fixture
@@ -61,6 +95,12 @@ def mock_fetch_data():
         yield mock
 
 
+@pytest.fixture
+def mock_manifest():
+    with patch("app.etl.extract.RunManifest") as mock:
+        mock.return_value.is_complete.return_value = False
+        yield mock.return_value
+
 @pytest.fixture
 def mock_file_data():
     return {
@@ -76,7 +116,7 @@ def test_fetch_data_success(mock_get, mock_makedirs, mock_open_fixture, mock_fil
     """
     Test case for the fetch_data function to ensure it successfully fetches data from a given URL and writes it to a file.
     Args:
-        mock_get (MagicMock): Mock object for the requests.get function.
+        mock_get (MagicMock): Mock object for the get method of the shared session.
         mock_makedirs (MagicMock): Mock object for the os.makedirs function.
         mock_open_fixture (MagicMock): Mock object for the built-in open function.
         mock_file_data (dict): Mock data to be returned by the mocked response.
@@ -86,7 +126,7 @@ def test_fetch_data_success(mock_get, mock_makedirs, mock_open_fixture, mock_fil
     3. Call the fetch_data function with a fake URL and filename.
     4. Assert that os.makedirs was called once with the correct parameters.
     5. Assert that the open function was called once with the correct parameters.
-    6. Assert that requests.get was called once with the correct URL and headers.
+    6. Assert that the session get was called once with the correct URL, headers and timeout.
     7. Assert that the result of fetch_data matches the mock data.
     """
     mock_response = MagicMock()
@@ -102,7 +142,7 @@ def test_fetch_data_success(mock_get, mock_makedirs, mock_open_fixture, mock_fil
         os.path.join(DATA_FOLDER, "competitions.json"), "w", encoding="utf-8"
     )
     mock_get.assert_called_once_with(
-        "http://fakeurl.com", headers={"X-Auth-Token": os.getenv("API_KEY")}
+        "http://fakeurl.com", headers={"X-Auth-Token": os.getenv("API_KEY")}, timeout=REQUEST_TIMEOUT
     )
     assert result == mock_file_data
 
@@ -112,26 +152,26 @@ def test_fetch_data_rate_limit(mock_get, mock_sleep, mock_open_fixture, mock_fil
     """
     Test the `fetch_data` function for handling rate limit (HTTP 429) responses.
     This test simulates a scenario where the first request to the API returns a 
-    rate limit response (HTTP 429), and the function should handle this by 
-    waiting (sleeping) for a specified duration before retrying the request. 
+    rate limit response (HTTP 429) with a Retry-After header, and the function should
+    handle this by waiting (sleeping) for the advertised duration before retrying the request. 
     The second request should return a successful response (HTTP 200) with the 
     expected data.
     Mocks:
-        mock_get: Mock for the `requests.get` function to simulate API responses.
+        mock_get: Mock for the shared session `get` method to simulate API responses.
         mock_sleep: Mock for the `time.sleep` function to simulate waiting.
         mock_makedirs: Mock for the `os.makedirs` function to simulate directory creation.
         mock_open_fixture: Mock for the `open` function to simulate file operations.
         mock_file_data: Mock data to be returned by the successful API response.
     Assertions:
-        - The `requests.get` function is called twice.
+        - The session `get` method is called twice.
         - The `time.sleep` function is called once with the correct duration.
         - The result of the `fetch_data` function matches the expected mock data.
         - The `open` function is called with the correct file path and mode.
     """
-    """Test handling of rate limit (429) response with recursion"""
     # Setup responses
     mock_response_429 = MagicMock()
     mock_response_429.status_code = 429
+    mock_response_429.headers = {"Retry-After": "60"}
     
     mock_response_200 = MagicMock()
     mock_response_200.status_code = 200
@@ -174,6 +214,191 @@ def test_fetch_data_error(mock_get):
     assert result == {}
 
 
+def test_fetch_data_gives_up_after_max_retries(mock_get, mock_sleep):
+    """
+    Test that fetch_data stops retrying after MAX_RETRIES rate-limited responses.
+    A long streak of 429 responses must end in an empty result instead of
+    retrying forever.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        mock_sleep (MagicMock): Mock object for time.sleep.
+    Assertions:
+        - The request is sent once plus MAX_RETRIES retries.
+        - time.sleep is called once per retry.
+        - The result is an empty dictionary.
+    """
+    mock_response = MagicMock()
+    mock_response.status_code = 429
+    mock_response.headers = {}
+    mock_get.return_value = mock_response
+
+    result = fetch_data("http://fakeurl.com", "competitions.json")
+
+    assert mock_get.call_count == MAX_RETRIES + 1
+    assert mock_sleep.call_count == MAX_RETRIES
+    assert result == {}
+
+
+def test_fetch_data_key_pool_moves_off_throttled_and_revoked_keys(mock_get, mock_sleep, mock_open_fixture, mock_file_data):
+    """
+    Test that a request sent through a pool of keys is retried on another key,
+    without waiting, when its key is throttled or rejected.
+    Test Steps:
+        1. The first key is answered with a 429, the second one with the 400 of an invalid token.
+        2. The third key gets the data.
+    Assertions:
+        - Each attempt is sent with the X-Auth-Token of a different key.
+        - time.sleep is never called.
+        - The first key is throttled for the Retry-After delay and the second one is revoked.
+        - The data of the third key is returned.
+    """
+    response_429 = MagicMock(status_code=429, headers={"Retry-After": "60"})
+    response_400 = MagicMock(status_code=400, text='{"message": "Your API token is invalid.", "errorCode": 400}')
+    response_200 = MagicMock(status_code=200, text=json.dumps(mock_file_data))
+    response_200.json.return_value = mock_file_data
+    mock_get.side_effect = [response_429, response_400, response_200]
+    pool = KeyPool(["token-a111", "token-b222", "token-c333"], requests_per_minute=100)
+
+    result = fetch_data("http://fakeurl.com", "competitions.json", pool)
+
+    tokens = [call.kwargs["headers"]["X-Auth-Token"] for call in mock_get.call_args_list]
+    assert tokens == ["token-a111", "token-b222", "token-c333"]
+    mock_sleep.assert_not_called()
+    assert pool.keys[0].blocked_until > 0
+    assert pool.keys[1].revoked and not pool.keys[2].revoked
+    assert result == mock_file_data
+
+
+def test_fetch_data_waits_for_reset_after_last_request_of_minute(mock_get, mock_sleep, mock_open_fixture, mock_file_data):
+    """
+    Test that a successful response reporting no requests left in the current minute makes
+    the next request wait for the quota reset, instead of sending it to get a 429.
+    Test Steps:
+        1. Fetch a URL answered with a 200 holding X-RequestsAvailable-Minute: 0 and a reset in 30 seconds.
+        2. Fetch a second URL, with the same key, then through a pool of keys.
+    Assertions:
+        - The first response is returned without waiting.
+        - The second request is only sent after waiting for the reset.
+        - In a pool, the key is set aside until the reset and the next request uses another key.
+    """
+    exhausted = {"X-RequestsAvailable-Minute": "0", "X-RequestCounter-Reset": "30"}
+    response_200 = MagicMock(status_code=200, text=json.dumps(mock_file_data), headers=exhausted)
+    response_200.json.return_value = mock_file_data
+    mock_get.return_value = response_200
+
+    with patch("app.etl.extract._quota_reset_at", 0.0):
+        assert fetch_data("http://fakeurl.com", "competitions.json") == mock_file_data
+        mock_sleep.assert_not_called()
+
+        fetch_data("http://fakeurl.com/PL/teams", "teams_PL.json")
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args.args[0] == pytest.approx(30, abs=1)
+
+    pool = KeyPool(["token-a111", "token-b222"], requests_per_minute=100)
+    fetch_data("http://fakeurl.com", "competitions.json", pool)
+    fetch_data("http://fakeurl.com/PL/teams", "teams_PL.json", pool)
+
+    tokens = [call.kwargs["headers"]["X-Auth-Token"] for call in mock_get.call_args_list[2:]]
+    assert tokens == ["token-a111", "token-b222"]
+    assert pool.keys[0].blocked_until > 0
+
+
+def test_build_rate_limiter():
+    """
+    Test that several API_KEYS build a pool of keys, in sequential mode as well,
+    and that a single key keeps the sliding-window limiter of concurrent mode.
+    """
+    with patch("app.etl.extract.API_KEYS", ["token-a111", "token-b222"]):
+        assert isinstance(build_rate_limiter(concurrent=False), KeyPool)
+    with patch("app.etl.extract.API_KEYS", []):
+        assert isinstance(build_rate_limiter(), SlidingWindowLimiter)
+        assert build_rate_limiter(concurrent=False) is None
+
+
+def test_get_retry_delay_uses_request_counter_reset():
+    """
+    Test that get_retry_delay waits for the football-data quota reset when no
+    requests are left in the current minute.
+    Assertions:
+        - The delay is the X-RequestCounter-Reset value plus at most one second of jitter.
+    """
+    response = MagicMock()
+    response.status_code = 429
+    response.headers = {"X-RequestsAvailable-Minute": "0", "X-RequestCounter-Reset": "42"}
+
+    delay = get_retry_delay(response, attempt=0)
+
+    assert 42 <= delay <= 43
+
+
+def test_get_retry_delay_exponential_backoff():
+    """
+    Test that get_retry_delay falls back to a jittered exponential backoff when
+    the response carries no rate-limit headers.
+    Assertions:
+        - The delay never exceeds the exponential bound for the attempt.
+    """
+    response = MagicMock()
+    response.status_code = 503
+    response.headers = {}
+
+    for attempt in range(4):
+        assert 0 <= get_retry_delay(response, attempt) <= 2 ** attempt
+
+
+def test_get_session_is_shared():
+    """
+    Test that get_session returns the same pooled session on every call, so
+    connections are kept alive between requests.
+    """
+    assert get_session() is get_session()
+
+
+def test_fetch_data_not_modified_served_from_cache(mock_get, tmp_path, mock_file_data):
+    """
+    Test that fetch_data sends a conditional request for a stale cache entry and
+    serves the cached body when the API answers 304 Not Modified.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        tmp_path (Path): Temporary directory used for the raw data and the cache.
+        mock_file_data (dict): Payload stored in the cache.
+    Assertions:
+        - The request carries the cached ETag in If-None-Match.
+        - The cached payload is returned and written to the raw data folder.
+    """
+    cache = ResponseCache(folder=str(tmp_path / "cache"), ttl=0)
+    cache.store("http://fakeurl.com", json.dumps(mock_file_data), {"ETag": '"v1"'})
+
+    mock_response = MagicMock()
+    mock_response.status_code = 304
+    mock_response.headers = {}
+    mock_get.return_value = mock_response
+
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path / "raw")):
+        result = fetch_data("http://fakeurl.com", "competitions.json", cache=cache)
+
+    assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert result == mock_file_data
+    assert json.loads((tmp_path / "raw" / "competitions.json").read_text()) == mock_file_data
+
+
+def test_fetch_data_fresh_cache_skips_request(mock_get, tmp_path, mock_file_data):
+    """
+    Test that fetch_data does not call the API while a cached response is within its TTL.
+    Assertions:
+        - The session get method is never called.
+        - The cached payload is returned.
+    """
+    cache = ResponseCache(folder=str(tmp_path / "cache"), ttl=3600)
+    cache.store("http://fakeurl.com", json.dumps(mock_file_data), {})
+
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path / "raw")):
+        result = fetch_data("http://fakeurl.com", "competitions.json", cache=cache)
+
+    mock_get.assert_not_called()
+    assert result == mock_file_data
+
+
 def test_drop_data(mock_remove, mock_rmtree, mock_scandir, mock_makedirs):
     """
     Test the drop_data function.
@@ -209,7 +434,7 @@ def test_drop_data(mock_remove, mock_rmtree, mock_scandir, mock_makedirs):
     mock_makedirs.assert_called_once_with(DATA_FOLDER, exist_ok=True)
 
 
-def test_extract_data(mock_fetch_data):
+def test_extract_data(mock_fetch_data, mock_manifest):
     """
     Test the extract_data function.
     This test uses a mock object to simulate the fetch_data function, providing
@@ -240,3 +465,723 @@ def test_extract_data(mock_fetch_data):
             "team_name": "Team 1",
         }
     ]
+
+
+def test_extract_data_concurrent(mock_fetch_data, mock_manifest):
+    """
+    Test the extract_data function in concurrent mode.
+    The teams of every competition are fetched through the thread pool, each request
+    goes through the same rate limiter, and the result keeps the competitions order.
+    Args:
+        mock_fetch_data (Mock): A mock object for the fetch_data function.
+    Assertions:
+        - fetch_data is called once for the competitions and once per competition with a code.
+        - Every call receives the same SlidingWindowLimiter instance.
+        - The all_teams list follows the order of the competitions.
+    """
+    competitions_payload = {
+        "competitions": [
+            {"id": 1, "name": "Competition 1", "code": "C1"},
+            {"id": 2, "name": "Competition 2", "code": "C2"},
+            {"id": 3, "name": "Competition 3", "code": None},
+        ]
+    }
+    teams_payloads = {
+        "teams_C1.json": {"teams": [{"id": 101, "name": "Team 1"}]},
+        "teams_C2.json": {"teams": [{"id": 102, "name": "Team 2"}]},
+    }
+
+    def fake_fetch(url, file_name, rate_limiter=None, cache=None):
+        if file_name == "competitions.json":
+            return competitions_payload
+        return teams_payloads[file_name]
+
+    mock_fetch_data.side_effect = fake_fetch
+
+    competitions, all_teams = extract_data(concurrent=True, max_workers=2)
+
+    assert mock_fetch_data.call_count == 3
+    limiters = {id(c.args[2]) for c in mock_fetch_data.call_args_list}
+    assert len(limiters) == 1
+    assert isinstance(mock_fetch_data.call_args_list[0].args[2], SlidingWindowLimiter)
+    assert competitions == competitions_payload["competitions"]
+    assert [team["team_id"] for team in all_teams] == [101, 102]
+
+
+def test_fetched_competition_ids(tmp_path):
+    """
+    Test that only the competitions with a teams file in the raw folder count as fetched.
+    """
+    (tmp_path / "teams_C1.json").write_text("{}")
+    competitions = [{"id": 1, "code": "C1"}, {"id": 2, "code": "C2"}, {"id": 3, "code": None}]
+
+    assert fetched_competition_ids(competitions, str(tmp_path)) == [1]
+
+
+def test_replay_data(tmp_path):
+    """
+    Test the replay_data function.
+    This test writes a competitions.json file and the teams file of one competition
+    into a temporary raw folder, then replays them without any API call.
+    Args:
+        tmp_path (Path): Temporary directory used as the raw data folder.
+    Assertions:
+        - The competitions list matches competitions.json.
+        - The team rows match the extract_data output format.
+        - A competition without a teams file is skipped.
+    """
+    competitions = [
+        {"id": 1, "name": "Competition 1", "code": "C1"},
+        {"id": 2, "name": "Competition 2", "code": "C2"},
+    ]
+    (tmp_path / "competitions.json").write_text(json.dumps({"competitions": competitions}))
+    (tmp_path / "teams_C1.json").write_text(json.dumps({"teams": [{"id": 101, "name": "Team 1"}]}))
+
+    replayed_competitions, all_teams = replay_data(folder=str(tmp_path), max_workers=2)
+
+    assert replayed_competitions == competitions
+    assert all_teams == [
+        {
+            "competition_id": 1,
+            "competition_name": "Competition 1",
+            "team_id": 101,
+            "team_name": "Team 1",
+        }
+    ]
+
+
+def test_replay_data_missing_competitions_file(tmp_path):
+    """
+    Test that replay_data fails loudly when the raw folder holds no competitions.json.
+    """
+    with pytest.raises(FileNotFoundError):
+        replay_data(folder=str(tmp_path))
+
+
+def test_iter_extract_concurrent(mock_fetch_data, mock_manifest):
+    """
+    Test the iter_extract generator in concurrent mode.
+    Assertions:
+        - Every competition is yielded once, including the one without a code.
+        - Each competition comes with its own team rows.
+    """
+    competitions = [{"id": i, "name": f"Competition {i}", "code": f"C{i}"} for i in range(1, 6)]
+    competitions.append({"id": 6, "name": "No code", "code": None})
+
+    def fake_fetch(url, file_name, rate_limiter=None, cache=None):
+        if file_name == "competitions.json":
+            return {"competitions": competitions}
+        code = file_name[len("teams_C"):-len(".json")]
+        return {"teams": [{"id": int(code) * 100, "name": f"Team {code}"}]}
+
+    mock_fetch_data.side_effect = fake_fetch
+
+    results = dict(
+        (competition["id"], rows) for competition, rows in iter_extract(concurrent=True, max_workers=2)
+    )
+
+    assert sorted(results) == [1, 2, 3, 4, 5, 6]
+    assert results[6] == []
+    assert all(rows[0]["team_id"] == competition_id * 100 for competition_id, rows in results.items() if rows)
+
+
+def test_extract_data_resume_fetches_only_missing(mock_get, mock_sleep, tmp_path):
+    """
+    Test that a resumed extraction only calls the API for the files a previous run did not finish.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        mock_sleep (MagicMock): Mock object for time.sleep, so retries do not wait.
+        tmp_path (Path): Temporary directory used as the raw data folder.
+    Test Steps:
+        1. Run extract_data with the teams of C2 answered with a 500 error.
+        2. Run it again with resume=True and every request answered with a 200.
+    Assertions:
+        - The manifest records competitions.json and teams_C1.json as complete and teams_C2.json as failed.
+        - The resumed run sends a single request, for the teams of C2.
+        - The resumed run returns the team rows of both competitions.
+    """
+    competitions = [
+        {"id": 1, "name": "Competition 1", "code": "C1"},
+        {"id": 2, "name": "Competition 2", "code": "C2"},
+    ]
+    payloads = {
+        "http://fakeurl.com": {"competitions": competitions},
+        "http://fakeurl.com/C1/teams": {"teams": [{"id": 101, "name": "Team 1"}]},
+        "http://fakeurl.com/C2/teams": {"teams": [{"id": 102, "name": "Team 2"}]},
+    }
+
+    def respond(url, failing=()):
+        response = MagicMock()
+        response.status_code = 500 if url in failing else 200
+        response.text = json.dumps(payloads[url])
+        response.json.return_value = payloads[url]
+        return response
+
+    raw_folder = tmp_path / "raw"
+    with patch("app.etl.extract.DATA_FOLDER", str(raw_folder)), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ):
+        mock_get.side_effect = lambda url, **kwargs: respond(url, failing={"http://fakeurl.com/C2/teams"})
+        _, first_teams = extract_data()
+
+        manifest = json.loads((raw_folder / "manifest.json").read_text())["files"]
+        assert {name: entry["status"] for name, entry in manifest.items()} == {
+            "competitions.json": "complete",
+            "teams_C1.json": "complete",
+            "teams_C2.json": "failed",
+        }
+        assert [team["team_id"] for team in first_teams] == [101]
+
+        mock_get.reset_mock()
+        mock_get.side_effect = lambda url, **kwargs: respond(url)
+        resumed_competitions, resumed_teams = extract_data(resume=True)
+
+    assert [call.args[0] for call in mock_get.call_args_list] == ["http://fakeurl.com/C2/teams"]
+    assert resumed_competitions == competitions
+    assert [team["team_id"] for team in resumed_teams] == [101, 102]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_sequential_extraction_spreads_requests_over_keys(mock_get, tmp_path, streaming):
+    """
+    Test that a sequential extraction with several API_KEYS sends its teams requests through the key pool.
+    Args:
+        streaming (bool): Run iter_extract instead of extract_data.
+    Assertions:
+        - The requests are sent with the keys in turn, not all with the first key.
+    """
+    competitions = [{"id": index, "name": f"Competition {index}", "code": f"C{index}"} for index in range(5)]
+
+    def respond(url, **kwargs):
+        payload = {"competitions": competitions} if url == "http://fakeurl.com" else {"teams": []}
+        response = MagicMock(status_code=200, text=json.dumps(payload))
+        response.json.return_value = payload
+        return response
+
+    mock_get.side_effect = respond
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path / "raw")), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ), patch("app.etl.extract.API_KEYS", ["token-a111", "token-b222", "token-c333"]):
+        if streaming:
+            list(iter_extract())
+        else:
+            extract_data()
+
+    tokens = [call.kwargs["headers"]["X-Auth-Token"] for call in mock_get.call_args_list]
+    assert tokens == ["token-a111", "token-b222", "token-c333"] * 2
+
+
+def test_concurrent_extraction_stays_under_server_quota(tmp_path):
+    """
+    Test a concurrent extraction against the mock API, which answers a key with a 429 once
+    it sent its quota within the current minute.
+    The clocks of the rate limiter and of the mock API run 20 times faster than real time,
+    so the minute of the quota lasts 3 seconds.
+    Args:
+        tmp_path (Path): Temporary directory holding the raw data folder.
+    Test Steps:
+        1. Extract 13 competitions (14 requests) with 4 workers and a quota of 10 requests per minute.
+    Assertions:
+        - The mock API never answered with a 429: the 11th request waited for the next minute
+          instead of being sent within the first one.
+        - Every request was served and every team row returned.
+    """
+    speedup = 20
+    fast_time = SimpleNamespace(
+        monotonic=lambda: time.monotonic() * speedup, sleep=lambda seconds: time.sleep(seconds / speedup)
+    )
+    data = MockFootballData(competitions=13, teams_per_competition=2, squad_size=1, key_quota=10)
+
+    with MockServer(data) as server, patch.multiple(
+        "app.etl.extract",
+        DATA_FOLDER=str(tmp_path / "raw"),
+        API_URL=server.api_url,
+        API_KEYS=[],
+        HEADERS={"X-Auth-Token": "token-a111"},
+        REQUESTS_PER_MINUTE=10,
+    ), patch("app.etl.rate_limit.time", fast_time), patch("benchmarks.mock_api.time", fast_time):
+        competitions, all_teams = extract_data(concurrent=True, max_workers=4)
+
+    assert data.rate_limited == 0
+    assert data.requests_by_key == {"token-a111": 14}
+    assert len(competitions) == 13
+    assert len(all_teams) == 26
+
+
+def test_extract_data_skips_unchanged_competitions(mock_get, tmp_path):
+    """
+    Test that with a competition state, only the teams of changed competitions are requested.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        tmp_path (Path): Temporary directory holding the raw data folder and the state file.
+    Test Steps:
+        1. Run extract_data with an empty state: every competition is fetched and recorded.
+        2. Clean the raw folder, update C2 (new lastUpdated) and run it again.
+    Assertions:
+        - The second run requests the competitions and the teams of C2 only.
+        - The teams of C1 come from the state, and are written back to the raw folder.
+        - The second run returns the same team rows as a full extraction.
+    """
+    competitions = [
+        {"id": 1, "name": "Competition 1", "code": "C1", "lastUpdated": "2024-09-01T00:00:00Z",
+         "currentSeason": {"id": 10}},
+        {"id": 2, "name": "Competition 2", "code": "C2", "lastUpdated": "2024-09-01T00:00:00Z",
+         "currentSeason": {"id": 20}},
+    ]
+    payloads = {
+        "http://fakeurl.com/C1/teams": {"teams": [{"id": 101, "name": "Team 1"}]},
+        "http://fakeurl.com/C2/teams": {"teams": [{"id": 102, "name": "Team 2"}]},
+    }
+
+    def respond(url, **kwargs):
+        payload = payloads.get(url, {"competitions": competitions})
+        response = MagicMock()
+        response.status_code = 200
+        response.text = json.dumps(payload)
+        response.json.return_value = payload
+        return response
+
+    mock_get.side_effect = respond
+    raw_folder = tmp_path / "raw"
+    with patch("app.etl.extract.DATA_FOLDER", str(raw_folder)), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ), CompetitionState(str(tmp_path / "state.sqlite")) as state:
+        _, first_teams = extract_data(state=state)
+        assert mock_get.call_count == 3
+
+        for entry in os.scandir(raw_folder):
+            os.remove(entry.path)
+        mock_get.reset_mock()
+        competitions[1] = {**competitions[1], "lastUpdated": "2024-09-02T00:00:00Z"}
+        payloads["http://fakeurl.com/C2/teams"]["teams"].append({"id": 103, "name": "Team 3"})
+        _, second_teams = extract_data(concurrent=True, state=state)
+
+    assert [call.args[0] for call in mock_get.call_args_list] == [
+        "http://fakeurl.com", "http://fakeurl.com/C2/teams"
+    ]
+    assert json.loads((raw_folder / "teams_C1.json").read_text()) == payloads["http://fakeurl.com/C1/teams"]
+    assert [team["team_id"] for team in first_teams] == [101, 102]
+    assert [team["team_id"] for team in second_teams] == [101, 102, 103]
+
+
+def test_download_raw_streams_bytes(mock_get, tmp_path):
+    """
+    Test that download_raw writes the response bytes to disk in chunks without decoding them.
+    Assertions:
+        - The request is sent with stream=True and the body read with iter_content.
+        - The file holds the concatenated chunks and no temporary file is left behind.
+        - The response text and JSON accessors are never used.
+    """
+    chunks = [b'{"teams": [{"id": 1, ', b'"name": "Team \xc3\xa9"}]}']
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = iter(chunks)
+    mock_get.return_value = mock_response
+
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path)):
+        file_path = download_raw("http://fakeurl.com", "teams_C1.json")
+
+    assert mock_get.call_args.kwargs["stream"] is True
+    mock_response.iter_content.assert_called_once_with(chunk_size=RAW_CHUNK_SIZE)
+    assert (tmp_path / "teams_C1.json").read_bytes() == b"".join(chunks)
+    assert file_path == str(tmp_path / "teams_C1.json")
+    assert os.listdir(tmp_path) == ["teams_C1.json"]
+    mock_response.json.assert_not_called()
+
+
+def test_download_raw_error(mock_get, tmp_path):
+    """
+    Test that download_raw returns None and writes nothing on an unexpected status code.
+    """
+    mock_response = MagicMock()
+    mock_response.status_code = 404
+    mock_get.return_value = mock_response
+
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path)):
+        assert download_raw("http://fakeurl.com", "teams_C1.json") is None
+
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("parser", ["ijson", "orjson", "json"])
+def test_iter_team_fields(tmp_path, monkeypatch, parser):
+    """
+    Test that iter_team_fields yields only the id and name of every team, with each
+    available parser.
+    Args:
+        tmp_path (Path): Temporary directory holding the teams file.
+        monkeypatch: Used to disable the faster parsers to test the fallbacks.
+        parser (str): The parser under test.
+    Assertions:
+        - One dictionary per team, holding only its id and name.
+        - Nested objects with their own id and name (squad players) are ignored.
+    """
+    if parser == "ijson":
+        pytest.importorskip("ijson")
+    if parser == "orjson":
+        pytest.importorskip("orjson")
+    payload = {
+        "count": 2,
+        "teams": [
+            {"id": 1, "name": "Team 1", "squad": [{"id": 10, "name": "Player 10"}], "venue": "Stadium"},
+            {"id": 2, "name": "Team 2", "squad": []},
+        ],
+    }
+    file_path = tmp_path / "teams_C1.json"
+    file_path.write_text(json.dumps(payload))
+
+    for name in {"ijson": ["orjson"], "orjson": ["ijson"], "json": ["ijson", "orjson"]}[parser]:
+        monkeypatch.setattr(f"app.etl.extract.{name}", None)
+
+    teams = list(iter_team_fields(str(file_path)))
+
+    assert teams == [{"id": 1, "name": "Team 1"}, {"id": 2, "name": "Team 2"}]
+
+
+def test_iter_team_fields_large_file_parsed_incrementally(tmp_path, monkeypatch):
+    """
+    Test that files above INCREMENTAL_PARSE_BYTES are parsed with ijson even when orjson is installed.
+    """
+    ijson = pytest.importorskip("ijson")
+    file_path = tmp_path / "teams_C1.json"
+    file_path.write_text(json.dumps({"teams": [{"id": 1, "name": "Team 1"}]}))
+    monkeypatch.setattr("app.etl.extract.INCREMENTAL_PARSE_BYTES", 0)
+
+    with patch("app.etl.extract.ijson.items", wraps=ijson.items) as mock_items, patch(
+        "app.etl.extract.load_json_file"
+    ) as mock_load:
+        teams = list(iter_team_fields(str(file_path)))
+
+    assert teams == [{"id": 1, "name": "Team 1"}]
+    mock_items.assert_called_once()
+    mock_load.assert_not_called()
+
+
+def test_extract_data_raw_ingest(mock_get, tmp_path):
+    """
+    Test extract_data with raw_ingest against mocked streamed responses.
+    Assertions:
+        - The team rows are the same as with the default path.
+        - The raw files hold the response bytes unchanged.
+    """
+    competitions = [{"id": 1, "name": "Competition 1", "code": "C1"}]
+    payloads = {
+        "http://fakeurl.com": {"competitions": competitions},
+        "http://fakeurl.com/C1/teams": {"teams": [{"id": 101, "name": "Team 1", "squad": [{"id": 5}]}]},
+    }
+
+    def respond(url, **kwargs):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {}
+        response.iter_content.return_value = iter([json.dumps(payloads[url]).encode("utf-8")])
+        return response
+
+    mock_get.side_effect = respond
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path)), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ):
+        result_competitions, all_teams = extract_data(raw_ingest=True)
+
+    assert result_competitions == competitions
+    assert all_teams == [
+        {"competition_id": 1, "competition_name": "Competition 1", "team_id": 101, "team_name": "Team 1"}
+    ]
+    assert json.loads((tmp_path / "teams_C1.json").read_text()) == payloads["http://fakeurl.com/C1/teams"]
+
+
+def test_date_windows():
+    """
+    Test the split of a date range into windows.
+    Assertions:
+        - Without a window length, the range is returned as a single window.
+        - Windows are consecutive, cover the range and the last one is cut at its end.
+        - A reversed range or a window length below one day raises a ValueError.
+    """
+    assert date_windows("2024-08-01", "2024-08-25") == [("2024-08-01", "2024-08-25")]
+    assert date_windows("2024-08-01", "2024-08-25", 10) == [
+        ("2024-08-01", "2024-08-10"),
+        ("2024-08-11", "2024-08-20"),
+        ("2024-08-21", "2024-08-25"),
+    ]
+    with pytest.raises(ValueError):
+        date_windows("2024-08-25", "2024-08-01")
+    with pytest.raises(ValueError):
+        date_windows("2024-08-01", "2024-08-25", 0)
+
+
+@pytest.mark.parametrize(
+    "pages, expected_offsets, expected_items",
+    [
+        # The total announced in resultSet is reached on a full page
+        (
+            [{"resultSet": {"count": 4}, "matches": [1, 2]}, {"resultSet": {"count": 4}, "matches": [3, 4]}],
+            [0, 2],
+            [1, 2, 3, 4],
+        ),
+        # Without a total, a short page is the last one
+        ([{"matches": [1, 2]}, {"matches": [3]}], [0, 2], [1, 2, 3]),
+        # An empty page, or a failed request, ends the iteration
+        ([{"matches": [1, 2]}, {}], [0, 2], [1, 2]),
+        # An endpoint ignoring the limit answers everything at once
+        ([{"matches": [1, 2, 3]}], [0], [1, 2, 3]),
+        # An endpoint ignoring the offset repeats the first page
+        ([{"matches": [1, 2]}, {"matches": [1, 2]}], [0, 2], [1, 2]),
+    ],
+)
+def test_fetch_pages(pages, expected_offsets, expected_items):
+    """
+    Test that fetch_pages follows the limit/offset pagination and stops on every end condition.
+    Args:
+        pages (list): Responses returned for offsets 0, 2, 4... in order.
+        expected_offsets (list): Offsets that must be requested.
+        expected_items (list): Items that must be yielded.
+    Assertions:
+        - The requested URLs carry the filters, the limit and the expected offsets, and
+          each page is saved under its own file name.
+        - The items of the pages are yielded once, in order.
+    """
+    with patch("app.etl.extract.fetch_checkpointed", side_effect=pages) as mock_fetch:
+        items = [
+            item
+            for page in fetch_pages("http://fakeurl.com/C1/matches", {"season": 2024}, "matches", "matches_C1", 2)
+            for item in page
+        ]
+
+    assert [call.args[:2] for call in mock_fetch.call_args_list] == [
+        (f"http://fakeurl.com/C1/matches?season=2024&limit=2&offset={offset}", f"matches_C1_{offset}.json")
+        for offset in expected_offsets
+    ]
+    assert items == expected_items
+
+
+def test_extract_matches(mock_get, tmp_path):
+    """
+    Test the extraction of matches for several seasons and date windows.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        tmp_path (Path): Temporary directory used as the raw data folder.
+    Test Steps:
+        1. Write a competitions.json file with a competition with a code, and one without.
+        2. Call extract_matches for two seasons and a date range split into two windows.
+    Assertions:
+        - One request is sent per season and window, with the season and date filters.
+        - Every page is recorded as complete in the run manifest.
+        - The match rows hold the competition id, the teams and the full-time score.
+    """
+    competitions = [{"id": 1, "name": "Competition 1", "code": "C1"}, {"id": 2, "name": "Competition 2"}]
+    match = {
+        "id": 10,
+        "utcDate": "2024-08-17T14:00:00Z",
+        "status": "FINISHED",
+        "matchday": 1,
+        "stage": "REGULAR_SEASON",
+        "season": {"id": 2287},
+        "homeTeam": {"id": 101},
+        "awayTeam": {"id": 102},
+        "score": {"winner": "HOME_TEAM", "fullTime": {"home": 2, "away": 1}},
+        "lastUpdated": "2024-08-18T00:00:00Z",
+    }
+
+    def respond(url, **kwargs):
+        payload = {"resultSet": {"count": 1}, "matches": [match]}
+        response = MagicMock(status_code=200, text=json.dumps(payload))
+        response.json.return_value = payload
+        return response
+
+    mock_get.side_effect = respond
+    raw_folder = tmp_path / "raw"
+    raw_folder.mkdir()
+    (raw_folder / "competitions.json").write_text(json.dumps({"competitions": competitions}))
+
+    with patch("app.etl.extract.DATA_FOLDER", str(raw_folder)), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ):
+        rows = extract_matches(seasons=[2023, 2024], date_from="2024-08-01", date_to="2024-08-20", window_days=10)
+
+    assert sorted(call.args[0] for call in mock_get.call_args_list) == sorted(
+        f"http://fakeurl.com/C1/matches?season={season}&dateFrom={start}&dateTo={end}&limit=500&offset=0"
+        for season in (2023, 2024)
+        for start, end in (("2024-08-01", "2024-08-10"), ("2024-08-11", "2024-08-20"))
+    )
+    manifest = json.loads((raw_folder / "manifest.json").read_text())["files"]
+    assert len(manifest) == 4
+    assert {entry["status"] for entry in manifest.values()} == {"complete"}
+    assert len(rows) == 4
+    assert rows[0] == {
+        "id": 10,
+        "competition_id": 1,
+        "season_id": 2287,
+        "utc_date": "2024-08-17T14:00:00Z",
+        "status": "FINISHED",
+        "matchday": 1,
+        "stage": "REGULAR_SEASON",
+        "home_team_id": 101,
+        "away_team_id": 102,
+        "home_score": 2,
+        "away_score": 1,
+        "winner": "HOME_TEAM",
+        "last_updated": "2024-08-18T00:00:00Z",
+    }
+
+
+@pytest.mark.parametrize("requests_per_minute, share", [(None, 2), (30, 10)])
+def test_start_queue_workers_split_quota(requests_per_minute, share):
+    """
+    Test that the local workers split the quota of their host evenly: REQUESTS_PER_MINUTE
+    by default, or the share of the host given with requests_per_minute.
+    """
+    with patch("app.etl.extract.REQUESTS_PER_MINUTE", 6), patch("app.etl.extract.multiprocessing.Process") as mock_process:
+        workers = start_queue_workers(3, queue_path="queue.sqlite", requests_per_minute=requests_per_minute)
+
+    assert len(workers) == 3
+    assert [call.kwargs["kwargs"] for call in mock_process.call_args_list] == [
+        {"queue_path": "queue.sqlite", "requests_per_minute": share}
+    ] * 3
+    mock_process.return_value.start.assert_called()
+
+
+def test_work_queue_extraction(mock_get, tmp_path):
+    """
+    Test a distributed extraction: queued tasks, a worker, and the streaming source of the loader.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        tmp_path (Path): Temporary directory holding the raw data folder and the queue.
+    Test Steps:
+        1. Queue the teams and matches of a competition with a code and one without.
+        2. Run a worker until the queue is drained; the first teams request fails once.
+        3. Read the teams and matches of the completed tasks.
+    Assertions:
+        - The worker retries the failed request and queues the second page of matches,
+          announced by the resultSet count of the first one.
+        - The competition without a code is yielded without rows, the other with its teams.
+        - The match rows of both pages are yielded.
+    """
+    competitions = [{"id": 1, "name": "Competition 1", "code": "C1"}, {"id": 2, "name": "Competition 2"}]
+    teams = {"teams": [{"id": 101, "name": "Team 1"}, {"id": 102, "name": "Team 2"}]}
+    failed = []
+
+    def respond(url, **kwargs):
+        if url.endswith("/teams"):
+            if not failed:
+                failed.append(url)
+                return MagicMock(status_code=500)
+            payload = teams
+        else:
+            offset = int(url.rsplit("offset=", 1)[1])
+            payload = {"resultSet": {"count": 3}, "matches": [{"id": 10 + offset + i} for i in range(min(2, 3 - offset))]}
+        response = MagicMock(status_code=200, text=json.dumps(payload))
+        response.json.return_value = payload
+        return response
+
+    mock_get.side_effect = respond
+    raw_folder = tmp_path / "raw"
+    queue_path = str(tmp_path / "queue.sqlite")
+
+    with patch("app.etl.extract.DATA_FOLDER", str(raw_folder)), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ), WorkQueue(queue_path) as queue:
+        assert enqueue_extraction(queue, competitions, matches=True, seasons=[2024], page_size=2) == 2
+        assert run_queue_worker(queue_path, worker_id="worker-1", poll_interval=0) == 3
+
+        pairs = list(iter_queue_extract(queue, competitions, poll_interval=0))
+        match_rows = [row for rows in iter_queue_matches(queue, poll_interval=0) for row in rows]
+
+    assert sorted(call.args[0] for call in mock_get.call_args_list) == [
+        "http://fakeurl.com/C1/matches?season=2024&limit=2&offset=0",
+        "http://fakeurl.com/C1/matches?season=2024&limit=2&offset=2",
+        "http://fakeurl.com/C1/teams",
+        "http://fakeurl.com/C1/teams",
+    ]
+    assert pairs[0] == (competitions[1], [])
+    assert pairs[1][0] == competitions[0]
+    assert [team["team_id"] for team in pairs[1][1]] == [101, 102]
+    assert [row["id"] for row in match_rows] == [10, 11, 12]
+    assert {row["competition_id"] for row in match_rows} == {1}
+
+
+def test_report_failed_tasks(mock_get, tmp_path, caplog):
+    """
+    Test that a competition whose teams task failed on every attempt is reported rather than
+    silently left out of the run.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        tmp_path (Path): Temporary directory holding the raw data folder and the queue.
+        caplog (LogCaptureFixture): Captured log records.
+    Assertions:
+        - The competition is not yielded by the streaming source.
+        - An error names the key of the failed task, and the run report lists it.
+    """
+    competitions = [{"id": 1, "name": "Competition 1", "code": "C1"}]
+    mock_get.return_value = MagicMock(status_code=404, text="{}")
+    queue_path = str(tmp_path / "queue.sqlite")
+    run_metrics = start_run_metrics()
+
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path / "raw")), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ), WorkQueue(queue_path, max_attempts=2) as queue:
+        enqueue_extraction(queue, competitions)
+        run_queue_worker(queue_path, worker_id="worker-1", poll_interval=0)
+        pairs = list(iter_queue_extract(queue, competitions, poll_interval=0))
+        failed = report_failed_tasks(queue)
+
+    assert pairs == []
+    assert [task["key"] for task in failed] == ["teams_C1.json"]
+    assert any("teams_C1.json" in record.message and record.levelname == "ERROR" for record in caplog.records)
+    assert [task["key"] for task in run_metrics.to_dict()["failed_tasks"]] == ["teams_C1.json"]
+
+
+def test_queue_extract_loads_matches_as_completed(mock_get, tmp_path):
+    """
+    Test that, with `on_matches`, the pages of matches are handed over in the same loop as
+    the teams, while the other tasks of the queue are still being fetched.
+    Args:
+        mock_get (MagicMock): Mock object for the get method of the shared session.
+        tmp_path (Path): Temporary directory holding the raw data folder and the queue.
+    Test Steps:
+        1. Queue the teams and matches of a competition, and run its teams task and its first page of matches.
+        2. Consume the streaming source; the second page of matches is fetched once it waits for the queue.
+    Assertions:
+        - The first page of matches was handed over before the second one was fetched.
+        - The teams are yielded, and every match row is handed over to `on_matches`.
+    """
+    competitions = [{"id": 1, "name": "Competition 1", "code": "C1"}]
+
+    def respond(url, **kwargs):
+        if url.endswith("/teams"):
+            payload = {"teams": [{"id": 101, "name": "Team 1"}]}
+        else:
+            offset = int(url.rsplit("offset=", 1)[1])
+            payload = {"resultSet": {"count": 3}, "matches": [{"id": 10 + offset + i} for i in range(min(2, 3 - offset))]}
+        response = MagicMock(status_code=200, text=json.dumps(payload))
+        response.json.return_value = payload
+        return response
+
+    mock_get.side_effect = respond
+    queue_path = str(tmp_path / "queue.sqlite")
+    pages = []
+    loaded_while_fetching = []
+
+    def alive():
+        # Called while the second page is still open: fetch it, as another worker would
+        loaded_while_fetching.append(len(pages))
+        run_queue_worker(queue_path, worker_id="worker-2", poll_interval=0)
+        return True
+
+    with patch("app.etl.extract.DATA_FOLDER", str(tmp_path / "raw")), patch(
+        "app.etl.extract.API_URL", "http://fakeurl.com"
+    ), WorkQueue(queue_path) as queue:
+        enqueue_extraction(queue, competitions, matches=True, seasons=[2024], page_size=2)
+        for _ in range(2):
+            task = queue.claim("worker-1")
+            assert run_queue_task(queue, task, None)
+            queue.complete(task, "worker-1")
+
+        pairs = list(iter_queue_extract(queue, competitions, poll_interval=0, alive=alive, on_matches=pages.append))
+
+    assert loaded_while_fetching == [1]
+    assert [(competition, [team["team_id"] for team in teams]) for competition, teams in pairs] == [
+        (competitions[0], [101])
+    ]
+    assert [[row["id"] for row in rows] for rows in pages] == [[10, 11], [12]]
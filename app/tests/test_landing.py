@@ -0,0 +1,116 @@
+import gzip
+import json
+
+import pytest
+
+from app.etl.landing import LandingZone
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def raw_folder(tmp_path):
+    """Raw folder of an extraction run with two competitions with teams and one without a code."""
+    folder = tmp_path / "raw"
+    folder.mkdir()
+    competitions = [
+        {"id": 1, "name": "Competition 1", "code": "C1", "type": "LEAGUE"},
+        {"id": 2, "name": "Competition 2", "code": "C2", "type": "CUP"},
+        {"id": 3, "name": "No code", "code": None},
+    ]
+    (folder / "competitions.json").write_text(json.dumps({"competitions": competitions}))
+    (folder / "teams_C1.json").write_text(
+        json.dumps({"teams": [{"id": 101, "name": "Team 1", "squad": [{"id": 1, "name": "Player"}]}]})
+    )
+    (folder / "teams_C2.json").write_text(
+        json.dumps({"teams": [{"id": 101, "name": "Team 1"}, {"id": 102, "name": "Team 2"}]})
+    )
+    return folder
+
+
+@pytest.fixture(params=["jsonl", "parquet"])
+def landing_zone(request, tmp_path):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    return LandingZone(folder=str(tmp_path / "landing"), file_format=request.param)
+
+
+def test_land_and_read(landing_zone, raw_folder):
+    """
+    Test that a landed run reads back into the extract_data output format.
+    Args:
+        landing_zone (LandingZone): Landing zone in each file format.
+        raw_folder (Path): Raw files of an extraction run.
+    Assertions:
+        - The partitions follow the run_date=/competition= layout.
+        - The competitions and team rows match the raw files.
+    """
+    stats = landing_zone.land(str(raw_folder), run_date="2024-09-13")
+
+    assert stats["competitions"] == 3
+    assert stats["teams"] == 3
+    assert landing_zone.run_dates() == ["2024-09-13"]
+    extension = "jsonl.gz" if landing_zone.file_format == "jsonl" else "parquet"
+    assert (raw_folder.parent / "landing" / "run_date=2024-09-13" / "competition=C2" / f"teams.{extension}").exists()
+
+    competitions, all_teams = landing_zone.read()
+
+    assert [competition["code"] for competition in competitions] == ["C1", "C2", None]
+    assert competitions[0] == {"id": 1, "name": "Competition 1", "code": "C1"}
+    assert all_teams == [
+        {"competition_id": 1, "competition_name": "Competition 1", "team_id": 101, "team_name": "Team 1"},
+        {"competition_id": 2, "competition_name": "Competition 2", "team_id": 101, "team_name": "Team 1"},
+        {"competition_id": 2, "competition_name": "Competition 2", "team_id": 102, "team_name": "Team 2"},
+    ]
+
+
+def test_read_prunes_partitions_and_columns(landing_zone, raw_folder):
+    """
+    Test the predicate pushdown and column pruning of the reader.
+    Assertions:
+        - Only the requested competitions are read, and the other partitions are never
+          opened (a corrupt file in a pruned partition does not fail the read).
+        - Only the requested columns are returned; the full API object is kept in the payload.
+        - Reading a run date that was not landed raises FileNotFoundError.
+    """
+    landing_zone.land(str(raw_folder), run_date="2024-09-12")
+    landing_zone.land(str(raw_folder), run_date="2024-09-13")
+    pruned = raw_folder.parent / "landing" / "run_date=2024-09-13" / "competition=C2"
+    for path in pruned.iterdir():
+        path.write_bytes(b"corrupt")
+
+    competitions, all_teams = landing_zone.read(competition_codes=["C1"], columns=["team_id"])
+    assert competitions == [{"id": 1, "name": "Competition 1", "code": "C1"}]
+    assert all_teams == [{"team_id": 101}]
+
+    _, payloads = landing_zone.read("2024-09-12", ["C1"], columns=["payload"])
+    payload = payloads[0]["payload"]
+    payload = json.loads(payload) if isinstance(payload, str) else payload
+    assert payload["squad"] == [{"id": 1, "name": "Player"}]
+
+    with pytest.raises(FileNotFoundError):
+        landing_zone.read("2024-01-01")
+
+
+def test_land_replaces_same_run_date(tmp_path, raw_folder):
+    """
+    Test that landing the same run date twice keeps only the last run, as gzip JSON Lines.
+    """
+    landing_zone = LandingZone(folder=str(tmp_path / "landing"))
+    landing_zone.land(str(raw_folder), run_date="2024-09-13")
+    (raw_folder / "teams_C2.json").write_text(json.dumps({"teams": []}))
+    landing_zone.land(str(raw_folder), run_date="2024-09-13")
+
+    teams_file = tmp_path / "landing" / "run_date=2024-09-13" / "competition=C2" / "teams.jsonl.gz"
+    with gzip.open(teams_file, "rt") as file:
+        assert file.read() == ""
+    assert sorted(path.name for path in (tmp_path / "landing").iterdir()) == ["run_date=2024-09-13"]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        LandingZone(folder=str(tmp_path), file_format="csv")
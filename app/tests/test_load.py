@@ -1,7 +1,30 @@
+import os
+import sqlite3
 import pytest
 from unittest.mock import patch, MagicMock
 import pandas as pd
-from app.etl.load import load_data, create_tables 
+from app.etl.database import ConnectionManager, session
+from app.etl.load import (
+    AGGREGATE_SUMMARY_QUERY,
+    AGGREGATE_TABLES,
+    AGGREGATE_TRIGGERS,
+    DuckDBBackend,
+    HISTORY_AS_OF_QUERY,
+    HISTORY_OPEN_END,
+    SCHEMA_VERSION,
+    SUMMARY_QUERY,
+    bulk_load_data,
+    connect_db,
+    create_tables,
+    get_backend,
+    history_as_of,
+    load_batch,
+    load_data,
+    load_matches,
+    snapshot_history,
+    upsert_data,
+)
+from app.etl.transform import transform_matches
 
 """
 Explanation of @pytest.fixture:
@@ -62,12 +85,13 @@ def test_create_tables(mock_sqlite_connection):
         mock_sqlite_connection (tuple): A tuple containing mock objects for the 
         SQLite connection and cursor.
     Test Steps:
-    1. Call the create_tables function.
+    1. Report an empty database (schema version 0) and call the create_tables function.
     2. Verify that the database connection was attempted with the correct database file.
     3. Verify that all expected table creation SQL commands were executed.
     4. Ensure that the commit and close methods were called on the database connection.
     """
     mock_connect, mock_cursor = mock_sqlite_connection
+    mock_cursor.execute.return_value.fetchone.return_value = (0,)
 
     # Call create_tables
     create_tables()
@@ -80,9 +104,17 @@ def test_create_tables(mock_sqlite_connection):
         "DROP TABLE IF EXISTS dim_teams",
         "DROP TABLE IF EXISTS dim_competitions",
         "DROP TABLE IF EXISTS fact_competitions",
+        "DROP TABLE IF EXISTS fact_matches",
         "CREATE TABLE IF NOT EXISTS dim_teams",
         "CREATE TABLE IF NOT EXISTS dim_competitions",
-        "CREATE TABLE IF NOT EXISTS fact_competitions"
+        "CREATE TABLE IF NOT EXISTS fact_competitions",
+        "CREATE INDEX IF NOT EXISTS idx_fact_competitions_team_id",
+        "CREATE TABLE IF NOT EXISTS fact_matches",
+        "CREATE INDEX IF NOT EXISTS idx_fact_matches_",
+        "DROP TABLE IF EXISTS agg_",
+        "CREATE TABLE IF NOT EXISTS agg_",
+        "CREATE TRIGGER IF NOT EXISTS trg_fact_",
+        "PRAGMA user_version"
     ]
 
     # Verify each SQL command was executed
@@ -124,4 +156,536 @@ def test_load_data(mock_sqlite, sample_data):
         assert mock_to_sql.call_count == 3
         mock_to_sql.assert_any_call('dim_competitions', mock_sqlite.return_value, if_exists='append', index=False)
         mock_to_sql.assert_any_call('dim_teams', mock_sqlite.return_value, if_exists='append', index=False)
-        mock_to_sql.assert_any_call('fact_competitions', mock_sqlite.return_value, if_exists='append', index=False)
\ No newline at end of file
+        mock_to_sql.assert_any_call('fact_competitions', mock_sqlite.return_value, if_exists='append', index=False)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs the test from a temporary directory, so the functions under test create
+    and use a throwaway db/football_data.sqlite instead of the real one.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def read_table(query):
+    conn = sqlite3.connect("db/football_data.sqlite")
+    try:
+        return sorted(conn.execute(query).fetchall())
+    finally:
+        conn.close()
+
+
+def test_create_tables_keeps_rows_when_not_dropping(workdir, sample_data):
+    """
+    Test that create_tables(clear_existing=False) keeps the rows of a previous run.
+    """
+    create_tables()
+    upsert_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+
+    create_tables(clear_existing=False)
+
+    assert read_table("SELECT id, name FROM dim_teams") == [(1, 'Team 1'), (2, 'Team 2')]
+
+
+def test_create_tables_clear_keeps_matches(workdir, sample_data):
+    """
+    Test that a run clearing the team tables keeps the matches loaded by previous runs,
+    with the foreign keys enforced.
+    Assertions:
+        - The team tables are emptied, fact_matches and its aggregate are not.
+        - The foreign keys are enforced again once the tables are cleared.
+    """
+    with ConnectionManager("db/football_data.sqlite", foreign_keys=True) as db:
+        create_tables(db=db)
+        load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'], db=db)
+        load_matches(transform_matches([
+            {"id": 10, "competition_id": 1, "season_id": 2023, "status": "FINISHED",
+             "home_team_id": 1, "away_team_id": 2, "home_score": 1, "away_score": 0},
+        ]), db=db)
+
+        create_tables(db=db)
+
+        assert read_table("SELECT COUNT(*) FROM fact_competitions") == [(0,)]
+        assert read_table("SELECT COUNT(*) FROM dim_teams") == [(0,)]
+        assert read_table("SELECT id, season_id FROM fact_matches") == [(10, 2023)]
+        assert read_table("SELECT competition_id, matches, goals FROM agg_competition_matches") == [(1, 1, 1)]
+        with pytest.raises(sqlite3.IntegrityError):
+            db.writer().execute("INSERT INTO fact_competitions (competition_id, team_id) VALUES (1, 1)")
+
+
+def test_upsert_data_only_writes_differences(workdir, sample_data):
+    """
+    Test the upsert_data function against a real SQLite database.
+    Test Steps:
+    1. Load the sample data into empty tables.
+    2. Load a second version where one team is renamed, one team is added,
+       one fact row is removed and one fact row is added.
+    3. Load the second version again.
+    Assertions:
+        - The first load writes every row.
+        - The second load only writes the renamed and added rows, and deletes the removed fact row.
+        - The third load writes nothing.
+        - The tables hold the second version.
+    """
+    create_tables(clear_existing=False)
+    first = upsert_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    assert first == {'dim_competitions': 2, 'dim_teams': 2, 'fact_competitions': 2, 'fact_competitions_deleted': 0}
+
+    dim_teams = pd.DataFrame({'id': [1, 2, 3], 'name': ['Team 1', 'Team 2 Renamed', 'Team 3']})
+    fact_competitions = pd.DataFrame({'competition_id': [1, 2], 'team_id': [1, 3]})
+
+    second = upsert_data(sample_data['dim_competitions'], dim_teams, fact_competitions)
+    assert second == {'dim_competitions': 0, 'dim_teams': 2, 'fact_competitions': 1, 'fact_competitions_deleted': 1}
+
+    third = upsert_data(sample_data['dim_competitions'], dim_teams, fact_competitions)
+    assert third == {'dim_competitions': 0, 'dim_teams': 0, 'fact_competitions': 0, 'fact_competitions_deleted': 0}
+
+    assert read_table("SELECT id, name FROM dim_teams") == [(1, 'Team 1'), (2, 'Team 2 Renamed'), (3, 'Team 3')]
+    assert read_table("SELECT competition_id, team_id FROM fact_competitions") == [(1, 1), (2, 3)]
+
+
+def test_upsert_data_keeps_facts_of_unfetched_competitions(workdir, sample_data):
+    """
+    Test that upsert_data only deletes the facts of the competitions fetched in the run.
+    Test Steps:
+    1. Load the sample data, where each competition has one team.
+    2. Upsert without any team of competition 2, whose fetch failed.
+    3. Upsert again, with competition 2 fetched and left without teams.
+    Assertions:
+        - The facts of competition 2 are kept while it was not fetched.
+        - They are deleted once it was fetched without them.
+    """
+    create_tables(clear_existing=False)
+    upsert_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    fact_competitions = sample_data['fact_competitions'][sample_data['fact_competitions']['competition_id'] == 1]
+
+    kept = upsert_data(sample_data['dim_competitions'], sample_data['dim_teams'], fact_competitions, fetched_competitions=[1])
+    assert kept['fact_competitions_deleted'] == 0
+    assert read_table("SELECT competition_id, team_id FROM fact_competitions") == [(1, 1), (2, 2)]
+
+    deleted = upsert_data(
+        sample_data['dim_competitions'], sample_data['dim_teams'], fact_competitions, fetched_competitions=[1, 2]
+    )
+    assert deleted['fact_competitions_deleted'] == 1
+    assert read_table("SELECT competition_id, team_id FROM fact_competitions") == [(1, 1)]
+
+
+def test_bulk_load_data(workdir, sample_data):
+    """
+    Test the bulk_load_data function against a real SQLite database.
+    Assertions:
+        - Every table holds the rows of the input DataFrames.
+        - The configured journal mode is applied to the database.
+    """
+    create_tables()
+
+    bulk_load_data(
+        sample_data['dim_competitions'],
+        sample_data['dim_teams'],
+        sample_data['fact_competitions'],
+        journal_mode="WAL",
+        synchronous="OFF",
+    )
+
+    assert read_table("SELECT id, name FROM dim_competitions") == [(1, 'Competition 1'), (2, 'Competition 2')]
+    assert read_table("SELECT id, name FROM dim_teams") == [(1, 'Team 1'), (2, 'Team 2')]
+    assert read_table("SELECT competition_id, team_id FROM fact_competitions") == [(1, 1), (2, 2)]
+    assert read_table("PRAGMA journal_mode") == [('wal',)]
+
+
+def test_bulk_load_data_rolls_back_on_error(workdir, sample_data):
+    """
+    Test that bulk_load_data writes nothing when one of the tables fails to load.
+    The dim_teams input holds a duplicated primary key, so the insert fails after
+    dim_competitions was written in the same transaction.
+    Assertions:
+        - An sqlite3.IntegrityError is raised.
+        - dim_competitions is still empty.
+    """
+    create_tables()
+    dim_teams = pd.DataFrame({'id': [1, 1], 'name': ['Team 1', 'Team 1 again']})
+
+    with pytest.raises(sqlite3.IntegrityError):
+        bulk_load_data(sample_data['dim_competitions'], dim_teams, sample_data['fact_competitions'])
+
+    assert read_table("SELECT id, name FROM dim_competitions") == []
+
+
+def query_plan(query, params=()):
+    """Returns the details of the EXPLAIN QUERY PLAN rows of a query."""
+    conn = sqlite3.connect("db/football_data.sqlite")
+    try:
+        return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+    finally:
+        conn.close()
+
+
+def test_create_tables_versioned_schema(workdir, sample_data):
+    """
+    Test that create_tables only rebuilds the schema when its version is outdated.
+    Test Steps:
+    1. Create an old, unversioned fact_competitions table holding one row.
+    2. Call create_tables: the old table is dropped and the current schema is created.
+    3. Load rows and call create_tables again: the schema is kept and only the rows are deleted.
+    Assertions:
+        - The user_version pragma holds SCHEMA_VERSION.
+        - fact_competitions has the composite primary key and the team_id index.
+        - The second call leaves the tables empty without dropping the index.
+    """
+    os.makedirs("db", exist_ok=True)
+    conn = sqlite3.connect("db/football_data.sqlite")
+    conn.execute("CREATE TABLE fact_competitions (competition_id INTEGER, team_id INTEGER)")
+    conn.execute("INSERT INTO fact_competitions VALUES (1, 1)")
+    conn.commit()
+    conn.close()
+
+    create_tables()
+
+    assert read_table("PRAGMA user_version") == [(SCHEMA_VERSION,)]
+    assert read_table("SELECT * FROM fact_competitions") == []
+    assert read_table("SELECT name, pk FROM pragma_table_info('fact_competitions') WHERE pk > 0") == [
+        ('competition_id', 1), ('team_id', 2)
+    ]
+
+    bulk_load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    create_tables()
+
+    assert read_table("SELECT * FROM fact_competitions") == []
+    assert read_table("SELECT * FROM dim_teams") == []
+    assert read_table("SELECT name FROM pragma_index_list('fact_competitions') WHERE origin = 'c'") == [
+        ('idx_fact_competitions_team_id',)
+    ]
+
+
+def test_load_data_deduplicates_fact_rows(workdir, sample_data):
+    """
+    Test that load_data loads a fact table holding duplicated pairs, which the
+    composite primary key would otherwise reject.
+    """
+    create_tables()
+    fact_competitions = pd.DataFrame({'competition_id': [1, 1, 2], 'team_id': [1, 1, 2]})
+
+    load_data(sample_data['dim_competitions'], sample_data['dim_teams'], fact_competitions)
+
+    assert read_table("SELECT competition_id, team_id FROM fact_competitions") == [(1, 1), (2, 2)]
+
+
+def test_summary_query_uses_indexes(workdir):
+    """
+    Test that the summary query reads both tables through indexes only.
+    The aggregate has to visit every fact row, but it should do so through an
+    index of fact_competitions and join dim_competitions by its primary key,
+    never through a full table scan.
+    Assertions:
+        - dim_competitions is searched by its primary key.
+        - Every scan in the plan goes through an index.
+    """
+    create_tables()
+
+    plan = query_plan(SUMMARY_QUERY)
+
+    assert any(detail.startswith("SEARCH c USING INTEGER PRIMARY KEY") for detail in plan), plan
+    assert all("USING" in detail for detail in plan if detail.startswith("SCAN")), plan
+
+
+def assert_aggregates_match_facts():
+    """Checks every aggregate table against its query over the fact tables, see AGGREGATE_TABLES."""
+    for table, (_, query) in AGGREGATE_TABLES.items():
+        assert read_table(f"SELECT * FROM {table}") == read_table(query), table
+
+
+def test_aggregates_follow_incremental_loads(workdir, sample_data):
+    """
+    Test that the triggers keep the aggregate tables equal to the aggregates of the facts.
+    Test Steps:
+    1. Load the sample data, then upsert a fact table where one pair left and one joined.
+    2. Append a streaming batch overlapping the loaded pairs.
+    3. Load a scheduled match, then the same match finished and a second match, then delete one.
+    Assertions:
+        - After every step, each aggregate table matches its GROUP BY over the facts.
+        - Competitions and teams left without facts have no aggregate row.
+        - The materialized summary returns the same rows as the summary over the facts.
+    """
+    create_tables()
+    load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    assert_aggregates_match_facts()
+
+    upsert_data(
+        sample_data['dim_competitions'], sample_data['dim_teams'],
+        pd.DataFrame({'competition_id': [1, 1], 'team_id': [1, 2]}), fetched_competitions=[1, 2],
+    )
+    assert_aggregates_match_facts()
+    assert read_table("SELECT * FROM agg_competition_teams") == [(1, 2)]
+
+    with session() as conn:
+        load_batch(
+            conn, sample_data['dim_competitions'], sample_data['dim_teams'],
+            pd.DataFrame({'competition_id': [1, 2], 'team_id': [1, 2]}),
+        )
+    assert_aggregates_match_facts()
+    assert read_table("SELECT * FROM agg_team_competitions") == [(1, 1), (2, 2)]
+
+    load_matches(transform_matches([{"id": 10, "competition_id": 1, "status": "SCHEDULED"}]))
+    load_matches(transform_matches([
+        {"id": 10, "competition_id": 1, "status": "FINISHED", "home_score": 2, "away_score": 1},
+        {"id": 11, "competition_id": 2, "status": "FINISHED", "home_score": 0, "away_score": 0},
+    ]))
+    assert_aggregates_match_facts()
+    assert read_table("SELECT * FROM agg_competition_matches") == [(1, 1, 1, 3), (2, 1, 1, 0)]
+    with session() as conn:
+        conn.execute("DELETE FROM fact_matches WHERE id = 11")
+        conn.commit()
+    assert_aggregates_match_facts()
+
+    assert read_table(AGGREGATE_SUMMARY_QUERY) == read_table(SUMMARY_QUERY)
+
+
+def test_bulk_load_data_rebuilds_aggregates(workdir, sample_data):
+    """
+    Test that the bulk load rebuilds the aggregate tables instead of running the triggers.
+    Test Steps:
+    1. Bulk load the sample data on top of a table holding other fact rows.
+    2. Upsert a smaller fact table.
+    Assertions:
+        - The aggregates match the facts after the bulk load, which recreated every trigger.
+        - The triggers keep them up to date for the next incremental load.
+    """
+    create_tables()
+    with session() as conn:
+        conn.execute("INSERT INTO fact_competitions VALUES (3, 3)")
+        conn.commit()
+
+    bulk_load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+
+    assert_aggregates_match_facts()
+    assert read_table("SELECT name FROM sqlite_master WHERE type = 'trigger'") == sorted(
+        (trigger,) for trigger in AGGREGATE_TRIGGERS
+    )
+    upsert_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'][:1])
+    assert_aggregates_match_facts()
+
+
+def test_aggregate_summary_query_reads_no_facts(workdir):
+    """
+    Test that the materialized summary never reads fact_competitions, so its cost only
+    depends on the number of competitions.
+    """
+    create_tables()
+
+    plan = query_plan(AGGREGATE_SUMMARY_QUERY)
+
+    assert not any("fact_competitions" in detail for detail in plan), plan
+
+
+def test_team_lookup_uses_team_index(workdir):
+    """
+    Test that looking up the competitions of a team uses the team_id index.
+    """
+    create_tables()
+
+    plan = query_plan("SELECT competition_id FROM fact_competitions WHERE team_id = ?", (1,))
+
+    assert any("USING COVERING INDEX idx_fact_competitions_team_id (team_id=?)" in detail for detail in plan), plan
+
+
+def test_foreign_keys_enforced_when_enabled(workdir):
+    """
+    Test that a connection opened with foreign_keys=True rejects fact rows
+    pointing to unknown dimension rows.
+    """
+    create_tables()
+    conn = connect_db(foreign_keys=True)
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO fact_competitions (competition_id, team_id) VALUES (1, 1)")
+    finally:
+        conn.close()
+
+
+def test_load_matches_upserts_by_id(workdir):
+    """
+    Test that load_matches inserts new matches and updates the ones already loaded.
+    Test Steps:
+    1. Load a scheduled match without a score.
+    2. Load the same match finished, with its score, and a second match.
+    Assertions:
+        - The missing score is stored as NULL.
+        - The second load updates the first match in place instead of duplicating it.
+        - The matches of a team are searched through the team index.
+    """
+    create_tables()
+    scheduled = transform_matches([
+        {"id": 10, "competition_id": 1, "utc_date": "2024-08-17T14:00:00Z", "status": "SCHEDULED",
+         "home_team_id": 1, "away_team_id": 2},
+    ])
+    assert load_matches(scheduled) == 1
+    assert read_table("SELECT id, status, home_score, away_score FROM fact_matches") == [(10, "SCHEDULED", None, None)]
+
+    finished = transform_matches([
+        {"id": 10, "competition_id": 1, "utc_date": "2024-08-17T14:00:00Z", "status": "FINISHED",
+         "home_team_id": 1, "away_team_id": 2, "home_score": 2, "away_score": 1, "winner": "HOME_TEAM"},
+        {"id": 11, "competition_id": 1, "utc_date": "2024-08-24T14:00:00Z", "status": "SCHEDULED",
+         "home_team_id": 2, "away_team_id": 1},
+    ])
+    load_matches(finished)
+
+    assert read_table("SELECT id, status, home_score, away_score, winner FROM fact_matches") == [
+        (10, "FINISHED", 2, 1, "HOME_TEAM"),
+        (11, "SCHEDULED", None, None, None),
+    ]
+    plan = query_plan("SELECT id FROM fact_matches WHERE home_team_id = ? ORDER BY utc_date", (1,))
+    assert any("idx_fact_matches_home_team" in detail for detail in plan), plan
+
+
+def test_snapshot_history_writes_change_sets(workdir, sample_data):
+    """
+    Test the SCD Type 2 history against a real SQLite database.
+    Test Steps:
+    1. Load the sample data and record a snapshot on 2024-01-01.
+    2. Record the same state again on 2024-02-01.
+    3. Load a second version where one team is renamed, one team is added, one fact
+       row is removed and one fact row is added, and record it on 2024-03-01.
+    Assertions:
+        - The first snapshot inserts every row; the unchanged one writes nothing.
+        - The third snapshot closes the renamed team and the removed fact row, and only
+          inserts the new versions and rows.
+        - "As of" queries return the state of each date, and nothing before the first snapshot.
+        - Reloading the current tables with create_tables() keeps the history.
+    """
+    create_tables()
+    load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    first = snapshot_history("2024-01-01T00:00:00")
+    assert first == {
+        'dim_teams_history_closed': 0, 'dim_teams_history': 2,
+        'fact_competitions_history_closed': 0, 'fact_competitions_history': 2,
+    }
+    assert set(snapshot_history("2024-02-01T00:00:00").values()) == {0}
+
+    create_tables()
+    dim_teams = pd.DataFrame({'id': [1, 2, 3], 'name': ['Team 1', 'Team 2 Renamed', 'Team 3']})
+    fact_competitions = pd.DataFrame({'competition_id': [1, 2], 'team_id': [1, 3]})
+    load_data(sample_data['dim_competitions'], dim_teams, fact_competitions)
+    third = snapshot_history("2024-03-01T00:00:00")
+    assert third == {
+        'dim_teams_history_closed': 1, 'dim_teams_history': 2,
+        'fact_competitions_history_closed': 1, 'fact_competitions_history': 1,
+    }
+
+    assert read_table("SELECT id, name, valid_from, valid_to FROM dim_teams_history WHERE id = 2") == [
+        (2, 'Team 2', '2024-01-01T00:00:00', '2024-03-01T00:00:00'),
+        (2, 'Team 2 Renamed', '2024-03-01T00:00:00', HISTORY_OPEN_END),
+    ]
+    assert history_as_of("2023-12-31").empty
+    assert history_as_of("2024-02-15").values.tolist() == [[1, 1, 'Team 1'], [2, 2, 'Team 2']]
+    assert history_as_of("2024-03-01").values.tolist() == [[1, 1, 'Team 1'], [2, 3, 'Team 3']]
+
+
+def test_snapshot_history_same_run_at(workdir, sample_data):
+    """
+    Test that a version opened and closed by two snapshots with the same run_at is removed
+    instead of being kept as an empty period.
+    """
+    create_tables()
+    load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    snapshot_history("2024-01-01T00:00:00")
+
+    create_tables()
+    dim_teams = pd.DataFrame({'id': [1, 2], 'name': ['Team 1', 'Team 2 Renamed']})
+    load_data(sample_data['dim_competitions'], dim_teams, sample_data['fact_competitions'])
+    snapshot_history("2024-01-01T00:00:00")
+
+    assert read_table("SELECT id, name, valid_from FROM dim_teams_history") == [
+        (1, 'Team 1', '2024-01-01T00:00:00'),
+        (2, 'Team 2 Renamed', '2024-01-01T00:00:00'),
+    ]
+
+
+def test_snapshot_history_rejects_earlier_run_at(workdir, sample_data):
+    """
+    Test that a snapshot older than the last one is rejected, e.g. an older landing partition
+    rebuilt after a newer one, instead of closing versions before they start.
+    Assertions:
+        - A ValueError names both timestamps.
+        - The history is left as it was, without any period ending before it starts.
+    """
+    create_tables()
+    load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    snapshot_history("2024-09-13")
+
+    create_tables()
+    dim_teams = pd.DataFrame({'id': [1, 2], 'name': ['Team 1', 'Team 2 Renamed']})
+    load_data(sample_data['dim_competitions'], dim_teams, sample_data['fact_competitions'])
+    with pytest.raises(ValueError, match="2024-09-12T00:00:00.*2024-09-13T00:00:00"):
+        snapshot_history("2024-09-12")
+
+    assert read_table("SELECT id, name, valid_from, valid_to FROM dim_teams_history") == [
+        (1, 'Team 1', '2024-09-13T00:00:00', HISTORY_OPEN_END),
+        (2, 'Team 2', '2024-09-13T00:00:00', HISTORY_OPEN_END),
+    ]
+
+
+def test_history_queries_use_indexes(workdir, sample_data):
+    """
+    Test that the history tables are read through their keys and indexes.
+    Assertions:
+        - The "as of" query reads fact_competitions_history through its valid_to index and
+          joins dim_teams_history by its primary key.
+        - The history of one team uses the team_id index.
+    """
+    create_tables()
+    load_data(sample_data['dim_competitions'], sample_data['dim_teams'], sample_data['fact_competitions'])
+    snapshot_history("2024-01-01T00:00:00")
+
+    plan = query_plan(HISTORY_AS_OF_QUERY, {"as_of": "2024-01-01"})
+    assert any("f USING" in detail and "idx_fact_competitions_history_valid_to" in detail for detail in plan), plan
+    assert any(detail.startswith("SEARCH t USING PRIMARY KEY (id=? AND valid_from<?)") for detail in plan), plan
+
+    plan = query_plan("SELECT competition_id, valid_from FROM fact_competitions_history WHERE team_id = ?", (1,))
+    assert any("idx_fact_competitions_history_team_id (team_id=?)" in detail for detail in plan), plan
+
+
+def test_get_backend_rejects_unknown_name():
+    """
+    Test that get_backend only knows the SQLite and DuckDB backends.
+    """
+    assert get_backend("sqlite").name == "sqlite"
+    with pytest.raises(ValueError):
+        get_backend("postgres")
+
+
+def test_duckdb_backend_matches_sqlite(workdir, sample_data):
+    """
+    Test that the DuckDB backend loads the same tables and answers the same queries as SQLite.
+    Test Steps:
+    1. Load the sample data, with a duplicated fact row, in both backends.
+    2. Load a scheduled match, then the same match finished, in both backends.
+    Assertions:
+        - Both backends return the same summary.
+        - The duplicated fact row is loaded once, and the match is replaced instead of duplicated.
+        - Creating the DuckDB tables again empties them, except fact_matches.
+    """
+    pytest.importorskip("duckdb")
+    fact_competitions = pd.concat([sample_data['fact_competitions']] * 2, ignore_index=True)
+    scheduled = transform_matches([{"id": 10, "competition_id": 1, "status": "SCHEDULED"}])
+    finished = transform_matches([{"id": 10, "competition_id": 1, "status": "FINISHED", "home_score": 2}])
+
+    backends = [get_backend("sqlite"), DuckDBBackend()]
+    for backend in backends:
+        backend.create_tables()
+        backend.load(sample_data['dim_competitions'], sample_data['dim_teams'], fact_competitions)
+        backend.load_matches(scheduled)
+        backend.load_matches(finished)
+
+    sqlite, duck = backends
+    assert duck.query(duck.summary_query).sort_values("Competition").values.tolist() == (
+        sqlite.query(sqlite.summary_query).sort_values("Competition").values.tolist()
+    )
+    assert duck.query("SELECT COUNT(*) AS n FROM fact_competitions")["n"].tolist() == [2]
+    assert duck.query("SELECT id, status, home_score FROM fact_matches").values.tolist() == [[10, "FINISHED", 2]]
+    assert os.path.exists("db/football_data.duckdb")
+
+    duck.create_tables()
+    assert duck.query("SELECT COUNT(*) AS n FROM dim_teams")["n"].tolist() == [0]
+    assert duck.query("SELECT COUNT(*) AS n FROM fact_matches")["n"].tolist() == [1]
@@ -1,7 +1,11 @@
+import json
+import sqlite3
+
 import pytest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import ANY, patch, MagicMock, call
 import pandas as pd
-from app.main import export_summary, main
+from app.etl.landing import LandingZone
+from app.main import MATCHES_PAGE_SIZE, export_summary, main, parse_args
 
 """
 Explanation of @pytest.fixture:
@@ -11,77 +15,61 @@ They are used to set up some context for the tests, such as creating mock object
 Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
 """
 
-@pytest.fixture
-def mock_makedirs():
-    with patch('main.os.makedirs') as mock:
-        yield mock
-
-@pytest.fixture
-def mock_connect():
-    with patch('main.sqlite3.connect') as mock:
-        yield mock
-
-@pytest.fixture
-def mock_read_sql_query():
-    with patch('main.pd.read_sql_query') as mock:
+@pytest.fixture(autouse=True)
+def mock_write_report():
+    """Keeps main() from writing run reports into the working directory."""
+    with patch('app.main.write_report') as mock:
         yield mock
 
 @pytest.fixture
-def mock_to_csv():
-    with patch('main.pd.DataFrame.to_csv') as mock:
+def mock_export_reports():
+    with patch('app.main.export_reports') as mock:
+        mock.return_value = {"output/summary.csv": 2}
         yield mock
 
-def test_export_summary(mock_makedirs, mock_connect, mock_read_sql_query, mock_to_csv):
+def test_export_summary(mock_export_reports):
     """
     Test the export_summary function.
     This test verifies that the export_summary function performs the following actions:
-    1. Creates the output directory if it does not exist.
-    2. Connects to the SQLite database located at "db/football_data.sqlite".
-    3. Executes a SQL query to retrieve the competition summary data.
-    4. Exports the retrieved data to a CSV file at "output/summary.csv".
+    1. Exports the summary report as CSV when no report or format is given.
+    2. Runs the export on the SQLite backend by default.
+    3. Passes the requested reports and formats to the streaming exporter.
     Mocks:
-    - mock_makedirs: Mock for os.makedirs to avoid creating actual directories.
-    - mock_connect: Mock for sqlite3.connect to avoid making actual database connections.
-    - mock_read_sql_query: Mock for pandas.read_sql_query to avoid executing actual SQL queries.
-    - mock_to_csv: Mock for pandas.DataFrame.to_csv to avoid writing actual files.
+    - mock_export_reports: Mock for etl.export.export_reports to avoid querying the database and writing files.
     Assertions:
-    - Verifies that os.makedirs is called with the correct arguments.
-    - Verifies that sqlite3.connect is called with the correct database path.
-    - Verifies that pandas.read_sql_query is called once.
-    - Verifies that pandas.DataFrame.to_csv is called once with the correct file path and parameters.
-    """
-    # Mock the database connection and query result
-    mock_conn = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_df = pd.DataFrame({
-        'Competition': ['Competition1', 'Competition2'],
-        'Number_of_Teams': [10, 8]
-    })
-    mock_read_sql_query.return_value = mock_df
-
-    # Call the function
+    - Verifies that export_reports is called with the summary report, the CSV format and a SQLite backend.
+    - Verifies that the reports and formats given to export_summary are forwarded.
+    """
     export_summary()
 
-    # Assertions
-    mock_makedirs.assert_called_with("output", exist_ok=True)
-    mock_connect.assert_called_with("db/football_data.sqlite")
-    mock_read_sql_query.assert_called_once()
-    mock_to_csv.assert_called_once_with("output/summary.csv", index=False)
+    names, formats, backend = mock_export_reports.call_args.args
+    assert (list(names), list(formats), backend.name) == (["summary"], ["csv"], "sqlite")
+
+    export_summary(backend, ["summary", "team_competitions"], ["parquet", "ndjson"])
+    mock_export_reports.assert_called_with(["summary", "team_competitions"], ["parquet", "ndjson"], backend, engine="pandas")
 
 @pytest.fixture
 def mock_etl_functions():
     with patch('app.main.drop_data') as mock_drop, \
          patch('app.main.extract_data') as mock_extract, \
+         patch('app.main.replay_data') as mock_replay, \
+         patch('app.main.iter_extract') as mock_iter_extract, \
+         patch('app.main.run_streaming_pipeline') as mock_streaming, \
          patch('app.main.transform_data') as mock_transform, \
          patch('app.main.create_tables') as mock_create, \
          patch('app.main.load_data') as mock_load, \
+         patch('app.main.upsert_data') as mock_upsert, \
          patch('app.main.export_summary') as mock_export:
         yield {
             'drop_data': mock_drop,
             'extract_data': mock_extract,
+            'replay_data': mock_replay,
+            'iter_extract': mock_iter_extract,
+            'run_streaming_pipeline': mock_streaming,
             'transform_data': mock_transform,
             'create_tables': mock_create,
             'load_data': mock_load,
+            'upsert_data': mock_upsert,
             'export_summary': mock_export
         }
 
@@ -164,3 +152,457 @@ def test_main_error_handling(mock_etl_functions, mock_logger):
         "ETL process failed: Test error",
         exc_info=True
     )
+
+
+def test_main_offline(mock_etl_functions, mock_logger):
+    """
+    Test the main function in offline mode.
+    The raw files must be replayed instead of being deleted and fetched again.
+    Assertions:
+        - drop_data and extract_data are never called.
+        - replay_data is called once and its output goes to transform_data.
+        - The load and export steps still run.
+    """
+    replayed = ([{'id': 1, 'name': 'Competition1'}], [{'team_id': 1, 'team_name': 'Team1'}])
+    mock_etl_functions['replay_data'].return_value = replayed
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    main(parse_args(["--offline"]))
+
+    mock_etl_functions['drop_data'].assert_not_called()
+    mock_etl_functions['extract_data'].assert_not_called()
+    mock_etl_functions['replay_data'].assert_called_once()
+    mock_etl_functions['transform_data'].assert_called_once_with(*replayed)
+    mock_etl_functions['load_data'].assert_called_once()
+    mock_etl_functions['export_summary'].assert_called_once()
+
+
+def test_main_resume(mock_etl_functions, mock_logger):
+    """
+    Test the main function in resume mode.
+    Assertions:
+        - drop_data is not called, so the files of the previous run are kept.
+        - extract_data is asked to resume from the run manifest.
+        - --resume cannot be combined with --offline.
+    """
+    mock_etl_functions['extract_data'].return_value = ([], [])
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    main(parse_args(["--resume"]))
+
+    mock_etl_functions['drop_data'].assert_not_called()
+    assert mock_etl_functions['extract_data'].call_args.kwargs['resume'] is True
+    mock_etl_functions['load_data'].assert_called_once()
+
+    with pytest.raises(SystemExit):
+        parse_args(["--resume", "--offline"])
+
+
+def test_main_skip_unchanged(mock_etl_functions, mock_logger):
+    """
+    Test that --skip-unchanged passes a competition state to the extraction and closes it.
+    Assertions:
+        - extract_data receives the state opened by main, which is closed at the end of the run.
+        - Without the option, no state is opened.
+        - --skip-unchanged needs the API, so it cannot be combined with --offline.
+    """
+    mock_etl_functions['extract_data'].return_value = ([], [])
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.CompetitionState') as mock_state:
+        main(parse_args(["--skip-unchanged"]))
+        assert mock_etl_functions['extract_data'].call_args.kwargs['state'] is mock_state.return_value
+        mock_state.return_value.close.assert_called_once()
+
+        mock_state.reset_mock()
+        main(parse_args([]))
+        mock_state.assert_not_called()
+        assert mock_etl_functions['extract_data'].call_args.kwargs['state'] is None
+
+    with pytest.raises(SystemExit):
+        parse_args(["--skip-unchanged", "--offline"])
+
+
+def test_main_from_landing(mock_etl_functions, mock_logger):
+    """
+    Test the main function reading a run of the landing zone.
+    Assertions:
+        - The API and the raw files are not used.
+        - The landing zone is read for the requested run date and competitions.
+        - --competitions requires --from-landing, which cannot be combined with --land.
+    """
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.LandingZone') as mock_landing:
+        mock_landing.return_value.read.return_value = ([], [])
+        main(parse_args(["--from-landing", "2024-09-13", "--competitions", "PL", "--landing-format", "jsonl"]))
+
+    mock_etl_functions['drop_data'].assert_not_called()
+    mock_etl_functions['extract_data'].assert_not_called()
+    mock_etl_functions['replay_data'].assert_not_called()
+    mock_landing.assert_called_once_with(file_format="jsonl")
+    mock_landing.return_value.read.assert_called_once_with("2024-09-13", ["PL"])
+    mock_landing.return_value.land.assert_not_called()
+
+    with pytest.raises(SystemExit):
+        parse_args(["--competitions", "PL"])
+    with pytest.raises(SystemExit):
+        parse_args(["--from-landing", "--land"])
+
+
+def test_main_land(mock_etl_functions, mock_logger):
+    """
+    Test that --land archives the raw files after the load step.
+    """
+    mock_etl_functions['extract_data'].return_value = ([], [])
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.LandingZone') as mock_landing:
+        main(parse_args(["--land"]))
+
+    mock_etl_functions['extract_data'].assert_called_once()
+    mock_landing.return_value.land.assert_called_once_with()
+
+
+def test_main_history(mock_etl_functions, mock_logger):
+    """
+    Test that --history records a snapshot after the load, dated by the landing partition
+    when the run is rebuilt from the landing zone.
+    """
+    mock_etl_functions['extract_data'].return_value = ([], [])
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.snapshot_history') as mock_snapshot:
+        main(parse_args(["--history"]))
+        mock_snapshot.assert_called_once_with(None, db=ANY)
+
+        with patch('app.main.LandingZone') as mock_landing:
+            mock_landing.return_value.read.return_value = ([], [])
+            main(parse_args(["--history", "--from-landing", "2024-09-13"]))
+        mock_snapshot.assert_called_with("2024-09-13", db=ANY)
+
+
+def test_main_history_from_older_landing_partition(tmp_path, monkeypatch):
+    """
+    Test rebuilding the warehouse from landed partitions with --history, end to end.
+    Test Steps:
+        1. Land the same raw files on 2024-09-12 and 2024-09-13.
+        2. Rebuild from the older partition, then from the latest one without a date.
+    Assertions:
+        - The history rows are dated by the partition that was read, not by the time of the run.
+    """
+    monkeypatch.chdir(tmp_path)
+    raw_folder = tmp_path / "data" / "raw"
+    raw_folder.mkdir(parents=True)
+    (raw_folder / "competitions.json").write_text(
+        json.dumps({"competitions": [{"id": 1, "name": "Competition 1", "code": "C1"}]})
+    )
+    (raw_folder / "teams_C1.json").write_text(json.dumps({"teams": [{"id": 101, "name": "Team 1"}]}))
+    for run_date in ("2024-09-12", "2024-09-13"):
+        LandingZone().land(str(raw_folder), run_date=run_date)
+
+    main(parse_args(["--from-landing", "2024-09-12", "--history"]))
+    # A team renamed in the latest partition opens a new version on its date
+    (raw_folder / "teams_C1.json").write_text(json.dumps({"teams": [{"id": 101, "name": "Team 1 renamed"}]}))
+    LandingZone().land(str(raw_folder), run_date="2024-09-13")
+    main(parse_args(["--from-landing", "--history"]))
+
+    conn = sqlite3.connect("db/football_data.sqlite")
+    try:
+        versions = conn.execute("SELECT name, valid_from FROM dim_teams_history ORDER BY valid_from").fetchall()
+    finally:
+        conn.close()
+    assert versions == [("Team 1", "2024-09-12T00:00:00"), ("Team 1 renamed", "2024-09-13T00:00:00")]
+
+
+def test_main_matches(mock_etl_functions, mock_logger):
+    """
+    Test that --matches fetches, transforms and loads the matches after the load step,
+    with the requested competitions, seasons and date range.
+    """
+    mock_etl_functions['extract_data'].return_value = ([], [])
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.extract_matches') as mock_extract_matches, \
+         patch('app.main.transform_matches') as mock_transform_matches, \
+         patch('app.main.get_backend') as mock_get_backend:
+        main(parse_args([
+            "--matches", "--competitions", "PL", "--seasons", "2023", "2024",
+            "--date-from", "2024-08-01", "--date-to", "2024-08-31", "--window-days", "10",
+            "--page-size", "100", "--workers", "2",
+        ]))
+
+    mock_extract_matches.assert_called_once_with(
+        competition_codes=["PL"],
+        seasons=[2023, 2024],
+        date_from="2024-08-01",
+        date_to="2024-08-31",
+        window_days=10,
+        page_size=100,
+        max_workers=2,
+        cache=None,
+    )
+    mock_transform_matches.assert_called_once_with(mock_extract_matches.return_value)
+    mock_get_backend.return_value.load_matches.assert_called_once_with(mock_transform_matches.return_value)
+
+
+@pytest.mark.parametrize("argv", [
+    ["--matches", "--offline"],
+    ["--seasons", "2024"],
+    ["--matches", "--date-from", "2024-08-01"],
+    ["--matches", "--date-from", "2024-08-31", "--date-to", "2024-08-01"],
+])
+def test_parse_args_rejects_invalid_matches_options(argv):
+    """
+    Test that the matches options are validated: they require --matches, need the API,
+    and take a complete, ordered date range.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_main_work_queue(mock_etl_functions, mock_logger):
+    """
+    Test that --work-queue queues the requests, starts the local workers and streams the
+    competitions and matches of the completed tasks to the database.
+    Assertions:
+        - The raw folder is cleaned and the queue reset for a new run.
+        - The teams and matches tasks are queued for the requested seasons, then the workers started.
+        - The streaming pipeline reads the completed teams tasks, and every non-empty page of matches
+          handed over by its source is loaded, without a separate matches stage.
+        - The failed tasks of the queue are reported.
+        - The workers are joined and the queue closed at the end of the run.
+    """
+    competitions = [{"id": 1, "code": "PL"}]
+    worker = MagicMock()
+    worker.is_alive.return_value = False
+
+    source = iter([])
+
+    def queue_source(queue, competitions, alive=None, on_matches=None):
+        # The pages of matches are handed over by the streaming source, as their tasks complete
+        on_matches([{"id": 10}])
+        on_matches([])
+        return source
+
+    with patch('app.main.WorkQueue') as mock_queue, \
+         patch('app.main.extract_competitions', return_value=competitions), \
+         patch('app.main.open_manifest') as mock_manifest, \
+         patch('app.main.enqueue_extraction') as mock_enqueue, \
+         patch('app.main.start_queue_workers', return_value=[worker]) as mock_start, \
+         patch('app.main.report_failed_tasks') as mock_report_failed, \
+         patch('app.main.iter_queue_extract', side_effect=queue_source) as mock_iter_queue, \
+         patch('app.main.transform_matches') as mock_transform_matches, \
+         patch('app.main.get_backend') as mock_get_backend:
+        main(parse_args(["--work-queue", "--queue-workers", "3", "--matches", "--seasons", "2024"]))
+
+    queue = mock_queue.return_value
+    mock_etl_functions['drop_data'].assert_called_once()
+    queue.reset.assert_called_once_with(resume=False)
+    mock_manifest.assert_called_once_with(False)
+    mock_enqueue.assert_called_once_with(queue, competitions, True, [2024], None, MATCHES_PAGE_SIZE, None)
+    mock_start.assert_called_once_with(3, requests_per_minute=None)
+    assert mock_iter_queue.call_args.args == (queue, competitions)
+    assert mock_etl_functions['run_streaming_pipeline'].call_args.args[0] is source
+    mock_etl_functions['iter_extract'].assert_not_called()
+    mock_transform_matches.assert_called_once_with([{"id": 10}])
+    mock_get_backend.return_value.load_matches.assert_called_once_with(mock_transform_matches.return_value)
+    mock_report_failed.assert_called_once_with(queue)
+    worker.join.assert_called_once()
+    queue.close.assert_called_once()
+
+
+@pytest.mark.parametrize("argv, requests_per_minute", [
+    (["--queue-worker"], None),
+    (["--queue-worker", "--requests-per-minute", "5"], 5),
+])
+def test_main_queue_worker(mock_etl_functions, mock_logger, argv, requests_per_minute):
+    """
+    Test that --queue-worker only runs a worker of the queue, with the share of the key quota
+    given by --requests-per-minute, without loading or exporting anything.
+    """
+    with patch('app.main.run_queue_worker') as mock_worker:
+        main(parse_args(argv))
+
+    mock_worker.assert_called_once_with(requests_per_minute=requests_per_minute)
+    mock_etl_functions['drop_data'].assert_not_called()
+    mock_etl_functions['run_streaming_pipeline'].assert_not_called()
+    mock_etl_functions['export_summary'].assert_not_called()
+
+
+@pytest.mark.parametrize("argv", [
+    ["--work-queue", "--offline"],
+    ["--work-queue", "--stream"],
+    ["--work-queue", "--raw-ingest"],
+    ["--work-queue", "--queue-worker"],
+    ["--work-queue", "--backend", "duckdb"],
+    ["--work-queue", "--queue-workers", "-1"],
+    ["--requests-per-minute", "5"],
+    ["--queue-worker", "--requests-per-minute", "0"],
+])
+def test_parse_args_rejects_invalid_work_queue_options(argv):
+    """
+    Test that --work-queue is only combined with the options its workers and loader support.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_main_parallel_transform(mock_etl_functions, mock_logger):
+    """
+    Test that --parallel-transform runs the selected transform through transform_data_parallel()
+    with the requested number of processes, and loads its tables.
+    """
+    competitions, all_teams = [{'id': 1, 'name': 'Competition1'}], [{'team_id': 1, 'team_name': 'Team1'}]
+    mock_etl_functions['extract_data'].return_value = (competitions, all_teams)
+    tables = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.transform_data_parallel', return_value=tables) as mock_parallel:
+        main(parse_args(["--parallel-transform", "--transform-workers", "3"]))
+
+    mock_parallel.assert_called_once_with(
+        competitions, all_teams, transform=mock_etl_functions['transform_data'], max_workers=3
+    )
+    mock_etl_functions['transform_data'].assert_not_called()
+    mock_etl_functions['load_data'].assert_called_once_with(*tables, db=ANY)
+
+
+@pytest.mark.parametrize("argv", [
+    ["--parallel-transform", "--stream"],
+    ["--parallel-transform", "--work-queue"],
+    ["--parallel-transform", "--transform-workers", "0"],
+])
+def test_parse_args_rejects_invalid_parallel_transform_options(argv):
+    """
+    Test that --parallel-transform is only used by the batch transform, with at least one process.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_main_polars_engine(mock_etl_functions, mock_logger):
+    """
+    Test that --engine polars transforms with transform_data_polars() and exports the summary with polars.
+    """
+    pytest.importorskip("polars")
+    competitions, all_teams = [{'id': 1, 'name': 'Competition1'}], [{'team_id': 1, 'team_name': 'Team1'}]
+    mock_etl_functions['extract_data'].return_value = (competitions, all_teams)
+    tables = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.transform_data_polars', return_value=tables) as mock_polars:
+        main(parse_args(["--engine", "polars", "--compact-transform"]))
+
+    mock_polars.assert_called_once_with(competitions, all_teams, compact=True)
+    mock_etl_functions['transform_data'].assert_not_called()
+    mock_etl_functions['export_summary'].assert_called_once_with(ANY, ["summary"], ["csv"], "polars")
+
+
+def test_parse_args_rejects_polars_engine_options():
+    """
+    Test that the polars engine is not combined with the process pool of --parallel-transform,
+    and is rejected when polars is not installed.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(["--engine", "polars", "--parallel-transform"])
+    with patch('app.main.require_polars', side_effect=ImportError("The polars engine requires polars")):
+        with pytest.raises(SystemExit):
+            parse_args(["--engine", "polars"])
+
+
+def test_main_duckdb_backend(mock_etl_functions, mock_logger):
+    """
+    Test that --backend duckdb creates and loads the tables through the DuckDB backend,
+    and exports the summary from it, instead of the SQLite functions.
+    """
+    mock_etl_functions['extract_data'].return_value = ([], [])
+    tables = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+    mock_etl_functions['transform_data'].return_value = tables
+
+    with patch('app.main.get_backend') as mock_get_backend:
+        main(parse_args(["--backend", "duckdb"]))
+
+    backend = mock_get_backend.return_value
+    mock_get_backend.assert_called_once_with("duckdb", db=ANY)
+    backend.create_tables.assert_called_once_with()
+    backend.load.assert_called_once_with(*tables)
+    mock_etl_functions['create_tables'].assert_not_called()
+    mock_etl_functions['load_data'].assert_not_called()
+    mock_etl_functions['export_summary'].assert_called_once_with(backend, ["summary"], ["csv"], "pandas")
+
+
+@pytest.mark.parametrize("option", ["--incremental", "--stream", "--history"])
+def test_parse_args_rejects_sqlite_only_options_with_duckdb(option):
+    """
+    Test that the options relying on SQLite features cannot be combined with the DuckDB backend.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(["--backend", "duckdb", option])
+
+
+def test_main_incremental(mock_etl_functions, mock_logger):
+    """
+    Test the main function in incremental mode.
+    Assertions:
+        - create_tables is called without dropping the existing tables.
+        - upsert_data is used instead of load_data, and only deletes the facts of the
+          competitions whose teams were fetched.
+    """
+    competitions = [{"id": 1, "code": "PL"}]
+    mock_etl_functions['extract_data'].return_value = (competitions, [])
+    mock_etl_functions['transform_data'].return_value = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    with patch('app.main.fetched_competition_ids', return_value=[1]) as mock_fetched:
+        main(parse_args(["--incremental"]))
+
+    mock_etl_functions['create_tables'].assert_called_once_with(clear_existing=False, db=ANY)
+    mock_fetched.assert_called_once_with(competitions)
+    mock_etl_functions['upsert_data'].assert_called_once_with(ANY, ANY, ANY, db=ANY, fetched_competitions=[1])
+    mock_etl_functions['load_data'].assert_not_called()
+
+
+def test_main_stream(mock_etl_functions, mock_logger):
+    """
+    Test the main function in streaming mode.
+    Assertions:
+        - The extract generator is handed to run_streaming_pipeline with the requested batch size.
+        - The batch functions extract_data, transform_data and load_data are not used.
+        - The summary is still exported.
+    """
+    main(parse_args(["--stream", "--batch-size", "100"]))
+
+    mock_etl_functions['drop_data'].assert_called_once()
+    mock_etl_functions['run_streaming_pipeline'].assert_called_once_with(
+        mock_etl_functions['iter_extract'].return_value,
+        batch_size=100,
+        transform=mock_etl_functions['transform_data'],
+        db=ANY,
+    )
+    mock_etl_functions['extract_data'].assert_not_called()
+    mock_etl_functions['transform_data'].assert_not_called()
+    mock_etl_functions['load_data'].assert_not_called()
+    mock_etl_functions['export_summary'].assert_called_once()
+
+
+def test_parse_args_rejects_several_load_modes():
+    """
+    Test that the load modes cannot be combined.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(["--stream", "--incremental"])
+
+
+def test_main_writes_report_on_failure(mock_etl_functions, mock_logger, mock_write_report):
+    """
+    Test that main writes the run report even when a stage fails, with a failed status.
+    """
+    mock_etl_functions['extract_data'].side_effect = Exception("Test error")
+
+    with pytest.raises(Exception, match="Test error"):
+        main(parse_args(["--metrics-dir", "reports", "--prometheus"]))
+
+    mock_write_report.assert_called_once()
+    run_metrics, folder = mock_write_report.call_args.args
+    assert folder == "reports"
+    assert mock_write_report.call_args.kwargs == {"prometheus": True}
+    assert run_metrics.status == "failed"
+    assert "extract" in run_metrics.stages
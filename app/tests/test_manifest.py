@@ -0,0 +1,62 @@
+import json
+
+from app.etl.manifest import MANIFEST_FILE, RunManifest
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+
+
+def test_manifest_round_trip(tmp_path):
+    """
+    Test that completed and failed files survive a reload of the manifest.
+    Assertions:
+        - A completed file whose content is unchanged is reported as complete.
+        - A failed file is not complete.
+        - Entries that were never recorded are not complete.
+    """
+    (tmp_path / "teams_C1.json").write_text(json.dumps({"teams": []}))
+    manifest = RunManifest(str(tmp_path))
+    manifest.mark_complete("teams_C1.json")
+    manifest.mark_failed("teams_C2.json")
+
+    reloaded = RunManifest.load(str(tmp_path))
+
+    assert reloaded.is_complete("teams_C1.json")
+    assert not reloaded.is_complete("teams_C2.json")
+    assert not reloaded.is_complete("teams_C3.json")
+    assert reloaded.counts() == {"complete": 1, "failed": 1}
+
+
+def test_manifest_detects_modified_file(tmp_path):
+    """
+    Test that a file changed or truncated after it was recorded is fetched again.
+    Assertions:
+        - A file with the same size but different content fails the checksum check.
+        - A deleted file is not complete.
+    """
+    (tmp_path / "teams_C1.json").write_text('{"teams": [1]}')
+    (tmp_path / "teams_C2.json").write_text('{"teams": [2]}')
+    manifest = RunManifest(str(tmp_path))
+    manifest.mark_complete("teams_C1.json")
+    manifest.mark_complete("teams_C2.json")
+
+    (tmp_path / "teams_C1.json").write_text('{"teams": [9]}')
+    (tmp_path / "teams_C2.json").unlink()
+
+    assert not manifest.is_complete("teams_C1.json")
+    assert not manifest.is_complete("teams_C2.json")
+
+
+def test_manifest_load_unreadable(tmp_path):
+    """
+    Test that a missing or corrupt manifest yields an empty one instead of an error.
+    """
+    assert RunManifest.load(str(tmp_path)).entries == {}
+
+    (tmp_path / MANIFEST_FILE).write_text("{not json")
+    assert RunManifest.load(str(tmp_path)).entries == {}
@@ -0,0 +1,110 @@
+import json
+import pytest
+from unittest.mock import patch
+
+from app.etl.metrics import RunMetrics, write_report
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def run_metrics():
+    metrics = RunMetrics()
+    for latency, status, size in [(0.1, 200, 1000), (0.3, 200, 3000), (0.2, 429, 0)]:
+        metrics.record_request(latency, status, size)
+    metrics.record_wait(6.0)
+    metrics.record_wait(1.5, rate_limited=False)
+    metrics.add_rows("fact_competitions", 10)
+    metrics.add_rows("fact_competitions", 5)
+    metrics.record_failed_task("teams", "teams_PL.json", "request failed")
+    return metrics
+
+
+def test_stage_accumulates_time():
+    """
+    Test that timing the same stage twice adds up wall and CPU time.
+    Assertions:
+        - The stage is recorded with two calls and the sum of both wall times.
+    """
+    metrics = RunMetrics()
+    with patch("app.etl.metrics.time.perf_counter", side_effect=[0.0, 2.0, 10.0, 11.5]):
+        with metrics.stage("load"):
+            pass
+        with metrics.stage("load"):
+            pass
+
+    assert metrics.stages["load"]["calls"] == 2
+    assert metrics.stages["load"]["wall_seconds"] == pytest.approx(3.5)
+
+
+def test_to_dict(run_metrics):
+    """
+    Test the run report built from the recorded metrics.
+    Assertions:
+        - HTTP requests are counted by status with their total size and latency percentiles.
+        - Rate-limit and retry waits are reported separately.
+        - Rows are summed per table.
+        - The tasks given up are listed.
+    """
+    run_metrics.finish()
+    report = run_metrics.to_dict()
+
+    assert report["status"] == "success"
+    assert report["http"]["requests"] == 3
+    assert report["http"]["requests_by_status"] == {"200": 2, "429": 1}
+    assert report["http"]["bytes_downloaded"] == 4000
+    assert report["http"]["latency_seconds"]["p50"] == pytest.approx(0.2)
+    assert report["http"]["latency_seconds"]["max"] == pytest.approx(0.3)
+    assert report["rate_limit_wait_seconds"] == pytest.approx(6.0)
+    assert report["retry_wait_seconds"] == pytest.approx(1.5)
+    assert report["rows_written"] == {"fact_competitions": 15}
+    assert report["failed_tasks"] == [{"kind": "teams", "key": "teams_PL.json", "error": "request failed"}]
+
+
+def test_to_prometheus(run_metrics):
+    """
+    Test the Prometheus text exposition of the run metrics.
+    """
+    text = run_metrics.to_prometheus()
+
+    assert "# TYPE football_etl_http_requests_total counter" in text
+    assert 'football_etl_http_requests_total{status="429"} 1' in text
+    assert 'football_etl_rows_written_total{table="fact_competitions"} 15' in text
+    assert "football_etl_rate_limit_wait_seconds_total 6.0" in text
+    assert 'football_etl_failed_tasks{kind="teams"} 1' in text
+
+
+def test_requests_by_key():
+    """
+    Test that the requests sent with the keys of a pool are reported per key and status.
+    Assertions:
+        - Requests without a key are only counted by status.
+        - The report and the Prometheus text hold the counts of each key.
+    """
+    metrics = RunMetrics()
+    metrics.record_request(0.1, 200)
+    metrics.record_request(0.1, 200, api_key="key1-a111")
+    metrics.record_request(0.1, 429, api_key="key1-a111")
+    metrics.record_request(0.1, 200, api_key="key2-b222")
+
+    report = metrics.to_dict()
+
+    assert report["http"]["requests_by_status"] == {"200": 3, "429": 1}
+    assert report["http"]["requests_by_key"] == {"key1-a111": {"200": 1, "429": 1}, "key2-b222": {"200": 1}}
+    assert 'football_etl_http_key_requests_total{key="key1-a111",status="429"} 1' in metrics.to_prometheus()
+
+
+def test_write_report(run_metrics, tmp_path):
+    """
+    Test that write_report writes the JSON report and, on request, the Prometheus file.
+    """
+    report_path = write_report(run_metrics, str(tmp_path), prometheus=True)
+
+    with open(report_path, encoding="utf-8") as file:
+        assert json.load(file)["rows_written"] == {"fact_competitions": 15}
+    assert report_path.endswith(".json")
+    assert (tmp_path / report_path.replace(".json", ".prom").split("/")[-1]).exists()
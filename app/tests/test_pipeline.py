@@ -0,0 +1,80 @@
+import sqlite3
+import pytest
+
+from app.etl.pipeline import iter_batches, run_streaming_pipeline
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_competition(competition_id, team_ids):
+    competition = {"id": competition_id, "name": f"Competition {competition_id}", "code": f"C{competition_id}"}
+    team_rows = [
+        {
+            "competition_id": competition_id,
+            "competition_name": competition["name"],
+            "team_id": team_id,
+            "team_name": f"Team {team_id}",
+        }
+        for team_id in team_ids
+    ]
+    return competition, team_rows
+
+
+def count_rows(table):
+    conn = sqlite3.connect("db/football_data.sqlite")
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_iter_batches():
+    """
+    Test that iter_batches flushes as soon as a batch reaches the batch size and
+    emits the remaining competitions at the end.
+    Assertions:
+        - Three competitions of two teams with a batch size of 3 give two batches.
+        - The first batch holds two competitions, the second one the last competition.
+    """
+    source = [make_competition(1, [1, 2]), make_competition(2, [3, 4]), make_competition(3, [5, 6])]
+
+    batches = list(iter_batches(source, batch_size=3))
+
+    assert [len(competitions) for competitions, _ in batches] == [2, 1]
+    assert [len(all_teams) for _, all_teams in batches] == [4, 2]
+
+
+def test_run_streaming_pipeline_loads_while_extracting(workdir):
+    """
+    Test that run_streaming_pipeline commits each batch before the source yields the next one.
+    The source checks the database before yielding every competition after the first.
+    Assertions:
+        - The rows of the previous competitions are already in fact_competitions while
+          later competitions are still being extracted.
+        - Teams shared between competitions are loaded once in dim_teams.
+        - The returned statistics match the loaded rows.
+    """
+    seen_fact_rows = []
+
+    def source():
+        yield make_competition(1, [1, 2])
+        seen_fact_rows.append(count_rows("fact_competitions"))
+        yield make_competition(2, [2, 3])
+        seen_fact_rows.append(count_rows("fact_competitions"))
+
+    stats = run_streaming_pipeline(source(), batch_size=1)
+
+    assert seen_fact_rows == [2, 4]
+    assert count_rows("dim_teams") == 3
+    assert count_rows("dim_competitions") == 2
+    assert stats == {"batches": 2, "competitions": 2, "fact_rows": 4}
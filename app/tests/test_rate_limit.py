@@ -0,0 +1,132 @@
+import pytest
+from unittest.mock import patch
+
+from app.etl.rate_limit import WINDOW_MARGIN_SECONDS, KeyPool, SlidingWindowLimiter
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute. 
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment. 
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def fake_clock():
+    """
+    Replaces time.monotonic and time.sleep with a virtual clock, so sleeping
+    advances the clock instantly instead of blocking the test.
+
+    Yields:
+        dict: The clock state, with the current time under "now" and the list of sleeps under "sleeps".
+    """
+    clock = {"now": 0.0, "sleeps": []}
+
+    def fake_sleep(seconds):
+        clock["sleeps"].append(seconds)
+        clock["now"] += seconds
+
+    with patch("app.etl.rate_limit.time.monotonic", side_effect=lambda: clock["now"]), \
+         patch("app.etl.rate_limit.time.sleep", side_effect=fake_sleep):
+        yield clock
+
+
+def test_sliding_window_allows_limit_without_waiting(fake_clock):
+    """
+    Test that an empty window lets `limit` requests through without waiting.
+    Assertions:
+        - No call to time.sleep is made for the first `limit` acquisitions.
+    """
+    limiter = SlidingWindowLimiter.per_minute(10)
+
+    for _ in range(10):
+        assert limiter.acquire() == 0.0
+
+    assert fake_clock["sleeps"] == []
+
+
+def test_sliding_window_never_exceeds_quota(fake_clock):
+    """
+    Test that no 60-second window ever holds more requests than the quota.
+    Test Steps:
+        1. Acquire 35 requests from a limiter of 10 requests per minute, recording the
+           time of each one on the virtual clock.
+    Assertions:
+        - Every 60-second window starting at a request holds at most 10 requests,
+          whichever minute the server counts them in.
+        - The 11th request waits for the first one to leave the window, i.e. a minute
+          plus the margin, instead of being sent within the first minute.
+    """
+    limiter = SlidingWindowLimiter.per_minute(10)
+    sent = []
+    for _ in range(35):
+        limiter.acquire()
+        sent.append(fake_clock["now"])
+
+    for start in sent:
+        assert sum(start <= moment < start + 60 for moment in sent) <= 10
+    assert sent[10] == pytest.approx(60 + WINDOW_MARGIN_SECONDS)
+
+
+def test_sliding_window_rejects_invalid_settings():
+    """
+    Test that a limiter cannot be created with a non-positive limit or window.
+    """
+    with pytest.raises(ValueError):
+        SlidingWindowLimiter(limit=0, window=60)
+    with pytest.raises(ValueError):
+        SlidingWindowLimiter(limit=10, window=0)
+
+
+def test_key_pool_spreads_requests_across_keys(fake_clock):
+    """
+    Test that a pool of keys hands out its keys in turn and adds up their quotas.
+    With 3 keys of 2 requests per minute, 6 requests are sent without waiting and the
+    7th waits for the first request of a key to leave its window.
+    Assertions:
+        - The keys are used in turn, without waiting while one has room left.
+        - The 7th request waits a minute plus the margin of the window.
+    """
+    pool = KeyPool(["token-a111", "token-b222", "token-c333"], requests_per_minute=2)
+
+    labels = [pool.acquire()[0].label for _ in range(6)]
+    key, waited = pool.acquire()
+
+    assert labels == ["key1-a111", "key2-b222", "key3-c333"] * 2
+    assert fake_clock["sleeps"] == [pytest.approx(60 + WINDOW_MARGIN_SECONDS)]
+    assert waited == pytest.approx(60 + WINDOW_MARGIN_SECONDS)
+
+
+def test_key_pool_skips_throttled_and_revoked_keys(fake_clock):
+    """
+    Test that the pool moves the requests off keys that are throttled or revoked.
+    Test Steps:
+        1. Throttle the first key for 60 seconds and revoke the second one.
+        2. Acquire keys, then let the throttle expire.
+        3. Revoke the last keys.
+    Assertions:
+        - Only the third key is used while the first one is throttled.
+        - The first key is used again once its throttle expired.
+        - A RuntimeError is raised once every key is revoked.
+    """
+    pool = KeyPool(["token-a111", "token-b222", "token-c333"], requests_per_minute=100)
+    first, second, third = pool.keys
+    pool.throttle(first, 60)
+    pool.revoke(second)
+
+    assert [pool.acquire()[0] for _ in range(3)] == [third] * 3
+
+    fake_clock["now"] += 60
+    assert {pool.acquire()[0].label for _ in range(2)} == {first.label, third.label}
+
+    pool.revoke(first)
+    pool.revoke(third)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_key_pool_rejects_empty_pool():
+    """
+    Test that a pool cannot be created without keys.
+    """
+    with pytest.raises(ValueError):
+        KeyPool([], requests_per_minute=10)
@@ -0,0 +1,41 @@
+from app.etl.state import CompetitionState
+
+COMPETITION = {"code": "PL", "lastUpdated": "2024-09-13T16:51:24Z", "currentSeason": {"id": 2287}}
+TEAMS = '{"teams": [{"id": 57, "name": "Arsenal FC"}]}'
+
+
+def test_unchanged_teams_compares_last_updated_and_season(tmp_path):
+    """
+    Test which versions of a competition count as unchanged.
+    Assertions:
+        - A competition never recorded is changed.
+        - Once recorded, the same lastUpdated and season return the stored teams, from a new instance too.
+        - A new lastUpdated or a new season is a change.
+        - A competition without lastUpdated is never stored, so it is always fetched.
+    """
+    path = str(tmp_path / "state" / "state.sqlite")
+    with CompetitionState(path) as state:
+        assert state.unchanged_teams(COMPETITION) is None
+        state.record(COMPETITION, TEAMS)
+
+    with CompetitionState(path) as state:
+        assert state.unchanged_teams(COMPETITION) == TEAMS
+        assert state.unchanged_teams({**COMPETITION, "lastUpdated": "2024-09-14T08:00:00Z"}) is None
+        assert state.unchanged_teams({**COMPETITION, "currentSeason": {"id": 2288}}) is None
+
+        undated = {"code": "CL", "currentSeason": {"id": 1}}
+        state.record(undated, TEAMS)
+        assert state.unchanged_teams(undated) is None
+
+
+def test_record_replaces_previous_version(tmp_path):
+    """
+    Test that recording a new version of a competition replaces the previous one.
+    """
+    with CompetitionState(str(tmp_path / "state.sqlite")) as state:
+        state.record(COMPETITION, TEAMS)
+        updated = {**COMPETITION, "lastUpdated": "2024-09-14T08:00:00Z"}
+        state.record(updated, '{"teams": []}')
+
+        assert state.unchanged_teams(COMPETITION) is None
+        assert state.unchanged_teams(updated) == '{"teams": []}'
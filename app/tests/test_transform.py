@@ -1,5 +1,18 @@
+import multiprocessing
+import numpy as np
+import pandas as pd
 import pytest
-from app.etl.transform import transform_data
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+from app.etl.transform import (
+    MATCH_COLUMNS,
+    partition_bounds,
+    transform_data,
+    transform_data_compact,
+    transform_data_parallel,
+    transform_data_polars,
+    transform_matches,
+)
 
 """
 Explanation of @pytest.fixture:
@@ -78,3 +91,220 @@ def test_transform_data_empty_input():
     # Test fact_competitions DataFrame
     assert fact_competitions.empty
     assert list(fact_competitions.columns) == ["competition_id", "team_id"]
+
+
+def test_transform_data_compact_matches_transform_data(setup_data):
+    """
+    Test that transform_data_compact returns the same rows as transform_data.
+    Args:
+        setup_data (tuple): A tuple containing the competitions and all_teams data.
+    Asserts:
+        - The three DataFrames hold the same values and columns as the default transform.
+        - Id columns are stored as int32.
+    """
+    competitions, all_teams = setup_data
+    expected = transform_data(competitions, all_teams)
+    result = transform_data_compact(competitions, all_teams)
+
+    for expected_df, result_df in zip(expected, result):
+        assert list(result_df.columns) == list(expected_df.columns)
+        assert result_df.astype(object).values.tolist() == expected_df.astype(object).values.tolist()
+
+    dim_competitions, dim_teams, fact_competitions = result
+    assert dim_competitions["id"].dtype == np.int32
+    assert dim_teams["id"].dtype == np.int32
+    assert fact_competitions.dtypes.tolist() == [np.int32, np.int32]
+
+
+def test_transform_data_compact_null_ids():
+    """
+    Test that transform_data_compact drops team rows without ids and deduplicates
+    teams by id, even when the same id comes with another name.
+    Asserts:
+        - The row without a team id is not in the fact table.
+        - dim_teams keeps the first name seen for each id.
+    """
+    all_teams = [
+        {"team_id": 1, "team_name": "Team A", "competition_id": 1},
+        {"team_id": None, "team_name": "Unknown", "competition_id": 1},
+        {"team_id": 1, "team_name": "Team A (renamed)", "competition_id": 2},
+    ]
+
+    _, dim_teams, fact_competitions = transform_data_compact([], all_teams)
+
+    assert fact_competitions.values.tolist() == [[1, 1], [2, 1]]
+    assert dim_teams.astype(object).values.tolist() == [[1, "Team A"]]
+
+
+def test_transform_data_compact_empty_input():
+    """
+    Test the transform_data_compact function with empty input lists.
+    """
+    dim_competitions, dim_teams, fact_competitions = transform_data_compact([], [])
+
+    assert dim_competitions.empty and list(dim_competitions.columns) == ["id", "name"]
+    assert dim_teams.empty and list(dim_teams.columns) == ["id", "name"]
+    assert fact_competitions.empty and list(fact_competitions.columns) == ["competition_id", "team_id"]
+
+
+def test_partition_bounds():
+    """
+    Test that the team rows are split into contiguous ranges that never cut a competition.
+    Asserts:
+        - The ranges cover every row, in order.
+        - A competition larger than its share is kept in a single range.
+        - No more ranges than rows or competitions are returned.
+    """
+    all_teams = [{"competition_id": competition_id} for competition_id in [1, 1, 1, 1, 1, 2, 2, 3]]
+
+    assert partition_bounds(all_teams, 3) == [(0, 5), (5, 7), (7, 8)]
+    assert partition_bounds(all_teams, 2) == [(0, 5), (5, 8)]
+    assert partition_bounds(all_teams, 10) == [(0, 5), (5, 7), (7, 8)]
+    assert partition_bounds(all_teams, 1) == [(0, 8)]
+    assert partition_bounds([], 4) == []
+
+
+@pytest.mark.parametrize("transform", [transform_data, transform_data_compact])
+def test_transform_data_parallel_matches_transform(transform):
+    """
+    Test that the parallel transform returns the tables of the sequential one.
+    Test Steps:
+        1. Build team rows where teams play in several competitions, one of them without a team id.
+        2. Transform them in the current process, then in three worker processes.
+    Asserts:
+        - The three DataFrames hold the same rows, in the same order and with the same dtypes,
+          so teams seen in several partitions are only kept once.
+    """
+    competitions = [{"id": competition_id, "name": f"Competition {competition_id}"} for competition_id in range(6)]
+    all_teams = [
+        {
+            "competition_id": competition_id,
+            "competition_name": f"Competition {competition_id}",
+            "team_id": (competition_id + index) % 8,
+            "team_name": f"Team {(competition_id + index) % 8}",
+        }
+        for competition_id in range(6)
+        for index in range(5)
+    ]
+    all_teams[7]["team_id"] = None
+
+    expected = transform(competitions, all_teams)
+    result = transform_data_parallel(competitions, all_teams, transform=transform, max_workers=3, min_rows=0)
+
+    for expected_df, result_df in zip(expected, result):
+        pd.testing.assert_frame_equal(result_df, expected_df.reset_index(drop=True))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork is not available")
+def test_transform_data_parallel_forks_workers():
+    """
+    Test that the workers are forked whatever the default start method, so the team rows are
+    inherited rather than pickled to every worker.
+    """
+    competitions = [{"id": competition_id, "name": f"Competition {competition_id}"} for competition_id in range(2)]
+    all_teams = [
+        {"competition_id": competition_id, "team_id": competition_id, "team_name": f"Team {competition_id}"}
+        for competition_id in range(2)
+    ]
+
+    with patch("app.etl.transform.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as mock_executor:
+        result = transform_data_parallel(competitions, all_teams, max_workers=2, min_rows=0)
+
+    assert mock_executor.call_args.kwargs["mp_context"].get_start_method() == "fork"
+    assert result[2]["team_id"].tolist() == [0, 1]
+
+
+def test_transform_data_parallel_small_input(setup_data):
+    """
+    Test that inputs below min_rows are transformed in the current process.
+    """
+    competitions, all_teams = setup_data
+
+    with patch("app.etl.transform.ProcessPoolExecutor") as mock_executor:
+        result = transform_data_parallel(competitions, all_teams, max_workers=4, min_rows=100)
+
+    mock_executor.assert_not_called()
+    for expected_df, result_df in zip(transform_data(competitions, all_teams), result):
+        pd.testing.assert_frame_equal(result_df, expected_df)
+
+
+def engine_inputs():
+    """Inputs of the engine parity tests: duplicates, null ids and names, teams in several competitions."""
+    competitions = [{"id": competition_id, "name": f"Competition {competition_id}"} for competition_id in range(50)]
+    competitions += [{"id": None, "name": "No id"}, {"id": 99, "name": None}]
+    all_teams = [
+        {
+            "competition_id": competition_id,
+            "competition_name": f"Competition {competition_id}",
+            "team_id": (competition_id * 7 + index) % 300,
+            "team_name": f"Team {(competition_id * 7 + index) % 300}",
+        }
+        for competition_id in range(50)
+        for index in range(20)
+    ]
+    all_teams[3]["team_id"] = None
+    all_teams[10]["team_name"] = None
+    all_teams[25]["team_name"] = "Renamed team"
+    return [
+        ([], []),
+        (competitions, []),
+        ([{"id": 1, "name": "Premier League"}], [{"team_id": 1, "team_name": "Team A", "competition_id": 1}]),
+        (competitions, all_teams),
+    ]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("inputs", engine_inputs())
+def test_transform_data_polars_matches_pandas(inputs, compact):
+    """
+    Test that the polars engine builds the tables of the pandas transform.
+    Args:
+        inputs (tuple): The competitions and all_teams lists.
+        compact (bool): Compare with transform_data_compact instead of transform_data.
+    Asserts:
+        - The three DataFrames hold the same rows, in the same order and with the same dtypes.
+    """
+    pytest.importorskip("polars")
+    competitions, all_teams = inputs
+    transform = transform_data_compact if compact else transform_data
+
+    expected = transform(competitions, all_teams)
+    result = transform_data_polars(competitions, all_teams, compact=compact)
+
+    for expected_df, result_df in zip(expected, result):
+        pd.testing.assert_frame_equal(result_df, expected_df.reset_index(drop=True))
+
+
+def test_transform_matches():
+    """
+    Test the transform_matches function.
+    Asserts:
+        - Matches without an id or competition are dropped.
+        - A match fetched twice keeps its last version.
+        - Integer columns are nullable, so a scheduled match keeps its missing score.
+    """
+    match_rows = [
+        {"id": 10, "competition_id": 1, "status": "SCHEDULED", "home_team_id": 101, "away_team_id": 102},
+        {"id": None, "competition_id": 1, "status": "FINISHED"},
+        {"id": 11, "competition_id": 1, "status": "SCHEDULED", "home_team_id": 102, "away_team_id": 101},
+        {"id": 10, "competition_id": 1, "status": "FINISHED", "home_team_id": 101, "away_team_id": 102,
+         "home_score": 2, "away_score": 0, "winner": "HOME_TEAM"},
+    ]
+
+    fact_matches = transform_matches(match_rows)
+
+    assert list(fact_matches.columns) == MATCH_COLUMNS
+    assert fact_matches["id"].tolist() == [11, 10]
+    assert fact_matches["status"].tolist() == ["SCHEDULED", "FINISHED"]
+    assert fact_matches["home_score"].dtype == "Int64"
+    assert fact_matches["home_score"].isna().tolist() == [True, False]
+    assert fact_matches.loc[1, "home_score"] == 2
+
+
+def test_transform_matches_empty_input():
+    """
+    Test the transform_matches function with an empty input list.
+    """
+    fact_matches = transform_matches([])
+
+    assert fact_matches.empty and list(fact_matches.columns) == MATCH_COLUMNS
@@ -0,0 +1,170 @@
+import threading
+
+import pytest
+
+from app.etl.work_queue import WorkQueue
+
+"""
+Explanation of @pytest.fixture:
+
+The @pytest.fixture decorator is used to define a fixture function in pytest. Fixtures are a way to provide a fixed baseline upon which tests can reliably and repeatedly execute.
+They are used to set up some context for the tests, such as creating mock objects, preparing test data, or configuring the environment.
+Fixtures are defined using functions, and they can return values that are then injected into test functions that depend on them.
+"""
+@pytest.fixture
+def queue_path(tmp_path):
+    """Path of a queue file in a temporary directory."""
+    return str(tmp_path / "data" / "queue.sqlite")
+
+
+def test_claim_and_complete(queue_path):
+    """
+    Test the life of a task, from put() to the loader.
+    Assertions:
+        - A task with the key of an existing one is not added again.
+        - Tasks are claimed in order, each one once.
+        - The queue is drained once it is sealed and every task is done.
+        - A completed task is returned once by take_completed().
+    """
+    with WorkQueue(queue_path) as queue:
+        assert queue.put("teams", "teams_PL.json", {"url": "PL"})
+        assert queue.put("teams", "teams_BL1.json", {"url": "BL1"})
+        assert not queue.put("teams", "teams_PL.json", {"url": "PL"})
+        queue.seal()
+
+        first, second = queue.claim("worker-1"), queue.claim("worker-2")
+        assert (first["key"], first["payload"], first["attempts"]) == ("teams_PL.json", {"url": "PL"}, 1)
+        assert second["key"] == "teams_BL1.json"
+        assert queue.claim("worker-3") is None
+        assert not queue.is_drained()
+
+        assert queue.complete(first, "worker-1")
+        assert queue.complete(second, "worker-2")
+
+        assert queue.is_drained()
+        assert [task["key"] for task in queue.take_completed("teams")] == ["teams_PL.json", "teams_BL1.json"]
+        assert queue.take_completed("teams") == []
+
+
+def test_expired_lease_is_claimed_again(queue_path):
+    """
+    Test that the task of a crashed worker is retried once its lease expires.
+    Test Steps:
+        1. A worker claims the task and never completes it (lease of 0 seconds).
+        2. A second worker claims it again and completes it.
+    Assertions:
+        - The second claim is the second attempt of the task.
+        - The first worker can no longer complete the task.
+    """
+    with WorkQueue(queue_path, lease_seconds=0) as queue:
+        queue.put("teams", "teams_PL.json", {})
+        crashed = queue.claim("worker-1")
+
+        retried = queue.claim("worker-2")
+
+        assert retried["id"] == crashed["id"]
+        assert retried["attempts"] == 2
+        assert not queue.complete(crashed, "worker-1")
+        assert queue.complete(retried, "worker-2")
+        assert queue.counts() == {"done": 1}
+
+
+def test_task_fails_after_max_attempts(queue_path):
+    """
+    Test that a failing task is retried until it was claimed max_attempts times.
+    Assertions:
+        - fail() gives the task back while attempts remain, then marks it as failed.
+        - A task whose lease expired on its last attempt is failed as well.
+        - Failed tasks do not keep the queue from being drained.
+        - failed_tasks() names every failed task with its last error.
+    """
+    with WorkQueue(queue_path, max_attempts=2) as queue:
+        queue.put("teams", "teams_PL.json", {})
+        queue.put("teams", "teams_BL1.json", {})
+        queue.seal()
+
+        for attempt in range(2):
+            task = queue.claim("worker-1")
+            assert task["key"] == "teams_PL.json"
+            queue.fail(task, "worker-1", "request failed")
+
+        queue.lease_seconds = 0
+        queue.claim("worker-1")
+        queue.claim("worker-1")
+
+        assert queue.claim("worker-1") is None
+        assert queue.counts() == {"failed": 2}
+        assert queue.is_drained()
+        assert queue.failed_tasks() == [
+            {"kind": "teams", "key": "teams_PL.json", "attempts": 2, "error": "request failed"},
+            {"kind": "teams", "key": "teams_BL1.json", "attempts": 2, "error": "lease expired"},
+        ]
+
+
+def test_reset(queue_path):
+    """
+    Test that a new run empties the queue and that a resumed run keeps the completed tasks.
+    Assertions:
+        - On resume, the completed tasks are handed to the loader again and the failed ones are retried.
+        - The queue is unsealed by both.
+        - Without resume, every task is deleted.
+    """
+    with WorkQueue(queue_path, max_attempts=1) as queue:
+        queue.put("teams", "teams_PL.json", {})
+        queue.put("teams", "teams_BL1.json", {})
+        queue.seal()
+        queue.complete(queue.claim("worker-1"), "worker-1")
+        queue.fail(queue.claim("worker-1"), "worker-1", "request failed")
+        queue.take_completed("teams")
+
+        queue.reset(resume=True)
+
+        assert queue.counts() == {"done": 1, "pending": 1}
+        assert [task["key"] for task in queue.take_completed("teams")] == ["teams_PL.json"]
+        assert not queue.is_drained()
+
+        queue.reset()
+        assert queue.counts() == {}
+
+
+def test_concurrent_workers_claim_each_task_once(queue_path):
+    """
+    Test that workers with their own connection never lease the same task.
+    Assertions:
+        - Every task is completed once, by one of the workers.
+    """
+    with WorkQueue(queue_path) as queue:
+        for index in range(50):
+            queue.put("teams", f"teams_{index}.json", {})
+        queue.seal()
+
+    claimed = []
+
+    def work(worker):
+        with WorkQueue(queue_path) as worker_queue:
+            while (task := worker_queue.claim(worker)) is not None:
+                assert worker_queue.complete(task, worker)
+                claimed.append(task["key"])
+
+    threads = [threading.Thread(target=work, args=(f"worker-{index}",)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(f"teams_{index}.json" for index in range(50))
+
+
+def test_iter_completed_stops_without_workers(queue_path):
+    """
+    Test that the loader stops waiting when no worker is left to run the open tasks.
+    """
+    with WorkQueue(queue_path) as queue:
+        queue.put("teams", "teams_PL.json", {})
+        queue.put("teams", "teams_BL1.json", {})
+        queue.seal()
+        queue.complete(queue.claim("worker-1"), "worker-1")
+
+        tasks = list(queue.iter_completed("teams", poll_interval=0, alive=lambda: False))
+
+        assert [task["key"] for task in tasks] == ["teams_PL.json"]